@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+주소 풀 벤치마크
+피어 수가 늘어날 때 할당 1회 시간이 일정한지 확인 (기존 선형 탐색과 비교, IPv4/IPv6)
+두 연결(프로세스)이 번갈아 할당할 때도 임대 수와 무관한지 확인 (변경 기록으로 바뀐 주소만 읽음)
+
+사용법: python3 examples/address_pool_bench.py [--peers 8000] [--step 1000] [--shared 20000]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from address_pool import AddressPool
+from state_store import StateStore
+
+
+def linear_next_ip(used: set, size: int) -> int:
+    """기존 get_next_available_ip 방식 (앞에서부터 빈 번호 탐색)"""
+    for i in range(2, size):
+        if i not in used:
+            return i
+    raise Exception("No available IPs")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--peers', type=int, default=8000)
+    parser.add_argument('--step', type=int, default=1000)
+    parser.add_argument('--shared', type=int, default=20000, help="두 연결 테스트 전에 채울 임대 수")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="address_pool_bench_")
+    store = StateStore(os.path.join(workdir, "state.db"))
+    pools = {
+        'IPv4 /16': AddressPool("10.100.0.0/16", store),
+        'IPv6 /64': AddressPool("fd00:100::/64", store),
+    }
+    used = set()
+
+    print(f"{'피어':>6} {'선형 탐색(us)':>14} " + " ".join(f"{name + '(us)':>14}" for name in pools))
+    for start in range(0, args.peers, args.step):
+        started = time.perf_counter()
+        for _ in range(args.step):
+            used.add(linear_next_ip(used, 1 << 16))
+        linear_us = (time.perf_counter() - started) * 1e6 / args.step
+
+        timings = []
+        for name, pool in pools.items():
+            started = time.perf_counter()
+            for i in range(start, start + args.step):
+                pool.allocate(f"bench:{i}")
+            timings.append((time.perf_counter() - started) * 1e6 / args.step)
+        print(f"{start + args.step:>6} {linear_us:>14.1f} " + " ".join(f"{value:>14.1f}" for value in timings))
+
+    shared(os.path.join(workdir, "shared.db"), args.shared)
+
+
+def shared(path: str, leases: int, rounds: int = 500):
+    """연결 두 개가 같은 풀에서 번갈아 할당 (매 할당 전에 상대 연결의 커밋을 반영해야 함)"""
+    pools = [AddressPool("10.128.0.0/9", StateStore(path)) for _ in range(2)]
+    pools[0].allocate_many([f"fill:{i}" for i in range(leases)])
+    pools[1].allocate("warmup")
+    started = time.perf_counter()
+    for i in range(rounds):
+        pools[i % 2].allocate(f"shared:{i}")
+    elapsed = (time.perf_counter() - started) * 1e6 / rounds
+    print(f"두 연결 번갈아 할당 (임대 {leases}개): {elapsed:.1f} us/할당")
+    allocated = set(pools[0].leases())
+    assert len(allocated) == leases + rounds + 1, "임대 수가 맞지 않음"
+
+
+if __name__ == "__main__":
+    main()
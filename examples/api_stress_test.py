@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+API 동시성 스트레스 테스트
+여러 스레드가 동시에 클라이언트 추가/토글(dongle_api)과 VPN 클라이언트 등록(vpn_auth_manager)을 실행한 뒤
+- 활성 IP가 모듈 간에도 중복되지 않는지
+- 저장소(state.db)를 새 연결로 다시 읽었을 때 메모리 상태와 같은지 (쓰기 유실 없음)
+- 주소 임대와 클라이언트 IP가 일치하는지
+- 풀이 가득 찬 상태에서 실패한 일괄 토글이 기존 임대를 건드리지 않는지
+확인. 명령은 record 모드라 실제 wg는 실행하지 않음.
+
+사용법: python3 examples/api_stress_test.py [--threads 16] [--clients 120] [--toggles 400] [--vpn 60] [--direct]
+  --direct: Flask 테스트 클라이언트 대신 관리자 메서드를 직접 호출
+"""
+import os
+import sys
+import random
+import argparse
+import tempfile
+import threading
+import time
+
+workdir = tempfile.mkdtemp(prefix="api_stress_")
+os.environ['DONGLE_STATE_DB'] = os.path.join(workdir, "state.db")
+os.environ['DONGLE_LOG_DIR'] = workdir
+os.environ['DONGLE_COMMAND_MODE'] = 'record'
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import dongle_api
+from address_pool import LEASES, AddressPoolExhausted
+from state_store import StateStore
+
+try:
+    import vpn_auth_manager
+except ImportError as e:
+    print(f"vpn_auth_manager 불러오기 실패, VPN 등록은 건너뜀: {e}")
+    vpn_auth_manager = None
+
+
+def setup():
+    dongle_api.WG_CONFIG_PATH = os.path.join(workdir, "wg0.conf")
+    with open(dongle_api.WG_CONFIG_PATH, 'w') as f:
+        f.write("[Interface]\nPrivateKey = stress\nListenPort = 51820\n")
+    # 인터페이스가 없으므로 빈 피어 목록에서 시작
+    dongle_api.wg_manager._applied = {}
+    dongle_api.events.echo = False
+    if vpn_auth_manager:
+        vpn_auth_manager.events.echo = False
+
+
+def run(args):
+    manager = dongle_api.wg_manager
+    client = None if args.direct else dongle_api.app.test_client()
+    added, errors = [], []
+    lock = threading.Lock()
+
+    def add(index):
+        client_id = f"stress{index}"
+        if client:
+            response = client.post(f"/api/clients/{client_id}", json={'public_key': f"WG{index:040d}="})
+            ok = response.status_code == 200
+        else:
+            manager.add_client(client_id, f"WG{index:040d}=")
+            ok = True
+        if ok:
+            with lock:
+                added.append(client_id)
+        return ok
+
+    def toggle():
+        with lock:
+            if not added:
+                return True
+            client_id = random.choice(added)
+        if client:
+            return client.post(f"/api/clients/{client_id}/toggle").status_code == 200
+        manager.toggle_client_ip(client_id)
+        return True
+
+    def register(index):
+        vpn_auth_manager.auth_manager.register_permanent_client(f"stress_vpn{index}", f"VPN{index:039d}=")
+        return True
+
+    operations = [lambda i=i: add(i) for i in range(args.clients)] + [toggle] * args.toggles
+    if vpn_auth_manager:
+        operations += [lambda i=i: register(i) for i in range(args.vpn)]
+    random.shuffle(operations)
+
+    def worker():
+        while True:
+            with lock:
+                if not operations:
+                    return
+                operation = operations.pop()
+            try:
+                if not operation():
+                    with lock:
+                        errors.append("HTTP 오류")
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = args.clients + args.toggles + (args.vpn if vpn_auth_manager else 0)
+    print(f"작업 {total}개, 스레드 {args.threads}개: {elapsed:.2f}초 ({total / elapsed:.0f} ops/s), 오류 {len(errors)}개")
+    for error in errors[:5]:
+        print(f"  {error}")
+    return errors
+
+
+def verify() -> bool:
+    manager = dongle_api.wg_manager
+    ok = True
+
+    # 1. 활성 IP 중복 (모듈 간 포함)
+    owners = {}
+    for client_id, client in manager.snapshot().items():
+        if client.get('ip'):
+            owners.setdefault(client['ip'], []).append(f"wireguard:{client_id}")
+    if vpn_auth_manager:
+        for client_id, client in vpn_auth_manager.auth_manager.clients.items():
+            owners.setdefault(client['allowed_ips'].split('/')[0], []).append(f"vpn:{client_id}")
+    duplicates = {ip: names for ip, names in owners.items() if len(names) > 1}
+    print(f"활성 IP {len(owners)}개, 중복 {len(duplicates)}개")
+    ok &= not duplicates
+
+    # 2. 새 연결로 읽은 저장소 == 메모리 (쓰기 유실 없음)
+    store = StateStore(os.environ['DONGLE_STATE_DB'])
+    persisted = store.load('wireguard_clients')
+    lost = [client_id for client_id, client in manager.snapshot().items() if persisted.get(client_id) != client]
+    if vpn_auth_manager:
+        persisted_vpn = store.load('vpn_clients')
+        lost += [client_id for client_id, client in vpn_auth_manager.auth_manager.clients.items()
+                 if persisted_vpn.get(client_id) != client]
+    print(f"저장소와 다른 레코드 {len(lost)}개")
+    ok &= not lost
+
+    # 3. 임대 == 클라이언트 IP
+    leases = {address: lease['owner'] for address, lease in store.load(LEASES).items()}
+    mismatched = [ip for ip, names in owners.items() if leases.get(ip) != names[0]]
+    print(f"임대 {len(leases)}개, 클라이언트 IP와 불일치 {len(mismatched)}개")
+    ok &= not mismatched and len(leases) == len(owners)
+
+    print("통과" if ok else "실패")
+    return ok
+
+
+def check_exhaustion() -> bool:
+    """풀을 가득 채운 뒤 반납 1개 + 할당 2개 토글이 실패하면 반납도 취소되는지"""
+    manager = dongle_api.wg_manager
+    spare = ['exhaust_off1', 'exhaust_off2']
+    for index, client_id in enumerate(spare):
+        manager.add_client(client_id, f"EX{index:040d}=")
+    manager.toggle_clients(spare)
+    index = len(spare)
+    while True:
+        try:
+            manager.add_client(f"exhaust{index}", f"EX{index:040d}=")
+        except AddressPoolExhausted:
+            break
+        index += 1
+
+    client_id = next(client_id for client_id, client in manager.snapshot().items() if client['status'] == 'active')
+    ip = manager.snapshot([client_id])[client_id]['ip']
+    before = manager.pool.leases()
+    try:
+        manager.toggle_clients([client_id] + spare)
+        failed = False
+    except AddressPoolExhausted:
+        failed = True
+    after = manager.pool.leases()
+    ok = (failed and after == before and manager.pool.owner_of(ip) == manager.lease_owner(client_id)
+          and manager.snapshot([client_id])[client_id]['ip'] == ip)
+    print(f"풀 소진 후 실패한 토글: {'임대 유지' if ok else '임대 유실'} ({client_id} {ip})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--clients', type=int, default=120)
+    parser.add_argument('--toggles', type=int, default=400)
+    parser.add_argument('--vpn', type=int, default=60)
+    parser.add_argument('--direct', action='store_true')
+    args = parser.parse_args()
+
+    setup()
+    errors = run(args)
+    dongle_api.jobs.shutdown()
+    ok = verify()
+    ok &= check_exhaustion()
+    sys.exit(0 if ok and not errors else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+WireGuard 키 생성 벤치마크
+기존 방식(`wg genkey` + `wg pubkey` 프로세스 2개)과 프로세스 내부 생성, 미리 채운 키 풀 비교
+
+사용법: python3 examples/key_generation_bench.py [--keys 200] [--pool 64]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from wg_keys import BACKEND, KeyPool, generate_keypair, public_key
+
+
+def subprocess_keypair():
+    """기존 방식 (키마다 프로세스 2개)"""
+    private_key = subprocess.run(['wg', 'genkey'], capture_output=True, text=True).stdout.strip()
+    public = subprocess.run(['wg', 'pubkey'], input=private_key, capture_output=True, text=True).stdout.strip()
+    return private_key, public
+
+
+def measure(name, func, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed * 1e6 / count:>10.1f} us/키 {count / elapsed:>10.0f} 키/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=200)
+    parser.add_argument('--pool', type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"백엔드: {BACKEND}")
+    if shutil.which('wg'):
+        # 두 구현이 같은 공개키를 내는지 먼저 확인
+        private_key, public = subprocess_keypair()
+        assert public_key(private_key) == public, "wg pubkey와 결과가 다름"
+        measure("wg genkey + wg pubkey", subprocess_keypair, args.keys)
+    else:
+        print("wg 명령 없음 - 프로세스 방식은 건너뜀")
+    measure("프로세스 내부 생성", generate_keypair, args.keys)
+
+    pool = KeyPool(args.pool)
+    pool.fill()
+    measure(f"키 풀 (크기 {args.pool}, 예열)", pool.take, min(args.keys, args.pool))
+    # 풀보다 많은 연속 발급 - 모자라면 요청 스레드에서 바로 생성
+    measure("키 풀 (연속 발급)", pool.take, args.keys)
+    print(pool.status())
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+SOCKS5 프록시 벤치마크 (루프백)
+내장 asyncio 엔진과 danted의 처리량/지연 시간 비교
+
+사용법: python3 examples/socks5_bench.py [--mb 256] [--connections 200]
+"""
+import os
+import sys
+import time
+import socket
+import shutil
+import struct
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from socks5_server import Socks5Server
+
+CHUNK = 256 * 1024
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_port(port: int, timeout: float = 10) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+# ===== 대상 서버 (에코) =====
+def echo_server(port: int):
+    async def handle(reader, writer):
+        try:
+            while True:
+                data = await reader.read(CHUNK)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', port, reuse_address=True)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+# ===== 프록시 =====
+def builtin_proxy(port: int, use_splice: bool):
+    async def run():
+        server = Socks5Server('bench', port, lambda: '127.0.0.1',
+                              host='127.0.0.1', use_splice=use_splice)
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def start_danted(port: int):
+    """danted 실행 (설치된 경우만)"""
+    if not shutil.which('danted'):
+        return None, None
+    config = f"""
+logoutput: /dev/null
+internal: 127.0.0.1 port = {port}
+external: 127.0.0.1
+socksmethod: none
+clientmethod: none
+client pass {{
+    from: 0.0.0.0/0 to: 0.0.0.0/0
+}}
+socks pass {{
+    from: 0.0.0.0/0 to: 0.0.0.0/0
+    protocol: tcp
+}}
+"""
+    fd, path = tempfile.mkstemp(suffix='.conf', prefix='dante_bench_')
+    with os.fdopen(fd, 'w') as f:
+        f.write(config)
+    process = subprocess.Popen(['danted', '-f', path], stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    return process, path
+
+
+# ===== 클라이언트 =====
+def socks_connect(proxy_port: int, target_port: int) -> socket.socket:
+    sock = socket.create_connection(('127.0.0.1', proxy_port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.sendall(b'\x05\x01\x00')
+    if sock.recv(2) != b'\x05\x00':
+        raise RuntimeError("인증 협상 실패")
+    sock.sendall(b'\x05\x01\x00\x01' + socket.inet_aton('127.0.0.1') + struct.pack('!H', target_port))
+    reply = b''
+    while len(reply) < 10:
+        chunk = sock.recv(10 - len(reply))
+        if not chunk:
+            raise RuntimeError("프록시 연결 종료")
+        reply += chunk
+    if reply[1] != 0:
+        raise RuntimeError(f"CONNECT 실패: {reply[1]}")
+    return sock
+
+
+def measure_throughput(proxy_port: int, target_port: int, total_mb: int) -> float:
+    """에코 왕복 처리량 (MB/s, 단방향 기준)"""
+    sock = socks_connect(proxy_port, target_port)
+    total = total_mb * 1024 * 1024
+    payload = b'x' * CHUNK
+
+    def sender():
+        sent = 0
+        while sent < total:
+            sent += sock.send(payload[:min(CHUNK, total - sent)])
+        sock.shutdown(socket.SHUT_WR)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=sender)
+    thread.start()
+    received = 0
+    buf = bytearray(CHUNK)
+    while received < total:
+        n = sock.recv_into(buf)
+        if not n:
+            break
+        received += n
+    elapsed = time.perf_counter() - start
+    thread.join()
+    sock.close()
+    return received / (1024 * 1024) / elapsed
+
+
+def measure_latency(proxy_port: int, target_port: int, connections: int):
+    """연결 수립(핸드셰이크 포함) 시간과 1바이트 왕복 시간 (ms)"""
+    setup, rtt = [], []
+    for _ in range(connections):
+        start = time.perf_counter()
+        sock = socks_connect(proxy_port, target_port)
+        connected = time.perf_counter()
+        sock.sendall(b'p')
+        sock.recv(1)
+        done = time.perf_counter()
+        sock.close()
+        setup.append((connected - start) * 1000)
+        rtt.append((done - connected) * 1000)
+    return setup, rtt
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label, proxy_port, target_port, args):
+    throughput = measure_throughput(proxy_port, target_port, args.mb)
+    setup, rtt = measure_latency(proxy_port, target_port, args.connections)
+    print(f"{label:<18} {throughput:>10.1f} "
+          f"{percentile(setup, 50):>9.3f} {percentile(setup, 99):>9.3f} "
+          f"{percentile(rtt, 50):>9.3f} {percentile(rtt, 99):>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SOCKS5 루프백 벤치마크")
+    parser.add_argument('--mb', type=int, default=256, help="처리량 측정 전송량 (MB)")
+    parser.add_argument('--connections', type=int, default=200, help="지연 측정 연결 수")
+    args = parser.parse_args()
+
+    target_port = free_port()
+    processes = [multiprocessing.Process(target=echo_server, args=(target_port,), daemon=True)]
+    processes[0].start()
+    wait_port(target_port)
+
+    print(f"{'엔진':<18} {'MB/s':>10} {'연결p50':>9} {'연결p99':>9} {'RTTp50':>9} {'RTTp99':>9}")
+    print("-" * 70)
+
+    for label, use_splice in (('builtin (buffer)', False), ('builtin (splice)', True)):
+        port = free_port()
+        proc = multiprocessing.Process(target=builtin_proxy, args=(port, use_splice), daemon=True)
+        proc.start()
+        processes.append(proc)
+        wait_port(port)
+        report(label, port, target_port, args)
+
+    dante_port = free_port()
+    dante, dante_conf = start_danted(dante_port)
+    if dante and wait_port(dante_port):
+        report('danted', dante_port, target_port, args)
+    else:
+        print("danted          (설치되지 않음 또는 시작 실패 - 건너뜀)")
+    if dante:
+        dante.terminate()
+        os.unlink(dante_conf)
+
+    for proc in processes:
+        proc.terminate()
+
+
+if __name__ == "__main__":
+    main()
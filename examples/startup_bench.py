@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+게이트웨이 시작 벤치마크
+가짜 동글 N개(lo 인터페이스)로 순차/병렬 콜드 스타트와 웜 리스타트 시간 비교
+
+사용법: sudo python3 examples/startup_bench.py [--dongles 1 5 10 20] [--table-base 3000] [--port-base 21080]
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from network_gateway_server import NetworkGatewayServer
+
+
+def bench_config(count: int, parallel: bool, warm: bool, table_base: int, port_base: int) -> dict:
+    """기본 설정 위에 덮어쓸 벤치마크 설정"""
+    return {
+        "dongles": {
+            f"bench{i}": {
+                "interface": "lo",
+                "ip": "127.0.0.1",
+                "gateway": "127.0.0.1",
+                "routing_table": table_base + i,
+                "socks_port": port_base + i,
+                "vpn_port": 51820 + i,
+                "status": "active"
+            }
+            for i in range(count)
+        },
+        "main_line": {"interface": "lo", "ip": "127.0.0.1", "socks_port": port_base - 1, "status": "active"},
+        "kill_switch": {"enabled": False},
+        "inventory": {"enabled": False},
+        "startup": {"parallel": parallel, "timeout": 10, "warm_restart": warm},
+    }
+
+
+async def start(count: int, parallel: bool, args, warm: bool = False, flush: bool = True) -> dict:
+    """게이트웨이 시작 후 종료 (flush=False면 라우팅 테이블을 남겨 다음 웜 리스타트가 인수)"""
+    workdir = tempfile.mkdtemp(prefix="startup_bench_")
+    server = NetworkGatewayServer(
+        os.path.join(workdir, "gateway_config.json"),
+        os.path.join(workdir, "gateway.log")
+    )
+    server.log = lambda message, level="INFO": None
+    server.config.update(bench_config(count, parallel, warm, args.table_base, args.port_base))
+    try:
+        await server.start()
+        total = max(entry['ready_ms'] or 0 for entry in server.startup)
+        failed = [entry['name'] for entry in server.startup if entry['status'] != 'ready']
+        changed = server.warm_restart.changed if server.warm_restart else None
+        return {'total_ms': total, 'failed': failed, 'changed_tables': changed}
+    finally:
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+        for name in list(server.proxies):
+            await server.stop_socks5_proxy(name)
+        if server.monitor:
+            server.monitor.stop()
+        for dongle in server.config['dongles'].values() if flush else []:
+            try:
+                server.net.flush_table(dongle['routing_table'])
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dongles', type=int, nargs='+', default=[1, 5, 10, 20])
+    parser.add_argument('--table-base', type=int, default=3000)
+    parser.add_argument('--port-base', type=int, default=21080)
+    args = parser.parse_args()
+
+    print(f"{'동글':>6} {'순차(ms)':>10} {'병렬(ms)':>10} {'비율':>6} {'웜(ms)':>10} {'갱신 테이블':>10}")
+    for count in args.dongles:
+        sequential = asyncio.run(start(count, False, args))
+        parallel = asyncio.run(start(count, True, args, flush=False))
+        warm = asyncio.run(start(count, True, args, warm=True))
+        ratio = sequential['total_ms'] / parallel['total_ms'] if parallel['total_ms'] else 0
+        print(f"{count:>6} {sequential['total_ms']:>10.1f} {parallel['total_ms']:>10.1f} {ratio:>5.1f}x "
+              f"{warm['total_ms']:>10.1f} {len(warm['changed_tables']):>10}")
+        for result in (sequential, parallel, warm):
+            if result['failed']:
+                print(f"       실패: {', '.join(result['failed'])}")
+
+
+if __name__ == "__main__":
+    main()
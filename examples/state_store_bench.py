@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+상태 저장소 벤치마크
+클라이언트 N개에서 한 명씩 갱신할 때 JSON 전체 재작성과 레코드 단위 갱신 비교,
+공개키/IP 조회(선형 탐색 vs 인덱스) 비교
+
+사용법: python3 examples/state_store_bench.py [--clients 1000 10000] [--updates 200]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from state_store import StateCollection, StateStore
+
+
+def make_clients(count: int) -> dict:
+    return {
+        f"client_{i:06d}": {
+            'name': f"client_{i}",
+            'public_key': f"{i:043d}=",
+            'ip': f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+            'port': 51820 + i % 6,
+            'enabled': True,
+            'created': "2024-01-01T00:00:00",
+            'last_toggle': None
+        }
+        for i in range(count)
+    }
+
+
+def timed(func, repeat: int) -> float:
+    """1회 평균 ms"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def bench(count: int, updates: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="state_store_bench_")
+    clients = make_clients(count)
+    keys = list(clients)
+
+    json_path = os.path.join(workdir, "clients.json")
+
+    def json_update():
+        client_id = random.choice(keys)
+        clients[client_id]['enabled'] = not clients[client_id]['enabled']
+        with open(json_path, 'w') as f:
+            json.dump(clients, f, indent=2)
+
+    with open(json_path, 'w') as f:
+        json.dump(clients, f, indent=2)
+    json_ms = timed(json_update, updates)
+
+    # JSON 파일에서 이전
+    store = StateStore(os.path.join(workdir, "state.db"))
+    collection = StateCollection(store, 'clients', json_path, log=lambda message, level="INFO", **fields: print(message))
+    started = time.perf_counter()
+    clients = collection.load()
+    migrate_ms = (time.perf_counter() - started) * 1000
+
+    def record_update():
+        client_id = random.choice(keys)
+        clients[client_id]['enabled'] = not clients[client_id]['enabled']
+        collection.save(clients, [client_id])
+
+    record_ms = timed(record_update, updates)
+
+    lookups = [clients[random.choice(keys)] for _ in range(updates)]
+    linear_ms = timed(lambda: [
+        next(c for c in clients.values() if c['public_key'] == target['public_key']) for target in lookups
+    ], 1) / len(lookups)
+    key_ms = timed(lambda: [collection.find(public_key=target['public_key']) for target in lookups], 1) / len(lookups)
+    ip_ms = timed(lambda: [collection.find(ip=target['ip']) for target in lookups], 1) / len(lookups)
+
+    store.close()
+    return {
+        'json_ms': json_ms, 'record_ms': record_ms, 'migrate_ms': migrate_ms,
+        'linear_ms': linear_ms, 'key_ms': key_ms, 'ip_ms': ip_ms
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--updates', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'클라이언트':>8} {'JSON 갱신(ms)':>14} {'레코드 갱신(ms)':>15} {'비율':>7} {'이전(ms)':>9} "
+          f"{'선형 조회(ms)':>13} {'공개키(ms)':>10} {'IP(ms)':>8}")
+    for count in args.clients:
+        result = bench(count, args.updates)
+        ratio = result['json_ms'] / result['record_ms'] if result['record_ms'] else 0
+        print(f"{count:>8} {result['json_ms']:>14.2f} {result['record_ms']:>15.3f} {ratio:>6.0f}x "
+              f"{result['migrate_ms']:>9.1f} {result['linear_ms']:>13.3f} {result['key_ms']:>10.3f} "
+              f"{result['ip_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
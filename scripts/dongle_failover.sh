@@ -3,9 +3,17 @@
 
 echo "=== 동글 페일오버 VPN 설정 ==="
 
-# 현재 활성 동글 확인
-PRIMARY_DONGLE="enp0s21f0u4"
-BACKUP_DONGLE="enp0s21f0u3"
+source "$(dirname "$(readlink -f "$0")")/lib/dongles.sh"
+
+# 주/백업 동글: 환경변수로 지정하거나 감지된 순서대로
+DONGLES=($(get_dongle_interfaces))
+PRIMARY_DONGLE=${PRIMARY_DONGLE:-${DONGLES[0]}}
+BACKUP_DONGLE=${BACKUP_DONGLE:-${DONGLES[1]}}
+
+if [ -z "$PRIMARY_DONGLE" ]; then
+    echo "❌ 연결된 동글이 없습니다"
+    exit 1
+fi
 
 # 주 동글 상태 확인
 check_dongle_status() {
@@ -1,9 +1,22 @@
 #!/bin/bash
 echo "=== VPN 트래픽을 동글로 라우팅하는 정교한 설정 ==="
 
+source "$(dirname "$(readlink -f "$0")")/lib/dongles.sh"
+
+# 대상 동글: 인자로 지정하거나 첫 번째로 감지된 동글
+DONGLE=${1:-$(get_dongle_interfaces | head -n 1)}
+DONGLE_IP=$(ip addr show $DONGLE 2>/dev/null | grep "inet 192.168" | awk '{print $2}' | cut -d'/' -f1)
+DONGLE_GW=$(echo $DONGLE_IP | sed 's/\.[0-9]*$/.1/')
+DONGLE_NET=$(echo $DONGLE_IP | sed 's/\.[0-9]*$/.0\/24/')
+
+if [ -z "$DONGLE_IP" ]; then
+    echo "❌ 사용할 동글이 없습니다 (${DONGLE:-감지 실패})"
+    exit 1
+fi
+
 # 1. 동글이 실제로 인터넷에 연결되어 있는지 확인
-echo "1. 동글 인터넷 연결 확인..."
-if ping -I enp0s21f0u4 -c 1 8.8.8.8 > /dev/null 2>&1; then
+echo "1. 동글 인터넷 연결 확인 ($DONGLE, $DONGLE_IP)..."
+if ping -I $DONGLE -c 1 8.8.8.8 > /dev/null 2>&1; then
     echo "✅ 동글 인터넷 연결 확인됨"
 else
     echo "❌ 동글 인터넷 연결 실패 - 중단"
@@ -12,8 +25,8 @@ fi
 
 # 2. VPN 트래픽을 위한 별도 라우팅 테이블 생성 (테이블 200)
 echo "2. VPN 전용 라우팅 테이블 설정..."
-ip route add default via 192.168.16.1 dev enp0s21f0u4 table 200 2>/dev/null
-ip route add 192.168.16.0/24 dev enp0s21f0u4 src 192.168.16.100 table 200 2>/dev/null
+ip route add default via $DONGLE_GW dev $DONGLE table 200 2>/dev/null
+ip route add $DONGLE_NET dev $DONGLE src $DONGLE_IP table 200 2>/dev/null
 
 # 3. VPN 클라이언트 트래픽만 동글로 라우팅 (WireGuard 인터페이스 제외)
 echo "3. 정책 기반 라우팅 설정..."
@@ -23,7 +36,7 @@ ip rule add from 10.0.0.0/24 not to 222.101.90.78 lookup 200 priority 100 2>/dev
 # 4. iptables NAT 설정 (VPN 클라이언트 트래픽을 동글로)
 echo "4. NAT 규칙 설정..."
 # VPN 클라이언트 트래픽이 동글로 나갈 때 SNAT
-iptables -t nat -I POSTROUTING 1 -s 10.0.0.0/24 ! -d 10.0.0.0/24 -o enp0s21f0u4 -j SNAT --to-source 192.168.16.100 2>/dev/null
+iptables -t nat -I POSTROUTING 1 -s 10.0.0.0/24 ! -d 10.0.0.0/24 -o $DONGLE -j SNAT --to-source $DONGLE_IP 2>/dev/null
 
 echo "5. 설정 확인..."
 echo "라우팅 룰:"
@@ -0,0 +1,8 @@
+# 동글 스크립트 공용 함수 (source로 불러서 사용)
+
+# USB 동글 인터페이스 자동 감지 (sysfs device 경로에 usb가 포함된 NIC, src/dongle_inventory.py와 같은 기준)
+get_dongle_interfaces() {
+    for dev in /sys/class/net/*; do
+        readlink -f "$dev/device" 2>/dev/null | grep -q "/usb" && basename "$dev"
+    done
+}
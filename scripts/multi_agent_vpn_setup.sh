@@ -8,9 +8,16 @@ SERVER_IP="222.101.90.78"
 VPN_SUBNET_BASE="10.0"
 PORT_BASE=51820
 
-# 동글 인터페이스 매핑
-DONGLE1="enp0s21f0u4"
-DONGLE2="enp0s21f0u3"
+source "$(dirname "$(readlink -f "$0")")/lib/dongles.sh"
+
+# 동글 인터페이스 매핑 (감지된 동글에 라운드로빈)
+DONGLES=($(get_dongle_interfaces))
+DONGLE_COUNT=${#DONGLES[@]}
+
+if [ $DONGLE_COUNT -eq 0 ]; then
+    echo "❌ 연결된 동글이 없습니다"
+    exit 1
+fi
 
 # 각 VPN 인터페이스 생성 (wg0 ~ wg5)
 for i in {0..5}; do
@@ -29,13 +36,8 @@ for i in {0..5}; do
     PUBLIC_KEY=$(echo $PRIVATE_KEY | wg pubkey)
     
     # 라우팅 결정 (라운드로빈)
-    if [ $((i % 2)) -eq 0 ]; then
-        OUT_INTERFACE=$DONGLE1
-        ROUTING_TABLE=$((200 + i))
-    else
-        OUT_INTERFACE=$DONGLE2
-        ROUTING_TABLE=$((200 + i))
-    fi
+    OUT_INTERFACE=${DONGLES[$((i % DONGLE_COUNT))]}
+    ROUTING_TABLE=$((200 + i))
     
     # WireGuard 설정 파일 생성
     cat > /etc/wireguard/$INTERFACE.conf << EOF
@@ -87,8 +89,9 @@ for i in {0..5}; do
 done
 
 echo "\n=== 부하 분산 설정 ==="
-echo "  - 짝수 에이전트 (0,2,4): 동글1 경유"
-echo "  - 홀수 에이전트 (1,3,5): 동글2 경유"
+for i in {0..5}; do
+    echo "  - 에이전트 $((i+1)): ${DONGLES[$((i % DONGLE_COUNT))]} 경유"
+done
 
 # systemd 서비스 생성
 cat > /tmp/multi-agent-vpn.service << 'EOF'
@@ -1,10 +1,7 @@
 #!/bin/bash
 # 다중 동글 VPN 라우팅 관리 스크립트
 
-# 동글 인터페이스 자동 감지
-get_dongle_interfaces() {
-    ip link show | grep -E "enp.*u[0-9]" | awk -F': ' '{print $2}' | cut -d':' -f1
-}
+source "$(dirname "$(readlink -f "$0")")/lib/dongles.sh"
 
 # 동글별 라우팅 테이블 설정
 setup_dongle_routing() {
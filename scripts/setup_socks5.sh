@@ -36,17 +36,25 @@ start_proxy() {
     fi
 }
 
-# 동글1 프록시
-DONGLE1_IP=$(ip addr show enp0s21f0u4 2>/dev/null | grep "inet 192.168" | awk '{print $2}' | cut -d'/' -f1)
-start_proxy "dongle1" "enp0s21f0u4" 1080 "$DONGLE1_IP"
+source "$(dirname "$(readlink -f "$0")")/lib/dongles.sh"
 
-# 동글2 프록시
-DONGLE2_IP=$(ip addr show enp0s21f0u3 2>/dev/null | grep "inet 192.168" | awk '{print $2}' | cut -d'/' -f1)
-start_proxy "dongle2" "enp0s21f0u3" 1081 "$DONGLE2_IP"
+# 동글 프록시 (감지된 동글마다 1080부터, 메인라인 포트 1082는 건너뜀)
+PORT=1080
+INDEX=1
+PROXY_LIST=""
+for interface in $(get_dongle_interfaces); do
+    [ $PORT -eq 1082 ] && PORT=$((PORT + 1))
+    IP=$(ip addr show $interface 2>/dev/null | grep "inet 192.168" | awk '{print $2}' | cut -d'/' -f1)
+    start_proxy "dongle$INDEX" "$interface" $PORT "$IP"
+    PROXY_LIST="$PROXY_LIST $PORT:동글$INDEX($interface)"
+    PORT=$((PORT + 1))
+    INDEX=$((INDEX + 1))
+done
 
 # 메인라인 프록시
 MAIN_IP=$(ip addr show eno1 | grep "inet " | grep -v "127.0.0.1" | awk '{print $2}' | cut -d'/' -f1)
 start_proxy "mainline" "eno1" 1082 "$MAIN_IP"
+PROXY_LIST="$PROXY_LIST 1082:메인라인"
 
 echo ""
 echo "=== SOCKS5 프록시 상태 ==="
@@ -55,9 +63,9 @@ ps aux | grep microsocks | grep -v grep
 
 echo ""
 echo "사용 가능한 프록시:"
-echo "  - socks5://$(hostname -I | awk '{print $1}'):1080  # 동글1"
-echo "  - socks5://$(hostname -I | awk '{print $1}'):1081  # 동글2"  
-echo "  - socks5://$(hostname -I | awk '{print $1}'):1082  # 메인라인"
+for entry in $PROXY_LIST; do
+    echo "  - socks5://$(hostname -I | awk '{print $1}'):${entry%%:*}  # ${entry#*:}"
+done
 
 # systemd 서비스 생성
 cat > /tmp/socks5-proxy.service << 'EOF'
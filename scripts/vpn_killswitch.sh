@@ -44,8 +44,10 @@ iptables -A KILLSWITCH -p tcp --dport 1080:1082 -j ACCEPT
 # VPN 포트 허용
 iptables -A KILLSWITCH -p udp --dport 51820:51822 -j ACCEPT
 
+source "$(dirname "$(readlink -f "$0")")/lib/dongles.sh"
+
 # 동글이 활성 상태일 때만 해당 인터페이스 허용
-for interface in enp0s21f0u4 enp0s21f0u3; do
+for interface in $(get_dongle_interfaces); do
     if ip link show $interface 2>/dev/null | grep -q "state UP"; then
         echo "  - $interface 허용"
         iptables -A KILLSWITCH -o $interface -m mark --mark 0x100 -j ACCEPT
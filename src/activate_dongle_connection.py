@@ -3,19 +3,23 @@
 동글 모바일 연결 활성화 스크립트
 """
 
+import sys
 import requests
 import xml.etree.ElementTree as ET
 import time
 import json
 from datetime import datetime
 
+from dongle_inventory import discover_usb_interfaces, guess_gateway
+from health_prober import get_interface_ipv4
+
 def log(message):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
 
-def get_session_info():
+def get_session_info(gateway):
     """세션 정보 획득"""
     try:
-        response = requests.get("http://192.168.16.1/api/webserver/SesTokInfo", timeout=5)
+        response = requests.get(f"http://{gateway}/api/webserver/SesTokInfo", timeout=5)
         if response.status_code == 200:
             root = ET.fromstring(response.text)
             session_id = root.find('SesInfo').text
@@ -29,7 +33,7 @@ def get_session_info():
         log(f"세션 정보 오류: {e}")
         return None, None
 
-def get_connection_status(session_id, token):
+def get_connection_status(gateway, session_id, token):
     """현재 연결 상태 확인"""
     try:
         headers = {
@@ -37,7 +41,7 @@ def get_connection_status(session_id, token):
             '__RequestVerificationToken': token
         }
         
-        response = requests.get("http://192.168.16.1/api/monitoring/status", 
+        response = requests.get(f"http://{gateway}/api/monitoring/status", 
                               headers=headers, timeout=5)
         if response.status_code == 200:
             root = ET.fromstring(response.text)
@@ -61,7 +65,7 @@ def get_connection_status(session_id, token):
         log(f"상태 확인 오류: {e}")
         return None
 
-def connect_mobile(session_id, token):
+def connect_mobile(gateway, session_id, token):
     """모바일 연결 시작"""
     try:
         headers = {
@@ -72,7 +76,7 @@ def connect_mobile(session_id, token):
         
         # 연결 시작 요청
         connect_data = '<?xml version="1.0" encoding="UTF-8"?><request><Action>1</Action></request>'
-        response = requests.post("http://192.168.16.1/api/dialup/dial", 
+        response = requests.post(f"http://{gateway}/api/dialup/dial", 
                                data=connect_data, headers=headers, timeout=10)
         
         if response.status_code == 200:
@@ -87,13 +91,13 @@ def connect_mobile(session_id, token):
         log(f"모바일 연결 오류: {e}")
         return False
 
-def check_internet_via_dongle():
+def check_internet_via_dongle(interface):
     """동글을 통한 인터넷 연결 확인"""
     import subprocess
     try:
         # 외부 IP 확인
         result = subprocess.run([
-            'curl', '--interface', 'enp0s21f0u4', 
+            'curl', '--interface', interface, 
             '--connect-timeout', '10', '-s', 'http://ifconfig.me'
         ], capture_output=True, text=True, timeout=15)
         
@@ -111,19 +115,32 @@ def check_internet_via_dongle():
 def main():
     log("=== 동글 모바일 연결 활성화 시작 ===")
     
+    # 대상 동글: 인자로 지정하거나 첫 번째 USB 동글
+    interfaces = sys.argv[1:] or discover_usb_interfaces()
+    if not interfaces:
+        log("❌ 연결된 USB 동글이 없습니다.")
+        return
+    interface = interfaces[0]
+    ip = get_interface_ipv4(interface)
+    if not ip:
+        log(f"❌ {interface}에 IP가 없습니다.")
+        return
+    gateway = guess_gateway(ip)
+    log(f"동글: {interface} (웹 인터페이스 {gateway})")
+    
     # 1. 세션 정보 획득
-    session_id, token = get_session_info()
+    session_id, token = get_session_info(gateway)
     if not session_id or not token:
         log("❌ 세션 정보를 획득할 수 없습니다.")
         return
     
     # 2. 현재 상태 확인
-    status = get_connection_status(session_id, token)
+    status = get_connection_status(gateway, session_id, token)
     
     # 3. 연결되지 않은 경우 연결 시도
     if status != "901":  # 901 = Connected
         log("모바일 연결 시작...")
-        if connect_mobile(session_id, token):
+        if connect_mobile(gateway, session_id, token):
             log("연결 요청 완료. 15초 대기...")
             time.sleep(15)
         else:
@@ -134,11 +151,11 @@ def main():
     
     # 4. 연결 후 상태 재확인
     log("연결 상태 재확인...")
-    status = get_connection_status(session_id, token)
+    status = get_connection_status(gateway, session_id, token)
     
     # 5. 인터넷 연결 테스트
     log("인터넷 연결 테스트...")
-    connected, external_ip = check_internet_via_dongle()
+    connected, external_ip = check_internet_via_dongle(interface)
     
     if connected:
         log(f"🎉 성공! 동글 모바일 IP: {external_ip}")
@@ -150,7 +167,7 @@ def main():
         import subprocess
         try:
             ping_result = subprocess.run([
-                'ping', '-I', 'enp0s21f0u4', '-c', '2', '8.8.8.8'
+                'ping', '-I', interface, '-c', '2', '8.8.8.8'
             ], capture_output=True, text=True, timeout=10)
             
             if ping_result.returncode == 0:
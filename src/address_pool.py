@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+터널 IP 주소 풀
+- 임의의 IPv4/IPv6 프리픽스에서 주소 할당 (반납된 주소 free-list + 사용 중 주소를 건너뛰는 커서, 분할 상환 상수 시간)
+- 임대 정보는 상태 저장소(address_leases)에 주소를 키로 저장 → 모듈/프로세스가 달라도 충돌 없음
+- 특정 주소 예약, 임대 반납, 소유자별 일괄 반납
+- 다른 프로세스가 임대를 바꾸면 다음 할당 때 변경 기록에서 바뀐 주소만 읽음 (PRAGMA data_version)
+
+사용법: python3 src/address_pool.py [--db /home/proxy/state.db] 10.0.0.0/24
+"""
+
+import time
+import argparse
+import ipaddress
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from state_store import StateStore, get_state_store
+
+LEASES = 'address_leases'
+# 임대가 바뀔 때마다 올리는 카운터 (다른 컬렉션 변경으로는 풀을 다시 읽지 않도록)
+META, LEASE_VERSION = 'address_pool', 'lease_version'
+# 버전별 임대 변경 기록 {'added': [...], 'removed': [...]} - 최근 MAX_LEASE_CHANGES개만 유지
+CHANGES = 'address_lease_changes'
+MAX_LEASE_CHANGES = 1000
+
+
+class AddressPoolExhausted(Exception):
+    """풀에 남은 주소가 없음"""
+
+
+class AddressPool:
+    """프리픽스 하나의 주소 할당기"""
+
+    def __init__(self, network: str, store: StateStore = None, first: int = 2, last: int = None,
+                 reserved: Iterable[str] = ()):
+        """first/last: 할당할 호스트 오프셋 범위 (기본: 네트워크 주소와 서버(.1) 제외, IPv4는 브로드캐스트 제외)"""
+        self.network = ipaddress.ip_network(network, strict=False)
+        self.store = store or get_state_store()
+        self.first = first
+        if last is None:
+            last = self.network.num_addresses - (2 if self.network.version == 4 else 1)
+        self.last = min(last, self.network.num_addresses - 1)
+        self.reserved = {self._offset(address) for address in reserved}
+
+        self._lock = threading.Lock()
+        self._used = set()
+        self._free: List[int] = []
+        self._cursor = self.first
+        self._data_version = None
+        self._lease_version = None
+
+    @property
+    def prefix_length(self) -> int:
+        """피어 AllowedIPs용 호스트 프리픽스 (/32, /128)"""
+        return self.network.max_prefixlen
+
+    @property
+    def size(self) -> int:
+        return max(0, self.last - self.first + 1)
+
+    def _offset(self, address: str) -> int:
+        ip = ipaddress.ip_address(str(address).split('/')[0])
+        if ip not in self.network:
+            raise ValueError(f"{ip}는 {self.network}에 속하지 않습니다")
+        return int(ip) - int(self.network.network_address)
+
+    def _address(self, offset: int) -> str:
+        return str(self.network.network_address + offset)
+
+    def _in_range(self, offset: int) -> bool:
+        return self.first <= offset <= self.last and offset not in self.reserved
+
+    # ===== 메모리 상태 =====
+    def _refresh(self):
+        """다른 연결이 바꾼 임대를 변경 기록으로 반영 (바뀐 주소 수에 비례, 커서와 free-list 유지)"""
+        data_version = self.store.version()
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        self._sync(self.store.get(META, LEASE_VERSION) or 0)
+
+    def _sync(self, lease_version: int):
+        """lease_version까지의 임대 변경을 반영"""
+        if lease_version == self._lease_version:
+            return
+        changes = None
+        if self._lease_version is not None and 0 < lease_version - self._lease_version <= MAX_LEASE_CHANGES:
+            changes = [self.store.get(CHANGES, str(version))
+                       for version in range(self._lease_version + 1, lease_version + 1)]
+        if changes is None or None in changes:
+            self._reload()
+        else:
+            for change in changes:
+                self._apply(change.get('added', ()), change.get('removed', ()))
+        self._lease_version = lease_version
+
+    def _reload(self):
+        """사용 중 주소 전체를 다시 읽고 커서를 처음으로 (처음 로드, 변경 기록이 잘린 경우)"""
+        used = set()
+        for address in self.store.load(LEASES):
+            ip = ipaddress.ip_address(address)
+            if ip.version == self.network.version and ip in self.network:
+                used.add(int(ip) - int(self.network.network_address))
+        self._used = used
+        # 빈 구멍은 커서가 사용 중 주소를 건너뛰며 찾음 (건너뛰는 횟수는 임대 수 이하)
+        self._cursor = self.first
+        self._free = []
+
+    def _apply(self, added: Iterable[str], removed: Iterable[str]):
+        """다른 연결의 임대 변경 하나를 메모리 상태에 반영 (swap과 같은 순서: 반납 후 할당)"""
+        for address in removed:
+            if self.contains(address):
+                offset = self._offset(address)
+                self._used.discard(offset)
+                if self._in_range(offset):
+                    self._free.append(offset)
+        for address in added:
+            if self.contains(address):
+                self._used.add(self._offset(address))
+
+    def _bump(self, added: Iterable[str] = (), removed: Iterable[str] = ()):
+        """임대 변경을 버전과 변경 기록에 남김 (트랜잭션 안에서 _refresh 뒤에 호출)"""
+        current = self.store.get(META, LEASE_VERSION) or 0
+        # 같은 연결을 쓰는 다른 풀의 변경은 data_version에 잡히지 않으므로 여기서 반영
+        self._sync(current)
+        version = current + 1
+        self.store.put(META, LEASE_VERSION, version)
+        self.store.put(CHANGES, str(version), {'added': list(added), 'removed': list(removed)})
+        if version > MAX_LEASE_CHANGES:
+            self.store.delete(CHANGES, str(version - MAX_LEASE_CHANGES))
+        self._lease_version = version
+
+    def _take(self) -> Optional[int]:
+        while self._free:
+            offset = self._free.pop()
+            if offset not in self._used:
+                return offset
+        while self._cursor <= self.last:
+            offset = self._cursor
+            self._cursor += 1
+            if offset not in self._used and offset not in self.reserved:
+                return offset
+        return None
+
+    # ===== 임대 =====
+    def allocate(self, owner: str) -> str:
+        """빈 주소 하나를 owner에게 임대 (프리픽스 없는 주소 반환)"""
+        return self.allocate_many([owner])[0]
+
+    def allocate_many(self, owners: List[str]) -> List[str]:
+        """owners 순서대로 주소를 한 트랜잭션으로 임대 (하나라도 부족하면 전부 취소)"""
+        return self.swap({}, owners)
+
+    def swap(self, release: Dict[str, Optional[str]], owners: List[str]) -> List[str]:
+        """release 임대 반납과 owners 할당을 한 트랜잭션으로 (할당이 실패하면 반납도 취소)
+
+        반납한 주소는 같은 호출의 할당에 다시 쓰일 수 있음 (꽉 찬 풀에서 맞바꾸기)
+        """
+        with self._lock, self.store.transaction():
+            self._refresh()
+            cursor, free, taken, released = self._cursor, list(self._free), [], []
+            try:
+                self._release(release, released)
+                leases = self._allocate(owners, taken)
+            except BaseException:
+                # 트랜잭션이 롤백되므로 메모리 상태도 _refresh 직후로 되돌림
+                self._cursor, self._free = cursor, free
+                self._used.difference_update(taken)
+                self._used.update(self._offset(address) for address in released)
+                raise
+            if released or leases:
+                self._bump(leases, released)
+        return list(leases)
+
+    def _allocate(self, owners: List[str], taken: List[int]) -> Dict[str, dict]:
+        """owners에게 주소 임대 (잠금/트랜잭션 안에서 호출), 사용 중으로 표시한 오프셋은 taken에 추가"""
+        now = time.time()
+        leases = {}
+        for owner in owners:
+            while True:
+                offset = self._take()
+                if offset is None:
+                    raise AddressPoolExhausted(f"{self.network}에 사용 가능한 주소가 없습니다")
+                address = self._address(offset)
+                self._used.add(offset)
+                taken.append(offset)
+                # 범위가 겹치는 다른 풀이 같은 프로세스에서 임대한 경우
+                if self.store.get(LEASES, address) is None:
+                    break
+            leases[address] = {'ip': address, 'pool': str(self.network), 'owner': owner, 'created': now}
+        if leases:
+            self.store.put_many(LEASES, leases)
+        return leases
+
+    def _release(self, leases: Dict[str, Optional[str]], released: List[str]) -> List[str]:
+        """{주소: 소유자} 임대 반납 (잠금/트랜잭션 안에서 호출), 반납된 주소는 released에 추가"""
+        for address, owner in leases.items():
+            offset = self._offset(address)
+            address = self._address(offset)
+            lease = self.store.get(LEASES, address)
+            if lease is None or (owner is not None and lease.get('owner') != owner):
+                continue
+            released.append(address)
+            self._used.discard(offset)
+            if self._in_range(offset):
+                self._free.append(offset)
+        if released:
+            self.store.delete(LEASES, *released)
+        return released
+
+    def reserve(self, address: str, owner: str) -> bool:
+        """특정 주소를 owner에게 임대 (이미 owner의 것이면 그대로, 다른 소유자면 False)"""
+        offset = self._offset(address)
+        address = self._address(offset)
+        with self._lock, self.store.transaction():
+            self._refresh()
+            lease = self.store.get(LEASES, address)
+            if lease is not None:
+                return lease.get('owner') == owner
+            self.store.put(LEASES, address, {
+                'ip': address, 'pool': str(self.network), 'owner': owner, 'created': time.time()
+            })
+            self._bump([address])
+            self._used.add(offset)
+        return True
+
+    def adopt(self, leases: Dict[str, str]) -> List[str]:
+        """기존 할당 {주소: 소유자}를 한 트랜잭션으로 예약, 다른 소유자와 겹친 주소 목록 반환"""
+        conflicts, added = [], []
+        with self._lock, self.store.transaction():
+            self._refresh()
+            for address, owner in leases.items():
+                offset = self._offset(address)
+                address = self._address(offset)
+                lease = self.store.get(LEASES, address)
+                if lease is not None:
+                    if lease.get('owner') != owner:
+                        conflicts.append(address)
+                    continue
+                self.store.put(LEASES, address, {
+                    'ip': address, 'pool': str(self.network), 'owner': owner, 'created': time.time()
+                })
+                self._used.add(offset)
+                added.append(address)
+            if added:
+                self._bump(added)
+        return conflicts
+
+    def contains(self, address: str) -> bool:
+        ip = ipaddress.ip_address(str(address).split('/')[0])
+        return ip.version == self.network.version and ip in self.network
+
+    def release(self, address: str, owner: str = None) -> bool:
+        """임대 반납 (owner를 주면 소유자가 같을 때만)"""
+        return bool(self.release_many({address: owner}))
+
+    def release_many(self, leases: Dict[str, Optional[str]]) -> List[str]:
+        """{주소: 소유자} 임대를 한 트랜잭션으로 반납 (소유자가 None이면 확인 안 함), 반납된 주소 목록"""
+        with self._lock, self.store.transaction():
+            self._refresh()
+            released = self._release(leases, [])
+            if released:
+                self._bump(removed=released)
+        return released
+
+    def release_owner(self, owner: str) -> List[str]:
+        """owner의 임대를 모두 반납"""
+        return self.release_many({
+            address: owner for address, lease in self.leases().items() if lease.get('owner') == owner
+        })
+
+    def owner_of(self, address: str) -> Optional[str]:
+        lease = self.store.get(LEASES, self._address(self._offset(address)))
+        return lease.get('owner') if lease else None
+
+    def leases(self) -> Dict[str, dict]:
+        """이 풀 범위의 임대 {주소: 임대 정보}"""
+        return {
+            address: lease for address, lease in self.store.load(LEASES).items()
+            if ipaddress.ip_address(address).version == self.network.version
+            and ipaddress.ip_address(address) in self.network
+        }
+
+    def status(self) -> Dict:
+        with self._lock, self.store.transaction():
+            self._refresh()
+            used = sum(1 for offset in self._used if self._in_range(offset))
+        return {'network': str(self.network), 'size': self.size, 'used': used, 'free': self.size - used}
+
+
+_pools: Dict[tuple, AddressPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_address_pool(network: str, store: StateStore = None, **options) -> AddressPool:
+    """프리픽스별 공유 풀 (프로세스 내 모듈들이 같은 free-list 사용)"""
+    store = store or get_state_store()
+    key = (store.path, str(ipaddress.ip_network(network, strict=False)), repr(sorted(options.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = AddressPool(network, store, **options)
+        return _pools[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주소 풀 임대 조회")
+    parser.add_argument('--db')
+    parser.add_argument('network')
+    args = parser.parse_args()
+
+    pool = AddressPool(args.network, get_state_store(args.db), first=0, last=None)
+    for address, lease in sorted(pool.leases().items(), key=lambda item: ipaddress.ip_address(item[0])):
+        print(f"{address:<40} {lease.get('owner')}")
+    print(pool.status())
+
+
+if __name__ == "__main__":
+    main()
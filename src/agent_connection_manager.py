@@ -6,41 +6,53 @@
 - 연결 상태 모니터링
 """
 
-import os
-import json
-import subprocess
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
 import hashlib
 import threading
 
+from address_pool import get_address_pool
+from command_batch import CommandBatch
+from dongle_inventory import discover_usb_interfaces
+from event_log import get_logger
+from state_store import StateCollection, get_state_store
+from wg_keys import get_key_pool
+from wg_telemetry import get_telemetry
+
+log = get_logger('agent_connection')
+
 class AgentConnectionManager:
     def __init__(self):
         self.config_file = "/home/proxy/agent_connections.json"
         self.agents = {}
+        # 감지된 USB 동글에 VPN 인터페이스를 순서대로 분배
+        dongles = discover_usb_interfaces()
         self.vpn_interfaces = [
-            {"interface": "wg0", "port": 51820, "subnet": "10.0.0", "dongle": "enp0s21f0u4"},
-            {"interface": "wg1", "port": 51821, "subnet": "10.0.1", "dongle": "enp0s21f0u3"},
-            {"interface": "wg2", "port": 51822, "subnet": "10.0.2", "dongle": "enp0s21f0u4"},
-            {"interface": "wg3", "port": 51823, "subnet": "10.0.3", "dongle": "enp0s21f0u3"},
-            {"interface": "wg4", "port": 51824, "subnet": "10.0.4", "dongle": "enp0s21f0u4"},
-            {"interface": "wg5", "port": 51825, "subnet": "10.0.5", "dongle": "enp0s21f0u3"},
+            {"interface": f"wg{i}", "port": 51820 + i, "subnet": f"10.0.{i}",
+             "dongle": dongles[i % len(dongles)] if dongles else None}
+            for i in range(6)
         ]
+        self.state = StateCollection(get_state_store(), 'agents', self.config_file, log=log)
+        self.telemetry = get_telemetry()
+        self.keys = get_key_pool()
         self.load_agents()
         
     def load_agents(self):
-        """에이전트 정보 로드"""
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                self.agents = json.load(f)
-        else:
-            self.agents = {}
-    
-    def save_agents(self):
-        """에이전트 정보 저장"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.agents, f, indent=2)
+        """에이전트 정보 로드 (기존 JSON 파일은 상태 저장소로 이전) 후 IP 임대 예약"""
+        self.agents = self.state.load()
+        for vpn in self.vpn_interfaces:
+            pool = self.address_pool(vpn['subnet'])
+            conflicts = pool.adopt({
+                agent['ip_address']: self.lease_owner(agent_id)
+                for agent_id, agent in self.agents.items() if pool.contains(agent['ip_address'])
+            })
+            if conflicts:
+                log(f"다른 모듈과 겹치는 에이전트 IP: {', '.join(conflicts)}", "WARNING", event='address_conflict')
+    
+    def save_agents(self, *agent_ids):
+        """에이전트 정보 저장 - agent_ids가 있으면 해당 레코드만"""
+        self.state.save(self.agents, agent_ids or None)
     
     def assign_agent(self, agent_id: str, agent_name: str = None) -> Dict:
         """새 에이전트에 VPN 인터페이스 자동 할당"""
@@ -60,15 +72,13 @@ class AgentConnectionManager:
             return self.assign_agent(agent_id, agent_name)  # 재시도
         
         # 키 생성
-        private_key = subprocess.run(['wg', 'genkey'], 
-                                    capture_output=True, text=True).stdout.strip()
-        public_key = subprocess.run(['wg', 'pubkey'], input=private_key,
-                                   capture_output=True, text=True).stdout.strip()
+        private_key, public_key = self.keys.take()
         
         # IP 할당
-        next_ip = self.get_next_ip(available['subnet'])
+        next_ip = self.get_next_ip(available['subnet'], agent_id)
         
         # 에이전트 등록
+        previous = self.agents.get(agent_id)
         self.agents[agent_id] = {
             'name': agent_name or f'agent_{agent_id[:8]}',
             'interface': available['interface'],
@@ -83,18 +93,33 @@ class AgentConnectionManager:
             'traffic': {'rx': 0, 'tx': 0}
         }
         
-        # WireGuard에 피어 추가
-        self.add_peer_to_wireguard(agent_id)
-        self.save_agents()
+        # WireGuard에 피어 추가 (실패하면 레코드와 임대를 되돌림)
+        pool = self.address_pool(available['subnet'])
+        applied = False
+        try:
+            self.add_peer_to_wireguard(agent_id)
+            applied = True
+            self.save_agents(agent_id)
+        except Exception:
+            # 새 키로 새 인터페이스에 추가한 피어라 재할당이어도 제거
+            if applied:
+                try:
+                    self.remove_peer_from_wireguard(agent_id)
+                except Exception as e:
+                    log(f"할당 취소 중 피어 제거 실패: {agent_id} ({e})", "WARNING", agent_id=agent_id)
+            if previous is None:
+                del self.agents[agent_id]
+            else:
+                self.agents[agent_id] = previous
+            pool.release(next_ip, self.lease_owner(agent_id))
+            raise
         
         # 클라이언트 설정 생성
         config = self.generate_agent_config(agent_id)
         
-        print(f"✅ 에이전트 {agent_name} 할당됨:")
-        print(f"   인터페이스: {available['interface']}")
-        print(f"   포트: {available['port']}")
-        print(f"   IP: {next_ip}")
-        print(f"   동글: {available['dongle']}")
+        log(f"✅ 에이전트 {agent_name} 할당됨: {available['interface']} (포트 {available['port']}), "
+            f"IP {next_ip}, 동글 {available['dongle']}", event='agent_assign', agent_id=agent_id,
+            interface=available['interface'], ip=next_ip, dongle=available['dongle'])
         
         return {
             'agent_id': agent_id,
@@ -106,39 +131,42 @@ class AgentConnectionManager:
             }
         }
     
-    def get_next_ip(self, subnet: str) -> str:
-        """서브넷에서 다음 사용 가능한 IP 찾기"""
-        used_ips = []
-        for agent in self.agents.values():
-            if agent['ip_address'].startswith(subnet):
-                used_ips.append(int(agent['ip_address'].split('.')[3].split('/')[0]))
-        
-        for i in range(2, 254):
-            if i not in used_ips:
-                return f"{subnet}.{i}"
-        
-        raise Exception(f"No available IPs in subnet {subnet}")
+    @staticmethod
+    def address_pool(subnet: str):
+        """인터페이스 서브넷의 주소 풀 (.2 ~ .253)"""
+        return get_address_pool(f"{subnet}.0/24", first=2, last=253)
+    
+    @staticmethod
+    def lease_owner(agent_id: str) -> str:
+        return f"agent:{agent_id}"
+    
+    def get_next_ip(self, subnet: str, agent_id: str) -> str:
+        """서브넷 주소 풀에서 agent_id에게 다음 IP 임대"""
+        return self.address_pool(subnet).allocate(self.lease_owner(agent_id))
     
-    def add_peer_to_wireguard(self, agent_id: str):
-        """WireGuard에 피어 추가"""
+    def add_peer_to_wireguard(self, agent_id: str, batch: CommandBatch = None):
+        """WireGuard에 피어 추가 (batch가 있으면 등록만, 없으면 즉시 실행)"""
         agent = self.agents[agent_id]
-        cmd = f"wg set {agent['interface']} peer {agent['public_key']} allowed-ips {agent['ip_address']}"
-        subprocess.run(cmd.split(), check=True)
+        commands = batch or CommandBatch()
+        commands.wg_peer(agent['interface'], agent['public_key'], allowed_ips=agent['ip_address'])
+        if batch is None:
+            commands.flush()
     
-    def remove_peer_from_wireguard(self, agent_id: str):
-        """WireGuard에서 피어 제거"""
+    def remove_peer_from_wireguard(self, agent_id: str, batch: CommandBatch = None):
+        """WireGuard에서 피어 제거 (batch가 있으면 등록만, 없으면 즉시 실행)"""
         agent = self.agents[agent_id]
-        cmd = f"wg set {agent['interface']} peer {agent['public_key']} remove"
-        subprocess.run(cmd.split(), check=True)
+        commands = batch or CommandBatch()
+        commands.wg_peer(agent['interface'], agent['public_key'], remove=True)
+        if batch is None:
+            commands.flush()
     
     def generate_agent_config(self, agent_id: str) -> str:
         """에이전트용 WireGuard 설정 생성"""
         agent = self.agents[agent_id]
         
-        # 서버 공개키 가져오기
-        result = subprocess.run(['wg', 'show', agent['interface'], 'public-key'],
-                              capture_output=True, text=True)
-        server_public_key = result.stdout.strip()
+        # 서버 공개키 가져오기 (공유 상태 스냅샷)
+        interface = self.telemetry.snapshot()['interfaces'].get(agent['interface'])
+        server_public_key = interface['public_key'] if interface else ''
         
         config = f"""[Interface]
 PrivateKey = {agent['private_key']}
@@ -160,17 +188,12 @@ PersistentKeepalive = 25"""
         
         agent = self.agents[agent_id]
         
-        # WireGuard 통계 조회
-        result = subprocess.run(['wg', 'show', agent['interface'], 'dump'],
-                              capture_output=True, text=True)
-        
-        for line in result.stdout.split('\n'):
-            parts = line.split('\t')
-            if len(parts) > 3 and parts[0] == agent['public_key']:
-                agent['last_handshake'] = parts[4] if parts[4] != '0' else 'Never'
-                agent['traffic']['rx'] = int(parts[5])
-                agent['traffic']['tx'] = int(parts[6])
-                break
+        # WireGuard 통계 조회 (모든 인터페이스를 한 번에 읽은 공유 스냅샷)
+        peer = self.telemetry.peer(agent['public_key'])
+        if peer:
+            agent['last_handshake'] = str(peer['latest_handshake']) if peer['latest_handshake'] else 'Never'
+            agent['traffic']['rx'] = peer['rx']
+            agent['traffic']['tx'] = peer['tx']
         
         return agent
     
@@ -199,13 +222,20 @@ PersistentKeepalive = 25"""
             if (now - last_seen).total_seconds() > threshold_minutes * 60:
                 to_remove.append(agent_id)
         
+        # 인터페이스별 wg set 한 번으로 제거
+        batch = CommandBatch()
+        for agent_id in to_remove:
+            log(f"🗑️ 비활성 에이전트 제거: {agent_id}", event='agent_remove', agent_id=agent_id)
+            self.remove_peer_from_wireguard(agent_id, batch)
+        batch.flush()
         for agent_id in to_remove:
-            print(f"🗑️ 비활성 에이전트 제거: {agent_id}")
-            self.remove_peer_from_wireguard(agent_id)
+            subnet = next(vpn['subnet'] for vpn in self.vpn_interfaces
+                          if vpn['interface'] == self.agents[agent_id]['interface'])
+            self.address_pool(subnet).release(self.agents[agent_id]['ip_address'], self.lease_owner(agent_id))
             del self.agents[agent_id]
         
         if to_remove:
-            self.save_agents()
+            self.save_agents(*to_remove)
     
     def get_load_balance_info(self) -> Dict:
         """부하 분산 정보 조회"""
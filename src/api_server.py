@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Flask API 운영 서버 실행
+- waitress가 설치되어 있으면 waitress (멀티 스레드 WSGI 서버)
+- 없으면 werkzeug 개발 서버를 threaded 모드로 (디버그/리로더 끔)
+"""
+
+from typing import Callable
+
+DEFAULT_THREADS = 16
+
+
+def serve(app, host: str = '0.0.0.0', port: int = 5000, threads: int = DEFAULT_THREADS, log: Callable = None):
+    """app을 운영 모드로 실행 (반환하지 않음)"""
+    log = log or (lambda message, level="INFO", **fields: print(message))
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        log(f"waitress 없음 - werkzeug threaded 서버로 실행 ({host}:{port})", "WARNING", event='api_server')
+        app.run(host=host, port=port, threaded=True, debug=False, use_reloader=False)
+        return
+    log(f"waitress 서버 실행 ({host}:{port}, 스레드 {threads}개)", event='api_server')
+    waitress_serve(app, host=host, port=port, threads=threads)
@@ -3,6 +3,7 @@
 동글 인터넷 연결 상태 확인 및 APN 설정
 """
 
+import sys
 import requests
 import subprocess
 import json
@@ -10,14 +11,25 @@ import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
+from dongle_inventory import discover_usb_interfaces, guess_gateway
+from health_prober import get_interface_ipv4
+
 def log(message):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}")
 
-def get_dongle_status():
+def dongle_targets(interfaces=None):
+    """확인할 동글 (인터페이스, 동글 웹 인터페이스 주소) 목록 - 지정이 없으면 USB 동글 자동 감지"""
+    targets = []
+    for interface in interfaces or discover_usb_interfaces():
+        ip = get_interface_ipv4(interface)
+        targets.append((interface, guess_gateway(ip) if ip else None))
+    return targets
+
+def get_dongle_status(gateway):
     """동글 상태 확인"""
     try:
         # 동글 웹 인터페이스 접근
-        response = requests.get("http://192.168.16.1/api/device/information", 
+        response = requests.get(f"http://{gateway}/api/device/information", 
                               timeout=10)
         if response.status_code == 200:
             # XML 파싱
@@ -34,11 +46,11 @@ def get_dongle_status():
     
     return False
 
-def check_internet_connectivity():
+def check_internet_connectivity(interface):
     """동글을 통한 인터넷 연결 확인"""
     try:
         # 동글 인터페이스를 통해 외부 접근 시도
-        cmd = ["curl", "--interface", "enp0s21f0u4", 
+        cmd = ["curl", "--interface", interface, 
                "--connect-timeout", "5", "-s", "http://httpbin.org/ip"]
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
         
@@ -55,11 +67,11 @@ def check_internet_connectivity():
         log(f"인터넷 연결 테스트 실패: {e}")
         return False, None
 
-def activate_dongle_connection():
+def activate_dongle_connection(gateway):
     """동글 연결 활성화 시도"""
     try:
         # 연결 활성화 API 호출
-        session_info = requests.get("http://192.168.16.1/api/webserver/SesTokInfo", timeout=5)
+        session_info = requests.get(f"http://{gateway}/api/webserver/SesTokInfo", timeout=5)
         if session_info.status_code != 200:
             log("세션 정보 획득 실패")
             return False
@@ -76,7 +88,7 @@ def activate_dongle_connection():
         
         # 연결 시작
         connect_data = '<?xml version="1.0" encoding="UTF-8"?><request><Action>1</Action></request>'
-        response = requests.post("http://192.168.16.1/api/dialup/dial", 
+        response = requests.post(f"http://{gateway}/api/dialup/dial", 
                                data=connect_data, headers=headers, timeout=10)
         
         if response.status_code == 200:
@@ -90,16 +102,20 @@ def activate_dongle_connection():
         log(f"동글 연결 활성화 오류: {e}")
         return False
 
-def main():
-    log("동글 인터넷 연결 확인 시작...")
+def check_dongle(interface, gateway):
+    """동글 하나 확인 및 필요 시 연결 활성화"""
+    log(f"=== {interface} (동글 {gateway}) ===")
+    if not gateway:
+        log("동글 인터페이스에 IP가 없습니다.")
+        return
     
     # 1. 동글 상태 확인
-    if not get_dongle_status():
+    if not get_dongle_status(gateway):
         log("동글에 접근할 수 없습니다.")
         return
     
     # 2. 인터넷 연결 확인
-    connected, external_ip = check_internet_connectivity()
+    connected, external_ip = check_internet_connectivity(interface)
     if connected:
         log(f"✅ 동글 인터넷 연결 활성화됨! 외부 IP: {external_ip}")
         return
@@ -108,12 +124,12 @@ def main():
     
     # 3. 연결 활성화 시도
     log("동글 연결 활성화 시도...")
-    if activate_dongle_connection():
+    if activate_dongle_connection(gateway):
         # 연결 활성화 후 잠시 대기
         time.sleep(5)
         
         # 다시 인터넷 연결 확인
-        connected, external_ip = check_internet_connectivity()
+        connected, external_ip = check_internet_connectivity(interface)
         if connected:
             log(f"✅ 동글 연결 활성화 성공! 외부 IP: {external_ip}")
         else:
@@ -121,5 +137,16 @@ def main():
     else:
         log("❌ 동글 연결 활성화 실패")
 
+def main():
+    log("동글 인터넷 연결 확인 시작...")
+    
+    targets = dongle_targets(sys.argv[1:])
+    if not targets:
+        log("연결된 USB 동글이 없습니다.")
+        return
+    
+    for interface, gateway in targets:
+        check_dongle(interface, gateway)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+네트워크 명령 배치 실행
+- 하나의 논리적 변경에 속한 명령을 모아 도구별로 프로세스 한 번씩만 실행
+  - ip 명령       → ip -batch -
+  - iptables 규칙 → iptables-restore --noflush (테이블별 COMMIT)
+  - wg set        → 인터페이스별 wg set 한 번 (peer 절 여러 개)
+- dry_run: 실행하지 않고 로그만, record: 실행하지 않고 recorded에 기록 (테스트용)
+- 기본 모드는 DONGLE_COMMAND_MODE 환경 변수로 변경 가능
+"""
+
+import os
+import shlex
+import subprocess
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+RUN = 'run'
+DRY_RUN = 'dry_run'
+RECORD = 'record'
+
+DEFAULT_MODE = os.environ.get('DONGLE_COMMAND_MODE', RUN)
+
+
+class CommandError(Exception):
+    """배치 명령 실행 실패"""
+
+    def __init__(self, argv: List[str], stderr: str):
+        self.argv = argv
+        self.stderr = stderr
+        super().__init__(f"{' '.join(argv)} 실패: {stderr}")
+
+
+class CommandBatch:
+    """ip/iptables/wg 명령 모음 (with 블록이 끝나면 flush)"""
+
+    def __init__(self, mode: str = None, ip_force: bool = False, log: Callable = None):
+        self.mode = mode or DEFAULT_MODE
+        self.ip_force = ip_force
+        self.log = log or (lambda message, level="INFO": None)
+
+        self.recorded: List[Tuple[List[str], Optional[str]]] = []
+        self.executions = 0
+        self._ip: List[str] = []
+        self._iptables: Dict[str, List[str]] = OrderedDict()
+        self._wg: Dict[str, Dict[str, Dict]] = OrderedDict()
+        self._wg_save: List[str] = []
+
+    def __enter__(self) -> 'CommandBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        """아직 실행하지 않은 명령 수"""
+        return (len(self._ip) + sum(len(rules) for rules in self._iptables.values())
+                + sum(len(peers) for peers in self._wg.values()) + len(self._wg_save))
+
+    # ===== 명령 등록 =====
+    def ip(self, command: str):
+        """ip 명령 (앞의 'ip' 없이, 예: 'route replace default via ... table 200')"""
+        self._ip.append(command)
+
+    def iptables(self, rule: str, table: str = 'filter'):
+        """iptables 규칙 (예: '-A FORWARD -i wg0 -j ACCEPT')"""
+        self._iptables.setdefault(table, []).append(rule)
+
+    def wg_peer(self, interface: str, public_key: str, allowed_ips: str = None,
+                remove: bool = False, **options):
+        """wg set 피어 절 - 같은 피어를 여러 번 등록하면 마지막 옵션이 우선"""
+        peer = self._wg.setdefault(interface, OrderedDict()).setdefault(public_key, {})
+        if remove:
+            peer.clear()
+            peer['remove'] = True
+            return
+        peer.pop('remove', None)
+        if allowed_ips is not None:
+            peer['allowed-ips'] = allowed_ips
+        for key, value in options.items():
+            peer[key.replace('_', '-')] = value
+
+    def wg_save(self, interface: str):
+        """wg set 적용 후 wg-quick save (인터페이스당 한 번)"""
+        if interface not in self._wg_save:
+            self._wg_save.append(interface)
+
+    # ===== 실행 =====
+    def plan(self) -> List[Tuple[List[str], Optional[str]]]:
+        """실행할 (argv, stdin) 목록"""
+        plan = []
+        if self._ip:
+            argv = ['ip'] + (['-force'] if self.ip_force else []) + ['-batch', '-']
+            plan.append((argv, '\n'.join(self._ip) + '\n'))
+        if self._iptables:
+            lines = []
+            for table, rules in self._iptables.items():
+                lines += [f"*{table}"] + rules + ["COMMIT"]
+            plan.append((['iptables-restore', '--noflush'], '\n'.join(lines) + '\n'))
+        for interface, peers in self._wg.items():
+            argv = ['wg', 'set', interface]
+            for public_key, options in peers.items():
+                argv += ['peer', public_key]
+                for key, value in options.items():
+                    argv += [key] if value is True else [key, str(value)]
+            plan.append((argv, None))
+        for interface in self._wg_save:
+            plan.append((['wg-quick', 'save', interface], None))
+        return plan
+
+    def shell(self) -> List[str]:
+        """plan을 셸 명령 문자열로 (wg-quick PostUp/PreDown 등에 사용)"""
+        commands = []
+        for argv, stdin in self.plan():
+            command = ' '.join(shlex.quote(arg) for arg in argv)
+            if stdin is not None:
+                lines = ' '.join(shlex.quote(line) for line in stdin.splitlines())
+                command = f"printf '%s\\n' {lines} | {command}"
+            commands.append(command)
+        return commands
+
+    def clear(self):
+        self._ip.clear()
+        self._iptables.clear()
+        self._wg.clear()
+        self._wg_save.clear()
+
+    def flush(self) -> int:
+        """모은 명령 실행 후 비움, 실행한 프로세스 수 반환"""
+        plan = self.plan()
+        self.clear()
+        for argv, stdin in plan:
+            if self.mode == RECORD:
+                self.recorded.append((argv, stdin))
+                continue
+            if self.mode == DRY_RUN:
+                self.log(f"[dry-run] {' '.join(argv)}" + (f"\n{stdin.rstrip()}" if stdin else ""))
+                continue
+            try:
+                result = subprocess.run(argv, input=stdin, capture_output=True, text=True)
+            except FileNotFoundError:
+                raise CommandError(argv, f"{argv[0]} 명령을 찾을 수 없음")
+            self.executions += 1
+            if result.returncode != 0:
+                if argv[0] == 'wg-quick':
+                    # 설정 파일 저장 실패는 이미 적용된 피어에 영향 없음
+                    self.log(f"{' '.join(argv)} 실패: {result.stderr.strip()}", "WARNING")
+                    continue
+                raise CommandError(argv, result.stderr.strip())
+        return len(plan)
@@ -6,137 +6,398 @@ WireGuard 클라이언트의 IP 할당을 동적으로 관리
 
 from flask import Flask, request, jsonify
 import subprocess
-import json
 import os
 import socket
 import threading
 import time
+from collections import OrderedDict
 from datetime import datetime
 
+from address_pool import get_address_pool
+from api_server import serve
+from command_batch import CommandBatch, CommandError
+from event_log import LOG_DIR, get_event_log
+from job_queue import FAILED, JobQueue, JobQueueFull
+from state_store import StateCollection, get_state_store
+from wg_telemetry import get_telemetry
+
 app = Flask(__name__)
+events = get_event_log(os.path.join(LOG_DIR, "dongle_api.log"))
+log = events.logger('dongle_api')
 
 # 설정
-WG_CONFIG_PATH = "/etc/wireguard/wg0.conf"
+WG_INTERFACE = "wg0"
+WG_CONFIG_PATH = f"/etc/wireguard/{WG_INTERFACE}.conf"
 CLIENT_DATA_FILE = "/home/proxy/clients.json"
 BASE_IP = "10.0.0"
 START_IP = 10  # 10.0.0.10부터 시작
+TUNNEL_NETWORK = f"{BASE_IP}.0/24"
+JOB_WORKERS = 4
+SYNC_TIMEOUT = 30  # 동기 요청이 작업 완료를 기다리는 최대 시간 (넘으면 202 + 작업 ID)
+MAX_JOB_WAIT = 60
+TELEMETRY_TTL = 2.0  # /api/wireguard/status 스냅샷 재사용 시간 (초)
+MAX_TOMBSTONES = 10000  # ?since= 응답용으로 기억하는 삭제된 클라이언트 수
 
 class WireGuardManager:
     def __init__(self):
+        self.state = StateCollection(get_state_store(), 'wireguard_clients', CLIENT_DATA_FILE, log=log)
         self.clients = self.load_clients()
+        # VPN 인증/에이전트 관리자와 같은 임대 저장소를 쓰므로 주소가 겹치지 않음
+        self.pool = get_address_pool(TUNNEL_NETWORK, first=START_IP)
+        conflicts = self.pool.adopt({
+            client['ip']: self.lease_owner(client_id)
+            for client_id, client in self.clients.items() if client.get('ip')
+        })
+        if conflicts:
+            log(f"다른 모듈과 겹치는 클라이언트 IP: {', '.join(conflicts)}", "WARNING", event='address_conflict')
+        # 마지막으로 적용한 피어 (None이면 다음 동기화에서 인터페이스 상태를 읽음)
+        self._applied = None
+        
+        # 변경 피드 - 변경될 때마다 리비전 증가, 클라이언트별 마지막 변경 리비전을 변경 순서대로 유지
+        self.revision = self.state.store.get('wireguard_meta', 'revision') or 0
+        self._changes = OrderedDict(sorted(
+            ((client_id, client.get('rev', 0)) for client_id, client in self.clients.items()),
+            key=lambda item: item[1]
+        ))
+        self._removed = set()
+        # 이 리비전 이전의 삭제 내역은 모름 (재시작 전, 또는 오래된 삭제 기록 정리)
+        self._history_floor = self.revision
+        # 요청 스레드와 작업 워커가 같은 상태를 다루므로 변경/조회는 모두 이 잠금 안에서
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
     
     def load_clients(self):
-        """클라이언트 정보 로드"""
-        if os.path.exists(CLIENT_DATA_FILE):
-            with open(CLIENT_DATA_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def save_clients(self):
-        """클라이언트 정보 저장"""
-        with open(CLIENT_DATA_FILE, 'w') as f:
-            json.dump(self.clients, f, indent=2)
-    
-    def get_next_available_ip(self):
-        """사용 가능한 다음 IP 주소 반환"""
-        used_ips = set()
-        for client in self.clients.values():
-            if 'ip' in client:
-                ip_num = int(client['ip'].split('.')[-1])
-                used_ips.add(ip_num)
-        
-        for i in range(START_IP, 255):
-            if i not in used_ips:
-                return f"{BASE_IP}.{i}"
-        
-        raise Exception("사용 가능한 IP가 없습니다")
+        """클라이언트 정보 로드 (기존 JSON 파일은 상태 저장소로 이전)"""
+        return self.state.load()
+    
+    def save_clients(self, *client_ids):
+        """클라이언트 정보 저장 - client_ids가 있으면 해당 레코드만"""
+        self.state.save(self.clients, client_ids or None)
+    
+    # ===== 변경 피드 =====
+    def publish(self, client_ids=(), removed=()):
+        """변경/삭제된 클라이언트에 새 리비전을 붙여 저장하고 대기 중인 폴러를 깨움"""
+        with self.changed:
+            self.revision += 1
+            for client_id in client_ids:
+                self.clients[client_id]['rev'] = self.revision
+                self._removed.discard(client_id)
+            self._removed.update(removed)
+            for client_id in [*client_ids, *removed]:
+                self._changes[client_id] = self.revision
+                self._changes.move_to_end(client_id)
+            if len(self._removed) > MAX_TOMBSTONES:
+                self._trim_tombstones()
+            with self.state.store.transaction():
+                self.save_clients(*client_ids, *removed)
+                self.state.store.put('wireguard_meta', 'revision', self.revision)
+            self.changed.notify_all()
+    
+    def _trim_tombstones(self):
+        """오래된 삭제 기록 정리 (그 이전 리비전으로 묻는 폴러는 전체 목록을 다시 받음)"""
+        for client_id, rev in list(self._changes.items()):
+            if len(self._removed) <= MAX_TOMBSTONES // 2:
+                break
+            if client_id in self._removed:
+                del self._changes[client_id]
+                self._removed.discard(client_id)
+                self._history_floor = rev
+    
+    def changes_since(self, since):
+        """since 리비전 이후 변경분 - 변경 순서를 거꾸로 따라가므로 변경된 수만큼만 비용"""
+        with self.changed:
+            if since < self._history_floor:
+                return {'revision': self.revision, 'reset': True, 'clients': self.snapshot(), 'removed': []}
+            changed, removed = {}, []
+            for client_id in reversed(self._changes):
+                if self._changes[client_id] <= since:
+                    break
+                if client_id in self._removed:
+                    removed.append(client_id)
+                else:
+                    changed[client_id] = dict(self.clients[client_id])
+            return {'revision': self.revision, 'reset': False, 'clients': changed, 'removed': removed}
+    
+    def snapshot(self, client_ids=None):
+        """클라이언트 복사본 (잠금 밖에서 직렬화해도 변경 중인 레코드를 보지 않도록)"""
+        with self.lock:
+            if client_ids is None:
+                client_ids = list(self.clients)
+            return {client_id: dict(self.clients[client_id]) for client_id in client_ids if client_id in self.clients}
+    
+    def wait_for_change(self, since, timeout):
+        """리비전이 since보다 커질 때까지 최대 timeout초 대기"""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.revision > since, timeout)
+    
+    @staticmethod
+    def lease_owner(client_id):
+        return f"wireguard:{client_id}"
+    
+    def get_next_available_ip(self, client_id):
+        """주소 풀에서 client_id에게 다음 IP 임대"""
+        return self.pool.allocate(self.lease_owner(client_id))
+    
+    def held_ips(self, *client_ids):
+        """client_ids가 가진 임대 {IP: 소유자}"""
+        return {
+            self.clients[client_id]['ip']: self.lease_owner(client_id)
+            for client_id in client_ids
+            if client_id in self.clients and self.clients[client_id].get('ip')
+        }
+    
+    def release_ips(self, *client_ids):
+        """client_ids가 가진 IP를 한 번에 반납"""
+        self.pool.release_many(self.held_ips(*client_ids))
+    
+    # ===== 일괄 작업 (저장 한 번, WireGuard 적용 한 번) =====
+    def validate_new_clients(self, entries):
+        """{client_id: public_key} 검증 - 문제가 있으면 ValueError"""
+        with self.lock:
+            if not entries:
+                raise ValueError("추가할 클라이언트가 없습니다")
+            owners = {
+                client['public_key']: client_id for client_id, client in self.clients.items()
+                if client_id not in entries
+            }
+            seen = set()
+            for client_id, public_key in entries.items():
+                if not client_id or not isinstance(public_key, str) or not public_key:
+                    raise ValueError(f"클라이언트 {client_id}: public_key가 필요합니다")
+                if public_key in seen or public_key in owners:
+                    raise ValueError(f"클라이언트 {client_id}: 이미 사용 중인 public_key입니다")
+                seen.add(public_key)
+    
+    def validate_existing_clients(self, client_ids):
+        """등록된 클라이언트 ID 목록인지 검증 - 문제가 있으면 ValueError"""
+        with self.lock:
+            if not client_ids:
+                raise ValueError("대상 클라이언트가 없습니다")
+            missing = [client_id for client_id in client_ids if client_id not in self.clients]
+            if missing:
+                raise ValueError(f"클라이언트를 찾을 수 없습니다: {', '.join(missing)}")
+    
+    def add_clients(self, entries):
+        """여러 클라이언트 추가 {client_id: public_key} → {client_id: ip}"""
+        with self.lock:
+            self.validate_new_clients(entries)
+            # 다시 추가하는 클라이언트는 기존 IP 반납 후 새로 할당 (할당이 실패하면 반납도 취소)
+            ips = self.pool.swap(self.held_ips(*entries), [self.lease_owner(client_id) for client_id in entries])
+            
+            now = datetime.now().isoformat()
+            assigned = dict(zip(entries, ips))
+            for client_id, public_key in entries.items():
+                self.clients[client_id] = {
+                    'public_key': public_key,
+                    'ip': assigned[client_id],
+                    'status': 'active',
+                    'created_at': now,
+                    'last_toggle': now
+                }
+            
+            self.publish(list(entries))
+            self.update_wireguard_config()
+            for client_id, ip in assigned.items():
+                log(f"클라이언트 {client_id} 추가: {ip}", event='client_add', client_id=client_id, ip=ip)
+            return assigned
+    
+    def toggle_clients(self, client_ids):
+        """여러 클라이언트 IP 토글 → {client_id: 새 IP 또는 None}"""
+        with self.lock:
+            client_ids = list(dict.fromkeys(client_ids))
+            self.validate_existing_clients(client_ids)
+            deactivate = [client_id for client_id in client_ids if self.clients[client_id]['status'] == 'active']
+            activate = [client_id for client_id in client_ids if client_id not in deactivate]
+            # 반납과 할당을 한 트랜잭션으로 (꽉 찬 풀에서도 맞바꿀 수 있고, 할당이 실패하면 반납도 취소)
+            ips = self.pool.swap(self.held_ips(*deactivate), [self.lease_owner(client_id) for client_id in activate])
+            
+            now = datetime.now().isoformat()
+            for client_id in deactivate:
+                client = self.clients[client_id]
+                client['status'] = 'inactive'
+                client['old_ip'] = client['ip']
+                client['ip'] = None
+            for client_id, ip in zip(activate, ips):
+                client = self.clients[client_id]
+                client['status'] = 'active'
+                client['ip'] = ip
+            for client_id in client_ids:
+                self.clients[client_id]['last_toggle'] = now
+            
+            self.publish(client_ids)
+            self.update_wireguard_config()
+            for client_id in client_ids:
+                client = self.clients[client_id]
+                log(f"클라이언트 {client_id} IP 토글: {client['ip']}", event='client_toggle',
+                    client_id=client_id, ip=client['ip'], status=client['status'])
+            return {client_id: self.clients[client_id]['ip'] for client_id in client_ids}
     
+    def remove_clients(self, client_ids):
+        """여러 클라이언트 삭제 (IP 반납, 피어 제거)"""
+        with self.lock:
+            client_ids = list(dict.fromkeys(client_ids))
+            self.validate_existing_clients(client_ids)
+            self.release_ips(*client_ids)
+            for client_id in client_ids:
+                del self.clients[client_id]
+            
+            self.publish(removed=client_ids)
+            self.update_wireguard_config()
+            for client_id in client_ids:
+                log(f"클라이언트 {client_id} 삭제", event='client_remove', client_id=client_id)
+            return list(client_ids)
+    
+    # ===== 단일 작업 =====
     def add_client(self, client_id, public_key):
         """새 클라이언트 추가"""
-        ip = self.get_next_available_ip()
-        
-        self.clients[client_id] = {
-            'public_key': public_key,
-            'ip': ip,
-            'status': 'active',
-            'created_at': datetime.now().isoformat(),
-            'last_toggle': datetime.now().isoformat()
-        }
-        
-        self.save_clients()
-        self.update_wireguard_config()
-        return ip
+        return self.add_clients({client_id: public_key})[client_id]
     
     def toggle_client_ip(self, client_id):
         """클라이언트 IP 토글"""
-        if client_id not in self.clients:
-            return None, "클라이언트를 찾을 수 없습니다"
+        with self.lock:
+            if client_id not in self.clients:
+                return None, "클라이언트를 찾을 수 없습니다"
+            
+            new_ip = self.toggle_clients([client_id])[client_id]
+            return new_ip, f"클라이언트 {client_id} IP 토글 완료"
+    
+    def desired_peers(self):
+        """활성 클라이언트 피어 {public_key: allowed_ips}"""
+        return {
+            client['public_key']: f"{client['ip']}/32"
+            for client in self.clients.values()
+            if client['status'] == 'active' and client.get('ip')
+        }
+    
+    def live_peers(self):
+        """인터페이스에 적용된 피어 {public_key: allowed_ips} (wg show allowed-ips)"""
+        result = subprocess.run(['wg', 'show', WG_INTERFACE, 'allowed-ips'],
+                                capture_output=True, text=True, check=True)
+        peers = {}
+        for line in result.stdout.splitlines():
+            public_key, _, allowed_ips = line.partition('\t')
+            if public_key:
+                peers[public_key] = ','.join(allowed_ips.split()) if allowed_ips != '(none)' else ''
+        return peers
+    
+    def sync_peers(self, batch: CommandBatch = None):
+        """현재 피어와 목표 피어의 차이만 wg set으로 적용 (다른 피어 연결은 유지)"""
+        if self._applied is None:
+            self._applied = self.live_peers()
+        desired = self.desired_peers()
+        removed = [key for key in self._applied if key not in desired]
+        changed = {key: ips for key, ips in desired.items() if self._applied.get(key) != ips}
         
-        client = self.clients[client_id]
+        commands = batch or CommandBatch()
+        for public_key in removed:
+            commands.wg_peer(WG_INTERFACE, public_key, remove=True)
+        for public_key, allowed_ips in changed.items():
+            commands.wg_peer(WG_INTERFACE, public_key, allowed_ips=allowed_ips)
+        if batch is None:
+            commands.flush()
+        self._applied = desired
+        return len(changed), len(removed)
+    
+    def write_config(self):
+        """[Interface] 섹션은 유지하고 피어 섹션을 다시 써서 저장 (재시작 없음, 원자적 교체)"""
+        with open(WG_CONFIG_PATH, 'r') as f:
+            lines = f.readlines()
         
-        if client['status'] == 'active':
-            # IP 비활성화
-            client['status'] = 'inactive'
-            client['old_ip'] = client['ip']
-            client['ip'] = None
-        else:
-            # 새 IP 할당
-            new_ip = self.get_next_available_ip()
-            client['status'] = 'active'
-            client['ip'] = new_ip
+        # [Interface] 섹션만 유지
+        interface_lines = []
+        in_interface = False
         
-        client['last_toggle'] = datetime.now().isoformat()
-        self.save_clients()
-        self.update_wireguard_config()
+        for line in lines:
+            if line.strip().startswith('[Interface]'):
+                in_interface = True
+            elif line.strip().startswith('[Peer]'):
+                break
+            
+            # 피어 앞의 클라이언트 주석은 피어 섹션과 함께 다시 씀
+            if in_interface and not line.startswith('# 클라이언트:'):
+                interface_lines.append(line)
+        while interface_lines and not interface_lines[-1].strip():
+            interface_lines.pop()
+
+        # 활성 클라이언트 Peer 섹션 추가
+        peer_sections = []
+        for client_id, client in self.clients.items():
+            if client['status'] == 'active' and client.get('ip'):
+                peer_sections.extend([
+                    f"\n# 클라이언트: {client_id}\n",
+                    "[Peer]\n",
+                    f"PublicKey = {client['public_key']}\n",
+                    f"AllowedIPs = {client['ip']}/32\n"
+                ])
         
-        return client['ip'], f"클라이언트 {client_id} IP 토글 완료"
+        temp_path = WG_CONFIG_PATH + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.writelines(interface_lines)
+            f.writelines(peer_sections)
+        os.replace(temp_path, WG_CONFIG_PATH)
     
     def update_wireguard_config(self):
-        """WireGuard 설정 파일 업데이트"""
+        """피어 변경분을 실시간 적용하고 설정 파일은 따로 저장"""
+        started = time.perf_counter()
         try:
-            # 기본 인터페이스 설정 읽기
-            with open(WG_CONFIG_PATH, 'r') as f:
-                lines = f.readlines()
-            
-            # [Interface] 섹션만 유지
-            interface_lines = []
-            in_interface = False
-            
-            for line in lines:
-                if line.strip().startswith('[Interface]'):
-                    in_interface = True
-                elif line.strip().startswith('[Peer]'):
-                    break
-                
-                if in_interface:
-                    interface_lines.append(line)
-            
-            # 활성 클라이언트 Peer 섹션 추가
-            peer_sections = []
-            for client_id, client in self.clients.items():
-                if client['status'] == 'active' and client.get('ip'):
-                    peer_sections.extend([
-                        f"\n# 클라이언트: {client_id}\n",
-                        "[Peer]\n",
-                        f"PublicKey = {client['public_key']}\n",
-                        f"AllowedIPs = {client['ip']}/32\n"
-                    ])
-            
-            # 파일 쓰기
-            with open(WG_CONFIG_PATH, 'w') as f:
-                f.writelines(interface_lines)
-                f.writelines(peer_sections)
-            
-            # WireGuard 재시작
-            subprocess.run(['sudo', 'systemctl', 'restart', 'wg-quick@wg0'], check=True)
-            return True
-            
-        except Exception as e:
-            print(f"WireGuard 설정 업데이트 실패: {e}")
+            updated, removed = self.sync_peers()
+        except (CommandError, subprocess.CalledProcessError, FileNotFoundError) as e:
+            # 다음 동기화에서 실제 피어 상태를 다시 읽음
+            self._applied = None
+            log(f"WireGuard 피어 적용 실패: {e}", "ERROR", event='wireguard_apply')
             return False
+        try:
+            self.write_config()
+        except OSError as e:
+            log(f"WireGuard 설정 파일 저장 실패 (피어는 적용됨): {e}", "WARNING", event='wireguard_apply')
+        log(f"WireGuard 피어 적용: {updated}개 추가/변경, {removed}개 제거", event='wireguard_apply',
+            updated=updated, removed=removed, duration_ms=round((time.perf_counter() - started) * 1000, 1))
+        return True
 
 # WireGuard 매니저 인스턴스
 wg_manager = WireGuardManager()
+# 피어 변경은 wg0 단위로 직렬화 (HTTP 스레드는 작업 완료를 기다리지 않아도 됨)
+jobs = JobQueue(workers=JOB_WORKERS, log=log)
+# 같은 프로세스의 VPN 인증/에이전트 관리자와 수집기 하나를 공유
+telemetry = get_telemetry(TELEMETRY_TTL, log=log)
+
+def wants_async():
+    """?async=1 또는 JSON 본문의 "async": true"""
+    if request.args.get('async', type=int):
+        return True
+    data = request.get_json(silent=True)
+    return isinstance(data, dict) and bool(data.get('async'))
+
+def job_response(job, render):
+    """작업 결과 응답 - 아직 끝나지 않았으면 202와 작업 ID"""
+    if not job.done:
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'state': job.state,
+            'status_url': f"/api/jobs/{job.job_id}",
+            'timestamp': datetime.now().isoformat()
+        }), 202
+    if job.state == FAILED:
+        return jsonify({
+            'success': False,
+            'job_id': job.job_id,
+            'error': job.error,
+            'timestamp': datetime.now().isoformat()
+        }), 500
+    return jsonify({**render(job.result), 'success': True, 'job_id': job.job_id,
+                    'timestamp': datetime.now().isoformat()})
+
+def submit_job(kind, func, *args, resource=WG_INTERFACE):
+    """작업 등록 - 동기 요청이면 SYNC_TIMEOUT까지 완료를 기다림"""
+    job = jobs.submit(kind, func, *args, resource=resource)
+    if not wants_async():
+        job.wait(SYNC_TIMEOUT)
+    return job
+
+@app.errorhandler(JobQueueFull)
+def job_queue_full(e):
+    return jsonify({'success': False, 'error': str(e), 'timestamp': datetime.now().isoformat()}), 503
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -145,70 +406,192 @@ def health_check():
 
 @app.route('/api/clients', methods=['GET'])
 def get_clients():
-    """모든 클라이언트 목록 조회"""
-    return jsonify(wg_manager.clients)
+    """클라이언트 목록 조회
+    
+    - ETag(리비전) 지원: If-None-Match가 같으면 304
+    - ?offset=&limit=: 페이지 단위 조회
+    - ?since=<rev>[&wait=<초>]: 그 이후 변경/삭제분만 (wait가 있으면 변경될 때까지 롱 폴링)
+    """
+    since = request.args.get('since', type=int)
+    if since is not None:
+        wait = min(request.args.get('wait', 0, type=float), MAX_JOB_WAIT)
+        if wait > 0:
+            wg_manager.wait_for_change(since, wait)
+        response = jsonify(wg_manager.changes_since(since))
+        response.set_etag(str(wg_manager.revision))
+        return response
+    
+    revision = str(wg_manager.revision)
+    if request.if_none_match.contains(revision):
+        response = app.response_class(status=304)
+        response.set_etag(revision)
+        return response
+    
+    limit = request.args.get('limit', type=int)
+    if limit is None:
+        # 페이지 파라미터가 없으면 기존 형식 그대로 (toggle_dongle.py list 호환)
+        response = jsonify(wg_manager.snapshot())
+    else:
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        with wg_manager.lock:
+            client_ids = list(wg_manager.clients)
+            page = wg_manager.snapshot(client_ids[offset:offset + max(limit, 0)])
+        next_offset = offset + len(page)
+        response = jsonify({
+            'revision': int(revision),
+            'total': len(client_ids),
+            'clients': page,
+            'next_offset': next_offset if next_offset < len(client_ids) else None
+        })
+    response.set_etag(revision)
+    return response
 
 @app.route('/api/clients/<client_id>/toggle', methods=['POST'])
 def toggle_client(client_id):
-    """클라이언트 IP 토글"""
-    try:
-        new_ip, message = wg_manager.toggle_client_ip(client_id)
-        return jsonify({
-            'success': True,
-            'client_id': client_id,
-            'new_ip': new_ip,
-            'message': message,
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': datetime.now().isoformat()
-        }), 500
+    """클라이언트 IP 토글 (?async=1이면 작업 ID를 바로 반환)"""
+    job = submit_job('client_toggle', wg_manager.toggle_client_ip, client_id)
+    return job_response(job, lambda result: {
+        'client_id': client_id,
+        'new_ip': result[0],
+        'message': result[1]
+    })
 
 @app.route('/api/clients/<client_id>', methods=['POST'])
 def add_client(client_id):
-    """새 클라이언트 추가"""
+    """새 클라이언트 추가 (?async=1이면 작업 ID를 바로 반환)"""
+    data = request.get_json(silent=True)
+    if not data or 'public_key' not in data:
+        return jsonify({'error': 'public_key가 필요합니다'}), 400
+    
+    job = submit_job('client_add', wg_manager.add_client, client_id, data['public_key'])
+    return job_response(job, lambda ip: {
+        'client_id': client_id,
+        'assigned_ip': ip,
+        'message': f'클라이언트 {client_id} 추가 완료'
+    })
+
+def bulk_client_ids():
+    """일괄 요청 본문의 client_ids 목록"""
+    data = request.get_json(silent=True) or {}
+    client_ids = data.get('client_ids')
+    if not isinstance(client_ids, list) or not all(isinstance(client_id, str) for client_id in client_ids):
+        raise ValueError("client_ids 목록이 필요합니다")
+    return client_ids
+
+@app.route('/api/clients/bulk', methods=['POST'])
+def add_clients_bulk():
+    """여러 클라이언트 추가 - {"clients": [{"client_id": ..., "public_key": ...}, ...]}"""
+    data = request.get_json(silent=True) or {}
+    entries = {}
     try:
-        data = request.get_json()
-        if not data or 'public_key' not in data:
-            return jsonify({'error': 'public_key가 필요합니다'}), 400
-        
-        ip = wg_manager.add_client(client_id, data['public_key'])
-        return jsonify({
-            'success': True,
-            'client_id': client_id,
-            'assigned_ip': ip,
-            'message': f'클라이언트 {client_id} 추가 완료',
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'timestamp': datetime.now().isoformat()
-        }), 500
+        clients = data.get('clients')
+        if not isinstance(clients, list):
+            raise ValueError("clients 목록이 필요합니다")
+        for entry in clients:
+            client_id = entry.get('client_id') if isinstance(entry, dict) else None
+            if not client_id or client_id in entries:
+                raise ValueError(f"client_id가 없거나 중복되었습니다: {client_id}")
+            entries[client_id] = entry.get('public_key')
+        wg_manager.validate_new_clients(entries)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    job = submit_job('client_add_bulk', wg_manager.add_clients, entries)
+    return job_response(job, lambda assigned: {
+        'assigned_ips': assigned,
+        'message': f'클라이언트 {len(assigned)}개 추가 완료'
+    })
+
+@app.route('/api/clients/bulk/toggle', methods=['POST'])
+def toggle_clients_bulk():
+    """여러 클라이언트 IP 토글 - {"client_ids": [...]}"""
+    try:
+        client_ids = bulk_client_ids()
+        wg_manager.validate_existing_clients(client_ids)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    job = submit_job('client_toggle_bulk', wg_manager.toggle_clients, client_ids)
+    return job_response(job, lambda toggled: {
+        'new_ips': toggled,
+        'message': f'클라이언트 {len(toggled)}개 IP 토글 완료'
+    })
+
+@app.route('/api/clients/bulk/remove', methods=['POST'])
+def remove_clients_bulk():
+    """여러 클라이언트 삭제 - {"client_ids": [...]}"""
+    try:
+        client_ids = bulk_client_ids()
+        wg_manager.validate_existing_clients(client_ids)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    job = submit_job('client_remove_bulk', wg_manager.remove_clients, client_ids)
+    return job_response(job, lambda removed: {
+        'removed': removed,
+        'message': f'클라이언트 {len(removed)}개 삭제 완료'
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태 조회 (?wait=<초>면 완료될 때까지 최대 그 시간만큼 대기)"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '작업을 찾을 수 없습니다'}), 404
+    wait = min(request.args.get('wait', 0, type=float), MAX_JOB_WAIT)
+    if wait > 0:
+        job.wait(wait)
+    return jsonify({'success': True, 'job': job.to_dict(), 'timestamp': datetime.now().isoformat()})
 
 @app.route('/api/wireguard/status', methods=['GET'])
 def wireguard_status():
-    """WireGuard 상태 조회"""
-    try:
-        result = subprocess.run(['wg', 'show'], capture_output=True, text=True)
-        return jsonify({
-            'success': True,
-            'status': result.stdout,
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
+    """WireGuard 피어 상태 (?interface=wg0&client_id=...&fields=endpoint,rx,tx)
+    
+    TELEMETRY_TTL 동안 같은 스냅샷을 공유하므로 동시 요청이 많아도 wg는 한 번만 실행
+    """
+    snapshot = telemetry.snapshot()
+    if snapshot['error']:
         return jsonify({
             'success': False,
-            'error': str(e),
+            'error': snapshot['error'],
             'timestamp': datetime.now().isoformat()
         }), 500
+    
+    interface = request.args.get('interface')
+    fields = request.args.get('fields')
+    client_ids = request.args.getlist('client_id')
+    public_keys = [
+        client['public_key'] for client in wg_manager.snapshot(client_ids).values()
+    ] if client_ids else None
+    interfaces = snapshot['interfaces']
+    return jsonify({
+        'success': True,
+        'collected': snapshot['collected'],
+        'age_ms': round((time.time() - snapshot['collected']) * 1000, 1),
+        'interfaces': {interface: interfaces[interface]} if interface in interfaces else ({} if interface else interfaces),
+        'peers': telemetry.peers(interface, public_keys, fields.split(',') if fields else None, snapshot),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/events', methods=['GET'])
+def get_events():
+    """최근 이벤트 조회 (?since=<seq>&level=WARNING&event=client_toggle&limit=100)"""
+    events_list = events.query(
+        since=request.args.get('since', type=int),
+        level=request.args.get('level'),
+        event=request.args.get('event'),
+        limit=request.args.get('limit', 100, type=int)
+    )
+    return jsonify({
+        'success': True,
+        'events': events_list,
+        'last_seq': events_list[-1]['seq'] if events_list else request.args.get('since', type=int),
+        'dropped': events.dropped,
+        'timestamp': datetime.now().isoformat()
+    })
 
 if __name__ == '__main__':
     print("동글 IP 토글 API 서버 시작...")
     print(f"클라이언트 데이터: {CLIENT_DATA_FILE}")
     print(f"WireGuard 설정: {WG_CONFIG_PATH}")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    serve(app, port=5000, log=log)
\ No newline at end of file
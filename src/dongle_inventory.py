@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+USB 동글 인벤토리 (핫플러그)
+- /sys/class/net/*/device 경로로 USB 네트워크 인터페이스 감지 (인터페이스 이름 하드코딩 없음)
+- 새 동글에 라우팅 테이블 / SOCKS 포트 / WireGuard 포트를 설정 범위에서 자동 할당
+- 라우팅과 프록시를 올리고, 분리되면 페일오버 후 일정 시간 뒤 자원 회수
+- 같은 인터페이스가 다시 꽂히면 이전 할당을 그대로 재사용
+"""
+
+import os
+import sys
+import time
+import asyncio
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SYS_CLASS_NET = "/sys/class/net"
+
+# 할당 필드 → (설정 키, 기본 범위)
+ALLOCATIONS = {
+    'routing_table': ('routing_tables', (200, 299)),
+    'socks_port': ('socks_ports', (1080, 1179)),
+    'vpn_port': ('vpn_ports', (51820, 51919)),
+}
+
+
+def is_usb_interface(interface: str, sys_class_net: str = SYS_CLASS_NET) -> bool:
+    """인터페이스가 USB 장치에 붙어 있는지 (sysfs device 경로에 /usb 포함)"""
+    device = os.path.join(sys_class_net, interface, 'device')
+    return os.path.exists(device) and '/usb' in os.path.realpath(device)
+
+
+def discover_usb_interfaces(sys_class_net: str = SYS_CLASS_NET) -> List[str]:
+    """현재 연결된 USB 네트워크 인터페이스 목록 (정렬)"""
+    try:
+        names = os.listdir(sys_class_net)
+    except OSError:
+        return []
+    return sorted(name for name in names if is_usb_interface(name, sys_class_net))
+
+
+def guess_gateway(ip: str) -> str:
+    """동글 기본 게이트웨이 추정 (x.x.x.1, 동글 내장 라우터)"""
+    return ip.rsplit('.', 1)[0] + '.1'
+
+
+def allocate(used: Iterable[int], value_range: Tuple[int, int]) -> Optional[int]:
+    """범위에서 사용되지 않은 가장 작은 값"""
+    used = set(used)
+    start, end = value_range
+    for value in range(start, end + 1):
+        if value not in used:
+            return value
+    return None
+
+
+class DongleInventory:
+    """동글 자동 감지/프로비저닝/회수"""
+
+    def __init__(self, server, ranges: Dict[str, Tuple[int, int]] = None, name_prefix: str = "dongle",
+                 retire_after: float = 3600, rescan_interval: float = 60, log: Callable = None):
+        self.server = server
+        self.ranges = ranges or {field: default for field, (_, default) in ALLOCATIONS.items()}
+        self.name_prefix = name_prefix
+        self.retire_after = retire_after
+        self.rescan_interval = rescan_interval
+        self.log = log or server.log
+        self._scan_pending = False
+        self._scanning = False
+        self._rescan = False
+
+    @classmethod
+    def from_config(cls, server, inventory: dict) -> 'DongleInventory':
+        ranges = {
+            field: tuple(inventory.get(key, default)) for field, (key, default) in ALLOCATIONS.items()
+        }
+        return cls(
+            server, ranges,
+            name_prefix=inventory.get('name_prefix', 'dongle'),
+            retire_after=inventory.get('retire_after', 3600),
+            rescan_interval=inventory.get('rescan_interval', 60)
+        )
+
+    @property
+    def dongles(self) -> Dict[str, dict]:
+        return self.server.config['dongles']
+
+    @property
+    def assignments(self) -> Dict[str, dict]:
+        """인터페이스별 과거 할당 (재연결 시 같은 포트/테이블 유지)"""
+        return self.server.config.setdefault('inventory', {}).setdefault('assignments', {})
+
+    # ===== 할당 =====
+    def _used(self, field: str) -> set:
+        used = {dongle[field] for dongle in self.dongles.values() if field in dongle}
+        used |= {entry[field] for entry in self.assignments.values() if field in entry}
+        main_line = self.server.config.get('main_line', {})
+        if field in main_line:
+            used.add(main_line[field])
+        return used
+
+    def _next_name(self) -> str:
+        taken = set(self.dongles) | {entry['name'] for entry in self.assignments.values()}
+        index = 1
+        while f"{self.name_prefix}{index}" in taken:
+            index += 1
+        return f"{self.name_prefix}{index}"
+
+    def _evict_stale_assignment(self) -> bool:
+        """범위가 가득 찼을 때 현재 꽂혀 있지 않은 가장 오래된 할당 해제"""
+        present = {dongle['interface'] for dongle in self.dongles.values()}
+        stale = [
+            (entry.get('last_seen', 0), interface) for interface, entry in self.assignments.items()
+            if interface not in present
+        ]
+        if not stale:
+            return False
+        _, interface = min(stale)
+        del self.assignments[interface]
+        return True
+
+    def reserve(self, interface: str) -> Optional[dict]:
+        """인터페이스용 이름/테이블/포트 확보 (이전 할당이 있으면 재사용)"""
+        entry = self.assignments.get(interface)
+        if entry and entry['name'] not in self.dongles:
+            return entry
+
+        while True:
+            values = {field: allocate(self._used(field), self.ranges[field]) for field in ALLOCATIONS}
+            if all(value is not None for value in values.values()):
+                break
+            if not self._evict_stale_assignment():
+                self.log(f"동글 {interface}: 할당 범위 소진 ({values})", "ERROR")
+                return None
+
+        entry = {'name': self._next_name(), **values}
+        self.assignments[interface] = entry
+        return entry
+
+    def remember(self, name: str):
+        """현재 동글의 할당을 기록 (설정 파일로 추가한 동글 포함)"""
+        dongle = self.dongles[name]
+        entry = self.assignments.setdefault(dongle['interface'], {'name': name})
+        entry.update({field: dongle[field] for field in ALLOCATIONS if field in dongle})
+        entry['last_seen'] = time.time()
+
+    # ===== 감지 =====
+    def on_link_change(self, interface: str, present: bool):
+        """링크 모니터 콜백 - 인터페이스 추가/삭제 시 재스캔 예약"""
+        if self._scan_pending:
+            return
+        self._scan_pending = True
+        asyncio.get_running_loop().call_later(0.5, self._scheduled_scan)
+
+    def _scheduled_scan(self):
+        self._scan_pending = False
+        # 진행 중인 스캔이 있으면 scan()이 _rescan으로 합쳐 한 번 더 실행
+        asyncio.get_running_loop().create_task(self.scan())
+
+    async def scan(self) -> Dict[str, List[str]]:
+        """sysfs와 설정을 비교해 새 동글 프로비저닝, 분리된 동글 정리"""
+        if self._scanning:
+            # 진행 중인 스캔이 끝나면 한 번 더
+            self._rescan = True
+            return {'added': [], 'unplugged': [], 'replugged': []}
+        self._scanning = True
+        try:
+            result = await self._scan_once()
+            while self._rescan:
+                self._rescan = False
+                more = await self._scan_once()
+                for key, names in more.items():
+                    result[key] += names
+            return result
+        finally:
+            self._scanning = False
+
+    async def _scan_once(self) -> Dict[str, List[str]]:
+        present = set(discover_usb_interfaces())
+        by_interface = {dongle['interface']: name for name, dongle in self.dongles.items()}
+        added, unplugged, replugged = [], [], []
+
+        for interface in sorted(present - set(by_interface)):
+            name = await self.provision(interface)
+            if name:
+                added.append(name)
+
+        now = time.time()
+        for interface, name in by_interface.items():
+            dongle = self.dongles[name]
+            if interface in present:
+                if dongle.get('unplugged'):
+                    await self.replug(name)
+                    replugged.append(name)
+                elif dongle['status'] == 'pending':
+                    # 주소 이벤트를 놓쳤거나 서버가 꺼져 있는 동안 DHCP가 끝난 경우
+                    ip = self.server.get_interface_ip(interface)
+                    if ip:
+                        dongle['ip'] = ip
+                        self.activate(name)
+            elif not dongle.get('unplugged') and not os.path.exists(os.path.join(SYS_CLASS_NET, interface)):
+                await self.unplug(name)
+                unplugged.append(name)
+            elif dongle.get('unplugged') and now - dongle['unplugged'] > self.retire_after:
+                await self.retire(name)
+
+        if added or unplugged or replugged:
+            self.log(f"동글 인벤토리: 추가 {added}, 분리 {unplugged}, 재연결 {replugged} "
+                     f"(총 {len(self.dongles)}개)")
+            self.server.save_config()
+        return {'added': added, 'unplugged': unplugged, 'replugged': replugged}
+
+    async def run_forever(self):
+        """링크 이벤트를 놓친 경우를 위한 주기적 재스캔 (분리 후 회수 포함)"""
+        while True:
+            await asyncio.sleep(self.rescan_interval)
+            try:
+                await self.scan()
+            except Exception as e:
+                self.log(f"동글 인벤토리 스캔 오류: {e}", "ERROR")
+
+    # ===== 생명주기 =====
+    def _detect_gateway(self, interface: str, ip: Optional[str]) -> Optional[str]:
+        try:
+            for route in self.server.net.get_routes(254):
+                if route['dst'] == 'default' and route['interface'] == interface and route['gateway']:
+                    return route['gateway']
+        except OSError:
+            pass
+        return guess_gateway(ip) if ip else None
+
+    def _group_partner(self) -> Optional[str]:
+        """새 동글을 기존 동글과 같은 페일오버 그룹에 연결할 상대"""
+        candidates = [name for name, dongle in self.dongles.items() if dongle.get('auto')]
+        return candidates[-1] if candidates else next(iter(self.dongles), None)
+
+    async def provision(self, interface: str) -> Optional[str]:
+        """새 동글 등록 - 자원 할당, 라우팅, 프록시, Kill Switch"""
+        entry = self.reserve(interface)
+        if not entry:
+            return None
+        name = entry['name']
+        ip = self.server.get_interface_ip(interface)
+
+        dongle = {
+            'interface': interface,
+            'ip': ip,
+            'gateway': self._detect_gateway(interface, ip),
+            'socks_port': entry['socks_port'],
+            'vpn_port': entry['vpn_port'],
+            'routing_table': entry['routing_table'],
+            # 아직 DHCP 대기 중이면 pending - 주소 이벤트에서 바로 active (페일백 대기 없음)
+            'status': 'active' if ip else 'pending',
+            'ip_toggle_enabled': True,
+            'auto': True,
+        }
+        groups = self.server.config.get('failover_groups')
+        default_group = self.server.config.get('inventory', {}).get('failover_group')
+        if groups and default_group in groups:
+            groups[default_group].append(name)
+        else:
+            partner = self._group_partner()
+            if partner:
+                dongle['failover_dongle'] = partner
+
+        self.dongles[name] = dongle
+        self.remember(name)
+        self.log(f"새 동글 감지: {name} ({interface}, IP {ip}, table {entry['routing_table']}, "
+                 f"SOCKS {entry['socks_port']}, VPN {entry['vpn_port']})")
+
+        if ip:
+            self.server.update_routing(name)
+            self.server.set_dongle_egress(name, True)
+        await self.server.start_socks5_proxy(name, dongle)
+        return name
+
+    async def unplug(self, name: str):
+        """동글 분리 - 테이블을 그룹으로 넘기고 프록시 중지 (자원은 retire_after 동안 유지)"""
+        dongle = self.dongles[name]
+        self.log(f"동글 분리됨: {name} ({dongle['interface']})", "WARNING")
+        dongle['unplugged'] = time.time()
+        self.remember(name)
+        if dongle['status'] == 'active':
+            self.server.failover.fail(name)
+        await self.server.stop_socks5_proxy(name)
+
+    async def replug(self, name: str):
+        """같은 인터페이스 재연결 - 프록시 재시작, 주소가 있으면 페일백 대기"""
+        dongle = self.dongles[name]
+        dongle.pop('unplugged', None)
+        self.remember(name)
+        self.log(f"동글 재연결: {name} ({dongle['interface']})")
+
+        ip = self.server.get_interface_ip(dongle['interface'])
+        if ip:
+            dongle['ip'] = ip
+            if dongle['status'] == 'pending':
+                self.activate(name)
+            else:
+                self.server.update_routing(name)
+                self.server.failover.mark_healthy(name)
+        await self.server.start_socks5_proxy(name, dongle)
+
+    def activate(self, name: str):
+        """주소를 기다리던(pending) 동글 서비스 시작 - 한 번도 실패한 적이 없으므로 페일백 대기 없음"""
+        dongle = self.dongles[name]
+        if not dongle.get('gateway'):
+            dongle['gateway'] = self._detect_gateway(dongle['interface'], dongle['ip'])
+        dongle['status'] = 'active'
+        self.log(f"동글 주소 할당됨: {name} ({dongle['ip']})")
+        self.server.update_routing(name)
+        self.server.set_dongle_egress(name, True)
+        self.server.save_config()
+
+    async def retire(self, name: str):
+        """오래 분리된 동글 제거 - 테이블 비우고 설정에서 삭제 (할당 기록은 유지)"""
+        dongle = self.dongles[name]
+        self.server.failover.forget(name)
+        try:
+            self.server.net.flush_table(dongle['routing_table'])
+        except OSError as e:
+            self.log(f"동글 {name} 테이블 정리 실패: {e}", "WARNING")
+        # 이 동글을 가리키던 failover_dongle 연결은 이 동글의 상대로 이어 그룹 유지
+        partner = dongle.get('failover_dongle')
+        for other_name, other in self.dongles.items():
+            if other.get('failover_dongle') == name:
+                if partner and partner != other_name:
+                    other['failover_dongle'] = partner
+                else:
+                    other.pop('failover_dongle', None)
+        for members in self.server.config.get('failover_groups', {}).values():
+            if name in members:
+                members.remove(name)
+        del self.dongles[name]
+        self.server.health.pop(name, None)
+        self.log(f"동글 회수: {name} ({dongle['interface']})")
+        self.server.save_config()
+
+
+def main():
+    """감지된 USB 동글 인터페이스 출력 (셸 스크립트용)"""
+    for interface in discover_usb_interfaces(sys.argv[1] if len(sys.argv) > 1 else SYS_CLASS_NET):
+        print(interface)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+동글 링크/주소 이벤트 모니터
+- RTNLGRP_LINK / RTNLGRP_IPV4_IFADDR 구독 (폴링 없음)
+- 동글 인터페이스별 link_down / link_up / address_added / address_removed 이벤트
+- IP 토글 시 새 주소 할당을 이벤트로 대기
+"""
+
+import time
+import errno
+import socket
+import asyncio
+import threading
+from typing import Callable, Dict, Optional
+
+from netlink_backend import (
+    NETLINK_ROUTE, RTMGRP_LINK, RTMGRP_IPV4_IFADDR,
+    RTM_NEWLINK, RTM_DELLINK, RTM_NEWADDR, RTM_DELADDR, RT_SCOPE_UNIVERSE,
+    NetlinkBackend, iter_messages, parse_link, parse_address
+)
+
+LINK_DOWN = 'link_down'
+LINK_UP = 'link_up'
+ADDRESS_ADDED = 'address_added'
+ADDRESS_REMOVED = 'address_removed'
+
+
+class DongleLinkMonitor:
+    """동글 인터페이스 링크/주소 변경 감시"""
+
+    def __init__(self, get_interfaces: Callable[[], set], on_event: Callable[[Dict], None],
+                 log: Callable = None, on_link_change: Callable[[str, bool], None] = None):
+        self.get_interfaces = get_interfaces
+        self.on_event = on_event
+        self.on_link_change = on_link_change
+        self.log = log or (lambda message, level="INFO": None)
+
+        self.links: Dict[str, bool] = {}
+        self.addresses: Dict[str, Optional[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._condition = threading.Condition()
+        self._waiters: Dict[str, list] = {}
+
+        self.sock = None
+        self._loop = None
+        self._loop_thread = None
+
+    @property
+    def running(self) -> bool:
+        return self.sock is not None
+
+    def start(self):
+        """구독 시작 (실행 중인 이벤트 루프에서 호출)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR))
+        sock.setblocking(False)
+        self.sock = sock
+
+        self.resync(emit=False)
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    def stop(self):
+        if self.sock:
+            self._loop.remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+
+    def resync(self, emit: bool = True):
+        """현재 링크/주소 상태를 덤프로 다시 읽기 (시작 시, 수신 버퍼 넘침 시)"""
+        watched = self.get_interfaces()
+        backend = NetlinkBackend()
+        try:
+            links = {link['interface']: link for link in backend.get_links()}
+            addresses = {}
+            for address in backend.get_addresses():
+                if address['scope'] == RT_SCOPE_UNIVERSE:
+                    addresses.setdefault(address['interface'], address['address'])
+        finally:
+            backend.close()
+
+        for interface in watched:
+            link = links.get(interface)
+            self._update_link(interface, bool(link and link['up'] and link['lower_up']), emit)
+            self._update_address(interface, addresses.get(interface), emit)
+
+    # ===== 수신 =====
+    def _on_readable(self):
+        while True:
+            try:
+                data = self.sock.recv(1 << 16)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    # 이벤트 유실 → 전체 상태 재동기화
+                    self.log("링크 모니터 수신 버퍼 넘침, 재동기화", "WARNING")
+                    self.resync()
+                    continue
+                raise
+
+            watched = self.get_interfaces()
+            for msg_type, _, _, body in iter_messages(data):
+                if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                    link = parse_link(body)
+                    if self.on_link_change and (msg_type == RTM_DELLINK or link['interface'] not in watched):
+                        # 인터페이스 생성/삭제 (핫플러그)
+                        self.on_link_change(link['interface'], msg_type == RTM_NEWLINK)
+                    if link['interface'] in watched:
+                        carrier = msg_type == RTM_NEWLINK and link['up'] and link['lower_up']
+                        self._update_link(link['interface'], carrier)
+                elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+                    address = parse_address(body)
+                    if address['interface'] in watched and address['scope'] == RT_SCOPE_UNIVERSE:
+                        if msg_type == RTM_NEWADDR:
+                            self._update_address(address['interface'], address['address'])
+                        elif self.addresses.get(address['interface']) == address['address']:
+                            self._update_address(address['interface'], None)
+
+    def _update_link(self, interface: str, up: bool, emit: bool = True):
+        previous = self.links.get(interface)
+        self.links[interface] = up
+        if emit and previous is not None and previous != up:
+            self._emit(LINK_UP if up else LINK_DOWN, interface)
+
+    def _update_address(self, interface: str, address: Optional[str], emit: bool = True):
+        previous = self.addresses.get(interface)
+        if previous == address and interface in self.addresses:
+            return
+        self.addresses[interface] = address
+        if address:
+            with self._condition:
+                self._generations[interface] = self._generations.get(interface, 0) + 1
+                self._condition.notify_all()
+            for future in self._waiters.pop(interface, []):
+                if not future.done():
+                    future.set_result(address)
+        if emit:
+            if address:
+                self._emit(ADDRESS_ADDED, interface, address, previous)
+            else:
+                self._emit(ADDRESS_REMOVED, interface, None, previous)
+
+    def _emit(self, event_type: str, interface: str, address: str = None, previous: str = None):
+        event = {
+            'type': event_type,
+            'interface': interface,
+            'address': address,
+            'previous_address': previous,
+            'timestamp': time.time(),
+        }
+        try:
+            self.on_event(event)
+        except Exception as e:
+            self.log(f"링크 이벤트 처리 오류 ({event_type} {interface}): {e}", "ERROR")
+
+    # ===== 주소 대기 =====
+    def address_generation(self, interface: str) -> int:
+        """주소 할당 세대 번호 (재연결 전에 기록해 두고 wait_for_address에 전달)"""
+        with self._condition:
+            return self._generations.get(interface, 0)
+
+    def wait_for_address(self, interface: str, since: int, timeout: float) -> Optional[str]:
+        """since 이후 새 주소가 할당될 때까지 대기 (다른 스레드에서 호출)"""
+        if threading.get_ident() == self._loop_thread:
+            raise RuntimeError("이벤트 루프 스레드에서는 wait_for_address_async를 사용해야 합니다")
+        with self._condition:
+            self._condition.wait_for(lambda: self._generations.get(interface, 0) > since, timeout)
+            if self._generations.get(interface, 0) > since:
+                return self.addresses.get(interface)
+        return None
+
+    async def wait_for_address_async(self, interface: str, since: int, timeout: float) -> Optional[str]:
+        """since 이후 새 주소가 할당될 때까지 대기 (이벤트 루프에서 호출)"""
+        if self._generations.get(interface, 0) > since:
+            return self.addresses.get(interface)
+        future = self._loop.create_future()
+        self._waiters.setdefault(interface, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+구조화 이벤트 로그
+- 호출 측은 큐에 넣기만 함 (파일 I/O, 콘솔 출력은 백그라운드 스레드에서 배치로)
+- JSON Lines 형식 (시각, 레벨, 구성요소, 메시지, 이벤트 종류, 동글, 소요 시간 등)
+- 크기 기준 로테이션 (gateway.log → gateway.log.1 → ...)
+- 최근 이벤트는 메모리 링 버퍼에서 바로 조회 (API용)
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+LOG_DIR = os.environ.get('DONGLE_LOG_DIR', "/home/proxy")
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+
+class EventLog:
+    """큐 기반 비동기 JSON 이벤트 로그 + 메모리 링"""
+
+    def __init__(self, path: Optional[str], max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 ring_size: int = 2000, batch_size: int = 256, flush_interval: float = 0.5,
+                 queue_size: int = 10000, echo: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.echo = echo
+
+        self.ring = deque(maxlen=ring_size)
+        self.dropped = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="event-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, path: str, logging: dict) -> 'EventLog':
+        return cls(
+            path,
+            max_bytes=logging.get('max_bytes', 10 * 1024 * 1024),
+            backups=logging.get('backups', 5),
+            ring_size=logging.get('ring_size', 2000),
+            batch_size=logging.get('batch_size', 256),
+            flush_interval=logging.get('flush_interval', 0.5),
+            echo=logging.get('echo', True)
+        )
+
+    # ===== 기록 =====
+    def emit(self, message: str, level: str = "INFO", component: str = None, **fields) -> Dict:
+        """이벤트 기록 (블로킹 없음 - 큐가 가득 차면 파일 기록만 버림)"""
+        event = {
+            'ts': time.time(),
+            'level': level,
+            'component': component,
+            'message': message,
+        }
+        event.update({key: value for key, value in fields.items() if value is not None})
+        with self._lock:
+            self._seq += 1
+            event['seq'] = self._seq
+            self.ring.append(event)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+        return event
+
+    def logger(self, component: str = None, **defaults) -> Callable:
+        """기존 log(message, level) 콜백과 호환되는 함수"""
+        def log(message: str, level: str = "INFO", **fields):
+            return self.emit(message, level, component, **{**defaults, **fields})
+        return log
+
+    # ===== 조회 =====
+    def query(self, since: int = None, level: str = None, event: str = None, dongle: str = None,
+              component: str = None, limit: int = 100) -> List[Dict]:
+        """링 버퍼에서 조건에 맞는 최근 이벤트 (seq 오름차순)"""
+        min_level = LEVELS.get(level, 0) if level else 0
+        with self._lock:
+            events = list(self.ring)
+        matched = [
+            entry for entry in events
+            if (since is None or entry['seq'] > since)
+            and LEVELS.get(entry['level'], 0) >= min_level
+            and (event is None or entry.get('event') == event)
+            and (dongle is None or entry.get('dongle') == dongle)
+            and (component is None or entry.get('component') == component)
+        ]
+        return matched[-limit:] if limit else matched
+
+    # ===== 기록 스레드 =====
+    @staticmethod
+    def format_line(event: Dict) -> str:
+        timestamp = datetime.fromtimestamp(event['ts']).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{timestamp}] [{event['level']}] {event['message']}"
+
+    def _open(self):
+        if self._file is None and self.path:
+            try:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            except OSError as e:
+                print(f"이벤트 로그 파일 열기 실패, 메모리에만 기록: {e}", file=sys.stderr)
+                self.path = None
+        return self._file
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.truncate(self.path, 0)
+
+    def _write(self, batch: List[Dict]):
+        if self.echo:
+            sys.stdout.write("".join(self.format_line(event) + "\n" for event in batch))
+            sys.stdout.flush()
+        handle = self._open()
+        if not handle:
+            return
+        try:
+            handle.write("".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in batch))
+            handle.flush()
+            if self.max_bytes and handle.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"이벤트 로그 기록 실패: {e}", file=sys.stderr)
+
+    def _writer(self):
+        while True:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            stop = item is None
+            if not stop:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def close(self, timeout: float = 2.0):
+        """남은 이벤트 기록 후 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+_shared: Dict[str, EventLog] = {}
+_shared_lock = threading.Lock()
+
+
+def get_event_log(path: str, logging: dict = None) -> EventLog:
+    """경로별 공유 이벤트 로그 (프로세스 내 모듈들이 같은 큐/링 사용)"""
+    with _shared_lock:
+        if path not in _shared:
+            _shared[path] = EventLog.from_config(path, logging or {})
+        return _shared[path]
+
+
+def get_logger(component: str, path: str = None, **defaults) -> Callable:
+    """구성요소 이름이 붙는 log(message, level, **fields) 함수 (기본 파일: LOG_DIR/<component>.log)"""
+    path = path or os.path.join(LOG_DIR, f"{component}.log")
+    return get_event_log(path).logger(component, **defaults)
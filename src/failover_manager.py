@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+N-way 페일오버 그룹
+- failover_groups 설정 (없으면 기존 failover_dongle 쌍을 그룹으로 묶음)
+- 실패한 동글의 테이블은 그룹 내 가장 건강하고 부하가 적은 동글로 이동
+- 복구 후 일정 시간 정상 유지 시 자동 페일백 (히스테리시스)
+- 영향받는 모든 테이블을 한 번의 배치로 재지정
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class FailoverManager:
+    """페일오버 그룹과 테이블 재지정 관리"""
+
+    def __init__(self, server, failback_after: float = 60, load_penalty_ms: float = 50,
+                 log: Callable = None):
+        self.server = server
+        self.failback_after = failback_after
+        self.load_penalty_ms = load_penalty_ms
+        self.log = log or server.log
+
+        # 테이블 소유 동글 → 현재 트래픽을 대신 처리하는 동글
+        self.redirects: Dict[str, str] = {}
+        self.healthy_since: Dict[str, float] = {}
+
+        # 이전 버전이 백업 동글에 붙이던 'primary' 상태 정리
+        for dongle in self.dongles.values():
+            if dongle.get('status') == 'primary':
+                dongle['status'] = 'active'
+
+    @classmethod
+    def from_config(cls, server, failover: dict) -> 'FailoverManager':
+        return cls(
+            server,
+            failback_after=failover.get('failback_after', 60),
+            load_penalty_ms=failover.get('load_penalty_ms', 50)
+        )
+
+    @property
+    def dongles(self) -> Dict[str, dict]:
+        return self.server.config['dongles']
+
+    # ===== 그룹 =====
+    def groups(self) -> List[List[str]]:
+        """페일오버 그룹 목록 (failover_groups 또는 failover_dongle 연결 요소)"""
+        configured = self.server.config.get('failover_groups')
+        if configured:
+            return [[name for name in members if name in self.dongles] for members in configured.values()]
+
+        parent = {name: name for name in self.dongles}
+
+        def find(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        for name, dongle in self.dongles.items():
+            partner = dongle.get('failover_dongle')
+            if partner in parent:
+                parent[find(name)] = find(partner)
+
+        groups: Dict[str, List[str]] = {}
+        for name in self.dongles:
+            groups.setdefault(find(name), []).append(name)
+        return list(groups.values())
+
+    def group_of(self, name: str) -> List[str]:
+        """name과 같은 그룹의 다른 동글"""
+        for members in self.groups():
+            if name in members:
+                return [member for member in members if member != name]
+        return []
+
+    # ===== 선택 =====
+    def serving(self, owner: str) -> str:
+        return self.redirects.get(owner, owner)
+
+    def tables_served_by(self, name: str) -> List[str]:
+        """name이 현재 처리 중인 테이블의 소유 동글 목록"""
+        return [owner for owner in self.dongles if self.serving(owner) == name]
+
+    def is_live(self, name: str) -> bool:
+        dongle = self.dongles.get(name)
+        return bool(
+            dongle and dongle['status'] == 'active' and dongle.get('role') != 'standby'
+            and name not in self.server.rotating
+            and self.server.health.get(name, {}).get('healthy', True)
+        )
+
+    def score(self, name: str, extra_tables: int = 0) -> float:
+        """낮을수록 좋음: 헬스체크 RTT + 처리 중인 추가 테이블 수 × 부하 패널티 + 사용률"""
+        rtt = self.server.health.get(name, {}).get('rtt_ms') or 0
+        tables = len(self.tables_served_by(name)) - 1 + extra_tables
+        score = rtt + max(tables, 0) * self.load_penalty_ms
+
+        bandwidth = self.dongles[name].get('bandwidth_mbps')
+        peak = self.server.balancer.peak_mbps.get(name)
+        if bandwidth and peak:
+            score += min(peak / bandwidth, 1.0) * self.load_penalty_ms
+        return score
+
+    def select(self, owner: str, exclude: str, assigned: Dict[str, int] = None) -> Optional[str]:
+        """owner 테이블을 맡을 그룹 내 최적 동글"""
+        assigned = assigned or {}
+        candidates = [
+            name for name in [owner] + self.group_of(owner)
+            if name != exclude and self.is_live(name)
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda name: self.score(name, assigned.get(name, 0)))
+
+    # ===== 재지정 =====
+    def repoint(self, owners: List[str]) -> bool:
+        """owners의 테이블을 현재 redirects 기준으로 한 배치에 적용"""
+        tables = {
+            self.dongles[owner]['routing_table']: self.server.dongle_routes(self.dongles[self.serving(owner)])
+            for owner in owners
+        }
+        if not tables:
+            return True
+        try:
+            self.server.net.apply_tables(tables)
+            return True
+        except OSError as e:
+            self.log(f"테이블 재지정 실패 ({', '.join(owners)}): {e}", "ERROR")
+            return False
+
+    def evacuate(self, name: str) -> Dict[str, Optional[str]]:
+        """name이 처리 중인 모든 테이블을 그룹 내 다른 동글로 이동"""
+        moves = {}
+        assigned: Dict[str, int] = {}
+        for owner in self.tables_served_by(name):
+            target = self.select(owner, exclude=name, assigned=assigned)
+            moves[owner] = target
+            if not target:
+                self.log(f"테이블 {owner}: 그룹 내 사용 가능한 동글 없음", "ERROR")
+                continue
+            assigned[target] = assigned.get(target, 0) + 1
+            if target == owner:
+                self.redirects.pop(owner, None)
+            else:
+                self.redirects[owner] = target
+
+        moved = [owner for owner, target in moves.items() if target]
+        self.repoint(moved)
+        if moved:
+            self.log(f"페일오버: {name} → " + ", ".join(f"{owner}:{moves[owner]}" for owner in moved),
+                     event='evacuate', dongle=name, moves={owner: moves[owner] for owner in moved})
+        return moves
+
+    def reclaim(self, name: str) -> bool:
+        """name 소유 테이블을 다시 name으로 (페일백/로테이션 완료)"""
+        self.redirects.pop(name, None)
+        return self.repoint([name])
+
+    def rehome(self) -> List[str]:
+        """대신 처리하던 동글도 실패한 테이블을 다시 배치 (적용은 호출자가)"""
+        moved = []
+        assigned: Dict[str, int] = {}
+        for owner in self.dongles:
+            target = self.serving(owner)
+            if self.dongles[target]['status'] != 'failed':
+                continue
+            replacement = self.select(owner, exclude=target, assigned=assigned)
+            if not replacement:
+                continue
+            assigned[replacement] = assigned.get(replacement, 0) + 1
+            if replacement == owner:
+                self.redirects.pop(owner, None)
+            else:
+                self.redirects[owner] = replacement
+            moved.append(owner)
+        return moved
+
+    def forget(self, name: str):
+        """설정에서 제거되는 동글 정리 (테이블 이동은 fail에서 이미 처리)"""
+        self.redirects.pop(name, None)
+        self.healthy_since.pop(name, None)
+        for owner, target in list(self.redirects.items()):
+            if target == name:
+                del self.redirects[owner]
+
+    # ===== 상태 전이 =====
+    def fail(self, name: str):
+        """동글 실패 처리 - 상태 변경, egress 차단, 테이블 이동"""
+        dongle = self.dongles[name]
+        dongle['status'] = 'failed'
+        self.healthy_since.pop(name, None)
+        self.server.set_dongle_egress(name, False)
+        self.evacuate(name)
+        self.server.save_config()
+
+    def mark_healthy(self, name: str):
+        """실패 상태 동글이 정상 응답 → 페일백 대기 시작"""
+        if self.dongles[name]['status'] == 'failed':
+            self.healthy_since.setdefault(name, time.time())
+
+    def mark_unhealthy(self, name: str):
+        self.healthy_since.pop(name, None)
+
+    def failback_due(self) -> List[str]:
+        """failback_after 동안 정상 유지한 동글 복귀"""
+        now = time.time()
+        recovered = []
+        for name, since in list(self.healthy_since.items()):
+            if now - since < self.failback_after or name in self.server.rotating:
+                continue
+            del self.healthy_since[name]
+            dongle = self.dongles.get(name)
+            if not dongle or dongle['status'] != 'failed':
+                continue
+            dongle['status'] = 'active'
+            self.server.set_dongle_egress(name, True)
+            recovered.append(name)
+
+        if recovered:
+            for name in recovered:
+                self.redirects.pop(name, None)
+            # 실패한 동글에 남아 있던 테이블도 복구된 동글로 함께 재배치
+            stranded = self.rehome()
+            self.repoint(recovered + stranded)
+            self.log(f"페일백: {', '.join(recovered)}", event='failback', dongles=recovered)
+            self.server.save_config()
+        return recovered
+
+    def status(self) -> Dict:
+        return {
+            'groups': self.groups(),
+            'redirects': dict(self.redirects),
+            'failback_pending': {
+                name: round(time.time() - since, 1) for name, since in self.healthy_since.items()
+            },
+        }
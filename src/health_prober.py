@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+동글 헬스체크 프로버
+- 모든 동글을 동시에 검사 (동시 실행 수 제한)
+- 프로세스 생성 없이 동글 IP에 바인딩된 ICMP/TCP 프로브
+"""
+
+import os
+import time
+import fcntl
+import socket
+import struct
+import asyncio
+from typing import Dict, Optional
+
+SIOCGIFADDR = 0x8915
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+def get_interface_ipv4(interface: str) -> Optional[str]:
+    """인터페이스의 IPv4 주소 조회 (ioctl, 프로세스 생성 없음)"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            ifreq = struct.pack('256s', interface[:15].encode())
+            result = fcntl.ioctl(s.fileno(), SIOCGIFADDR, ifreq)
+            return socket.inet_ntoa(result[20:24])
+    except OSError:
+        return None
+
+
+def icmp_checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class DongleHealthProber:
+    """동글 헬스체크 (비동기 동시 프로브)"""
+
+    def __init__(self, target: str = "8.8.8.8", method: str = "icmp", tcp_port: int = 53,
+                 timeout: float = 2.0, concurrency: int = 32):
+        self.target = target
+        self.method = method
+        self.tcp_port = tcp_port
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._sequence = 0
+        # 비특권 ICMP 소켓(ping_group_range)을 쓸 수 없으면 TCP로 전환
+        self._icmp_available = method == "icmp"
+
+    @classmethod
+    def from_config(cls, monitoring: dict) -> 'DongleHealthProber':
+        probe = monitoring.get('probe', {})
+        return cls(
+            target=probe.get('target', '8.8.8.8'),
+            method=probe.get('method', 'icmp'),
+            tcp_port=probe.get('tcp_port', 53),
+            timeout=probe.get('timeout', 2.0),
+            concurrency=probe.get('concurrency', 32)
+        )
+
+    async def probe(self, interface: str) -> Dict:
+        """단일 동글 프로브 -> {'healthy', 'ip', 'rtt_ms', 'method', 'error'}"""
+        result = {'healthy': False, 'ip': None, 'rtt_ms': None, 'method': None, 'error': None}
+
+        ip = get_interface_ipv4(interface)
+        result['ip'] = ip
+        if not ip:
+            result['error'] = 'no_address'
+            return result
+
+        start = time.perf_counter()
+        try:
+            if self._icmp_available:
+                try:
+                    result['method'] = 'icmp'
+                    await asyncio.wait_for(self._icmp_probe(ip), self.timeout)
+                except PermissionError:
+                    self._icmp_available = False
+            if not self._icmp_available:
+                result['method'] = 'tcp'
+                await asyncio.wait_for(self._tcp_probe(ip), self.timeout)
+        except asyncio.TimeoutError:
+            result['error'] = 'timeout'
+            return result
+        except OSError as e:
+            result['error'] = e.strerror or str(e)
+            return result
+
+        result['healthy'] = True
+        result['rtt_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    async def probe_all(self, interfaces: Dict[str, str]) -> Dict[str, Dict]:
+        """여러 동글 동시 프로브 ({이름: 인터페이스} -> {이름: 결과})"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def limited(interface):
+            async with semaphore:
+                return await self.probe(interface)
+
+        names = list(interfaces)
+        results = await asyncio.gather(*(limited(interfaces[name]) for name in names))
+        return dict(zip(names, results))
+
+    async def _tcp_probe(self, ip: str):
+        """동글 IP에서 대상 TCP 포트로 연결"""
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(False)
+            sock.bind((ip, 0))
+            await loop.sock_connect(sock, (self.target, self.tcp_port))
+        finally:
+            sock.close()
+
+    async def _icmp_probe(self, ip: str):
+        """동글 IP에서 ICMP echo (비특권 ping 소켓)"""
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        try:
+            sock.setblocking(False)
+            sock.bind((ip, 0))
+
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            sequence = self._sequence
+            payload = struct.pack('!d', time.time()) + os.urandom(8)
+            header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, 0, sequence)
+            checksum = icmp_checksum(header + payload)
+            packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, 0, sequence) + payload
+            sock.sendto(packet, (self.target, 0))
+
+            # ping 소켓은 커널이 식별자를 소켓별로 관리하므로 시퀀스만 확인
+            while True:
+                reply = await loop.sock_recv(sock, 1024)
+                if len(reply) >= 8 and reply[0] == ICMP_ECHO_REPLY and \
+                        struct.unpack('!H', reply[6:8])[0] == sequence:
+                    return
+        finally:
+            sock.close()
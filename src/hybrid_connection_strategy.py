@@ -4,8 +4,42 @@ H3 vs 익명성 트레이드오프 해결책
 사이트별 적응적 연결 방식 선택
 """
 
+import os
+import sqlite3
+
+from socks5_server import engine_capabilities
+from state_store import DEFAULT_STATE_DB, get_state_store
+from warm_restart import find_processes
+
+
+def configured_socks5_engine(state_db: str = None) -> str:
+    """실제로 쓰이는 SOCKS5 엔진 - setup_socks5.sh의 microsocks가 떠 있으면 그것, 아니면 게이트웨이 설정
+
+    게이트웨이 설정(socks5)이 없거나 읽을 수 없으면 'unknown' (UDP 중계를 가정하지 않음)
+    """
+    if find_processes('microsocks'):
+        return 'microsocks'
+    state_db = state_db or DEFAULT_STATE_DB
+    # 조회만 하므로 저장소가 없으면 새로 만들지 않음
+    if not os.path.exists(state_db):
+        return 'unknown'
+    try:
+        socks5 = get_state_store(state_db).get('gateway', 'socks5')
+    except sqlite3.Error:
+        return 'unknown'
+    if not socks5:
+        return 'unknown'
+    return socks5.get('engine', 'builtin')
+
+
 class HybridConnectionManager:
-    def __init__(self):
+    def __init__(self, proxy_capabilities: dict = None, socks5_engine: str = None):
+        # SOCKS5 경로의 H3(QUIC) 지원 여부는 프록시가 UDP ASSOCIATE를 지원하는지로 결정
+        # (내장 엔진만 UDP 중계 - dante/microsocks로는 QUIC가 조용히 버려짐, 엔진을 모르면 VPN으로)
+        if proxy_capabilities is None:
+            proxy_capabilities = engine_capabilities(socks5_engine or 'unknown')
+        self.socks5_h3_support = bool(proxy_capabilities.get('udp_associate'))
+        
         # H3가 중요한 사이트 목록
         self.h3_critical_sites = {
             'google.com', 'youtube.com', 'gmail.com',
@@ -19,6 +53,11 @@ class HybridConnectionManager:
             'security-sensitive.com'
         }
     
+    @classmethod
+    def from_environment(cls, state_db: str = None) -> 'HybridConnectionManager':
+        """실행 중인 프로세스와 게이트웨이 설정에서 SOCKS5 엔진을 확인해 생성"""
+        return cls(socks5_engine=configured_socks5_engine(state_db))
+    
     def select_connection_method(self, target_url):
         """사이트별 최적 연결 방식 선택"""
         domain = self.extract_domain(target_url)
@@ -28,7 +67,15 @@ class HybridConnectionManager:
                 'method': 'socks5',
                 'proxy': '222.101.90.78:1080',
                 'reason': 'maximum_anonymity',
-                'h3_support': False
+                'h3_support': self.socks5_h3_support
+            }
+        elif domain in self.h3_critical_sites and self.socks5_h3_support:
+            # UDP ASSOCIATE로 QUIC 전달 가능 → 더 가벼운 SOCKS5 경로 사용
+            return {
+                'method': 'socks5',
+                'proxy': '222.101.90.78:1080',
+                'reason': 'h3_via_udp_associate',
+                'h3_support': True
             }
         elif domain in self.h3_critical_sites:
             return {
@@ -44,7 +91,7 @@ class HybridConnectionManager:
                 'method': 'socks5',
                 'proxy': '222.101.90.78:1080',
                 'reason': 'default_anonymity',
-                'h3_support': False
+                'h3_support': self.socks5_h3_support
             }
     
     def extract_domain(self, url):
@@ -53,8 +100,8 @@ class HybridConnectionManager:
         return urlparse(url).netloc.lower()
 
 # Playwright 사용 예시
-async def create_context_with_optimal_connection(browser, target_url):
-    manager = HybridConnectionManager()
+async def create_context_with_optimal_connection(browser, target_url, manager: HybridConnectionManager = None):
+    manager = manager or HybridConnectionManager.from_environment()
     connection_info = manager.select_connection_method(target_url)
     
     if connection_info['method'] == 'socks5':
@@ -80,7 +127,7 @@ async def create_context_with_optimal_connection(browser, target_url):
 
 # 사용 예시
 if __name__ == "__main__":
-    manager = HybridConnectionManager()
+    manager = HybridConnectionManager.from_environment()
     
     test_sites = [
         'https://google.com',  # H3 중요
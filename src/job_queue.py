@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+API용 비동기 작업 큐
+- 느린 작업(WireGuard 적용, 키 생성 등)을 제한된 워커 풀에서 실행하고 호출자는 작업 ID를 즉시 받음
+- 같은 자원(인터페이스, 동글)의 작업은 들어온 순서대로 하나씩 실행, 다른 자원끼리는 병렬
+- 대기 작업 수 제한 (가득 차면 JobQueueFull → 503)
+- 완료된 작업은 최근 MAX_FINISHED_JOBS개까지 조회 가능 (롱 폴링 wait 지원)
+"""
+
+import time
+import uuid
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+FINAL_STATES = (SUCCEEDED, FAILED)
+MAX_FINISHED_JOBS = 1000
+
+
+class JobQueueFull(Exception):
+    """대기 작업 수 초과"""
+
+
+class Job:
+    """큐에 들어간 작업 하나의 핸들"""
+
+    def __init__(self, kind: str, resource: Optional[str], func: Callable, args: tuple, kwargs: dict):
+        # 결과에 비밀 값(키, 토큰)이 들어갈 수 있으므로 추측하기 어려운 ID 사용
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.resource = resource
+        self.state = PENDING
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def wait(self, timeout: float = None) -> bool:
+        """완료까지 대기, 완료됐으면 True"""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'resource': self.resource,
+            'state': self.state,
+            'result': self.result,
+            'error': self.error,
+            'created': self.created,
+            'queued_ms': round((self.started - self.created) * 1000, 1) if self.started else None,
+            'total_ms': round((self.finished - self.started) * 1000, 1) if self.finished and self.started else None,
+        }
+
+
+class JobQueue:
+    """제한된 워커 풀 + 자원별 직렬화"""
+
+    def __init__(self, workers: int = 4, max_pending: int = 1000, log: Callable = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.log = log or (lambda message, level="INFO", **fields: None)
+
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._pending = 0
+        # 자원별 실행 중 표시와 대기열 (실행 중인 자원은 키가 있음)
+        self._waiting: Dict[str, Deque[Job]] = {}
+
+    def submit(self, kind: str, func: Callable, *args, resource: str = None, **kwargs) -> Job:
+        """작업 등록 후 핸들 즉시 반환 (resource가 같으면 앞 작업이 끝난 뒤 실행)"""
+        job = Job(kind, resource, func, args, kwargs)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"대기 작업이 {self.max_pending}개를 넘었습니다")
+            self._pending += 1
+            self.jobs[job.job_id] = job
+            self._trim()
+            if resource is not None:
+                if resource in self._waiting:
+                    self._waiting[resource].append(job)
+                    return job
+                self._waiting[resource] = deque()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self._pending,
+                'busy_resources': sorted(self._waiting),
+            }
+
+    def _run(self, job: Job):
+        job.state = RUNNING
+        job.started = time.time()
+        try:
+            job.result = job._func(*job._args, **job._kwargs)
+            state = SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            state = FAILED
+            self.log(f"작업 실패 ({job.kind}, {job.resource}): {e}", "ERROR", event='job_failed',
+                     job_id=job.job_id, kind=job.kind)
+        job.finished = time.time()
+        job.state = state
+        job._func = job._args = job._kwargs = None
+        job._done.set()
+
+        following = None
+        with self._lock:
+            self._pending -= 1
+            if job.resource is not None:
+                waiting = self._waiting[job.resource]
+                if waiting:
+                    following = waiting.popleft()
+                else:
+                    del self._waiting[job.resource]
+        if following:
+            self._executor.submit(self._run, following)
+
+    def _trim(self):
+        """완료된 작업이 MAX_FINISHED_JOBS를 넘으면 오래된 것부터 삭제 (잠금 안에서 호출)"""
+        if len(self.jobs) <= MAX_FINISHED_JOBS + self._pending:
+            return
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Kill Switch 규칙 관리
+- 전체 규칙을 한 번에 생성해 원자적으로 적용 (nft -f 또는 iptables-restore)
+- 허용 대역/동글 인터페이스는 named set으로 관리 → 추가/삭제가 규칙 재작성 없이 O(1)
+- 재시작해도 규칙이 중복되지 않음 (멱등)
+- 웜 리스타트 시 현재 규칙을 읽어 달라진 set 원소만 갱신
+"""
+
+import json
+import hashlib
+import ipaddress
+import shutil
+import subprocess
+from typing import Callable, Dict, Iterable, List, Optional
+
+NFT_TABLE = "dongle_killswitch"
+# IPv4만 관리 (iptables 백엔드와 같이 IPv6 포워딩은 건드리지 않음)
+NFT_FAMILY = "ip"
+# 이전 버전이 쓰던 inet 테이블 (policy drop이 IPv6 포워딩까지 막음) - 적용할 때 같이 삭제
+LEGACY_NFT_FAMILY = "inet"
+IPTABLES_CHAIN = "DONGLE_KILLSWITCH"
+DONGLE_MARK = "0x100"
+
+# 이전 버전 setup_kill_switch가 FORWARD에 직접 추가하던 규칙 (이 순서 그대로 연속된 경우만 제거)
+LEGACY_RULES = [
+    "-s 10.0.0.0/8 -d 10.0.0.0/8 -j ACCEPT",
+    "-s 192.168.0.0/16 -d 192.168.0.0/16 -j ACCEPT",
+    "-i wg+ -j ACCEPT",
+    "-o wg+ -j ACCEPT",
+    "-m mark --mark 0x100 -j ACCEPT",
+    "-j DROP",
+]
+
+# forward 체인 규칙 (set 원소 제외) - 바뀌면 웜 리스타트에서도 전체 재적용
+NFT_FORWARD_RULES = [
+    "# 로컬 트래픽 허용",
+    "ip saddr @allowed_nets ip daddr @allowed_nets accept",
+    "",
+    "# VPN 인터페이스 트래픽 허용",
+    'iifname "wg*" accept',
+    'oifname "wg*" accept',
+    "",
+    "# 활성 동글 인터페이스만 허용 (set에서 빠지면 즉시 차단)",
+    f"oifname @dongle_ifaces meta mark {DONGLE_MARK} accept",
+    "",
+    "# 나머지는 DROP (Kill Switch)",
+    "counter drop",
+]
+NFT_SIGNATURE = "killswitch-" + hashlib.sha1("\n".join(NFT_FORWARD_RULES).encode()).hexdigest()[:12]
+
+
+def normalize_network(value: str) -> str:
+    return str(ipaddress.ip_network(value, strict=False))
+
+
+class KillSwitchError(Exception):
+    """Kill Switch 규칙 적용 실패"""
+
+
+class KillSwitch:
+    """VPN Kill Switch (nftables 우선, 없으면 iptables-restore)"""
+
+    def __init__(self, allowed_ips: Iterable[str], dongle_interfaces: Iterable[str],
+                 backend: str = "auto", log: Callable = None):
+        self.allowed_ips = list(dict.fromkeys(allowed_ips))
+        self.dongle_interfaces = list(dict.fromkeys(dongle_interfaces))
+        self.log = log or (lambda message, level="INFO": None)
+
+        if backend == "auto":
+            backend = "nft" if shutil.which("nft") else "iptables"
+        self.backend = backend
+
+    # ===== 규칙 생성 =====
+    @staticmethod
+    def _elements(values: List[str], quote: bool = False) -> str:
+        items = [f'"{v}"' if quote else v for v in values]
+        return f"elements = {{ {', '.join(items)} }}" if items else ""
+
+    def render_nft(self) -> str:
+        """nft -f 입력 (이전 inet 테이블 정리, 테이블 삭제 후 재생성을 하나의 트랜잭션으로)"""
+        rules = "\n".join(f"        {rule}" if rule else "" for rule in NFT_FORWARD_RULES)
+        return f"""table {LEGACY_NFT_FAMILY} {NFT_TABLE}
+delete table {LEGACY_NFT_FAMILY} {NFT_TABLE}
+table {NFT_FAMILY} {NFT_TABLE}
+delete table {NFT_FAMILY} {NFT_TABLE}
+table {NFT_FAMILY} {NFT_TABLE} {{
+    set allowed_nets {{
+        type ipv4_addr
+        flags interval
+        auto-merge
+        {self._elements(self.allowed_ips)}
+    }}
+
+    set dongle_ifaces {{
+        type ifname
+        {self._elements(self.dongle_interfaces, quote=True)}
+    }}
+
+    chain forward {{
+        type filter hook forward priority 0; policy drop;
+
+{rules} comment "{NFT_SIGNATURE}"
+    }}
+}}
+"""
+
+    def render_iptables(self, add_jump: bool) -> str:
+        """iptables-restore --noflush 입력 (전용 체인만 다시 채움)"""
+        lines = ["*filter", f":{IPTABLES_CHAIN} - [0:0]"]
+        for src in self.allowed_ips:
+            for dst in self.allowed_ips:
+                lines.append(f"-A {IPTABLES_CHAIN} -s {src} -d {dst} -j ACCEPT")
+        lines += [
+            f"-A {IPTABLES_CHAIN} -i wg+ -j ACCEPT",
+            f"-A {IPTABLES_CHAIN} -o wg+ -j ACCEPT",
+        ]
+        for interface in self.dongle_interfaces:
+            lines.append(f"-A {IPTABLES_CHAIN} -o {interface} -m mark --mark {DONGLE_MARK} -j ACCEPT")
+        lines.append(f"-A {IPTABLES_CHAIN} -j DROP")
+        if add_jump:
+            lines.append(f"-I FORWARD 1 -j {IPTABLES_CHAIN}")
+        lines.append("COMMIT")
+        return "\n".join(lines) + "\n"
+
+    # ===== 적용 =====
+    def _run(self, args: List[str], input_text: str = None, check: bool = True) -> bool:
+        try:
+            result = subprocess.run(args, input=input_text, capture_output=True, text=True)
+        except FileNotFoundError:
+            if check:
+                raise KillSwitchError(f"{args[0]} 명령을 찾을 수 없음")
+            return False
+        if check and result.returncode != 0:
+            raise KillSwitchError(f"{args[0]} 실패: {result.stderr.strip()}")
+        return result.returncode == 0
+
+    def apply(self):
+        """전체 규칙 적용 (원자적, 멱등)"""
+        if self.backend == "nft":
+            self._run(["nft", "-f", "-"], self.render_nft())
+        else:
+            has_jump = self._run(["iptables", "-C", "FORWARD", "-j", IPTABLES_CHAIN], check=False)
+            self._run(["iptables-restore", "--noflush"], self.render_iptables(add_jump=not has_jump))
+        self.log(f"Kill Switch 적용 ({self.backend}): 허용 대역 {len(self.allowed_ips)}개, "
+                 f"동글 {len(self.dongle_interfaces)}개")
+
+    # ===== 웜 리스타트 =====
+    def current_state(self) -> Optional[Dict]:
+        """설치된 규칙 조회 - 없으면 None, matches는 규칙 구조가 현재 버전과 같은지"""
+        if self.backend == "nft":
+            return self._current_nft()
+        return self._current_iptables()
+
+    def _current_nft(self) -> Optional[Dict]:
+        try:
+            result = subprocess.run(["nft", "-j", "list", "table", NFT_FAMILY, NFT_TABLE],
+                                    capture_output=True, text=True)
+        except FileNotFoundError:
+            return None
+        if result.returncode != 0:
+            return None
+
+        state = {'allowed_ips': [], 'dongle_interfaces': [], 'matches': False}
+        try:
+            for item in json.loads(result.stdout).get('nftables', []):
+                if 'set' in item:
+                    elements = item['set'].get('elem', [])
+                    if item['set']['name'] == 'allowed_nets':
+                        for element in elements:
+                            if isinstance(element, dict) and 'prefix' in element:
+                                element = f"{element['prefix']['addr']}/{element['prefix']['len']}"
+                            if not isinstance(element, str):
+                                # auto-merge로 합쳐진 range 등 - 비교 불가, 전체 재적용
+                                return state
+                            state['allowed_ips'].append(normalize_network(element))
+                    elif item['set']['name'] == 'dongle_ifaces':
+                        state['dongle_interfaces'] = [element for element in elements if isinstance(element, str)]
+                elif 'rule' in item and item['rule'].get('comment') == NFT_SIGNATURE:
+                    state['matches'] = True
+        except (ValueError, KeyError, TypeError):
+            state['matches'] = False
+        return state
+
+    def _current_iptables(self) -> Optional[Dict]:
+        if not self._run(["iptables", "-C", "FORWARD", "-j", IPTABLES_CHAIN], check=False):
+            return None
+        try:
+            result = subprocess.run(["iptables", "-S", IPTABLES_CHAIN], capture_output=True, text=True)
+        except FileNotFoundError:
+            return None
+        current = [line for line in result.stdout.splitlines() if line.startswith("-A ")]
+        wanted = [line for line in self.render_iptables(add_jump=False).splitlines()
+                  if line.startswith(f"-A {IPTABLES_CHAIN} ")]
+        return {
+            'allowed_ips': None,
+            'dongle_interfaces': None,
+            # iptables는 set이 없으므로 체인 전체가 같을 때만 그대로 사용
+            'matches': result.returncode == 0 and current == wanted,
+        }
+
+    def sync(self) -> str:
+        """현재 규칙과 비교해 차이만 적용 - 'adopted' / 'updated' / 'applied'"""
+        state = self.current_state()
+        if not state or not state['matches']:
+            self.remove_legacy_rules()
+            self.apply()
+            return "applied"
+        if self.backend != "nft":
+            return "adopted"
+
+        commands = []
+        wanted_nets = {normalize_network(cidr) for cidr in self.allowed_ips}
+        for set_name, wanted, current, quote in (
+            ("allowed_nets", wanted_nets, set(state['allowed_ips']), False),
+            ("dongle_ifaces", set(self.dongle_interfaces), set(state['dongle_interfaces']), True),
+        ):
+            for action, elements in (("add", wanted - current), ("delete", current - wanted)):
+                if elements:
+                    items = ", ".join(f'"{e}"' if quote else e for e in sorted(elements))
+                    commands.append(f"{action} element {NFT_FAMILY} {NFT_TABLE} {set_name} {{ {items} }}")
+        if not commands:
+            return "adopted"
+        self._run(["nft", "-f", "-"], "\n".join(commands) + "\n")
+        self.log(f"Kill Switch set 갱신: {len(commands)}건")
+        return "updated"
+
+    def disable(self):
+        """Kill Switch 해제"""
+        if self.backend == "nft":
+            self._run(["nft", "delete", "table", NFT_FAMILY, NFT_TABLE], check=False)
+        else:
+            self._run(["iptables", "-D", "FORWARD", "-j", IPTABLES_CHAIN], check=False)
+            self._run(["iptables", "-F", IPTABLES_CHAIN], check=False)
+            self._run(["iptables", "-X", IPTABLES_CHAIN], check=False)
+
+    def remove_legacy_rules(self) -> int:
+        """이전 버전이 FORWARD에 중복 추가한 규칙 정리
+
+        LEGACY_RULES가 순서 그대로 연속된 묶음만 번호로 삭제 (다른 도구가 넣은 같은 모양의 단일 규칙은 유지)
+        """
+        try:
+            result = subprocess.run(["iptables", "-S", "FORWARD"], capture_output=True, text=True)
+        except FileNotFoundError:
+            return 0
+        if result.returncode != 0:
+            return 0
+        rules = [line for line in result.stdout.splitlines() if line.startswith("-A FORWARD ")]
+        legacy = [f"-A FORWARD {rule}" for rule in LEGACY_RULES]
+        numbers = []
+        index = 0
+        while index + len(legacy) <= len(rules):
+            if rules[index:index + len(legacy)] == legacy:
+                numbers += range(index + 1, index + len(legacy) + 1)
+                index += len(legacy)
+            else:
+                index += 1
+        # 뒤에서부터 지워야 앞 규칙 번호가 바뀌지 않음
+        removed = 0
+        for number in reversed(numbers):
+            if self._run(["iptables", "-D", "FORWARD", str(number)], check=False):
+                removed += 1
+        if removed:
+            self.log(f"이전 Kill Switch 규칙 {removed}개 제거")
+        return removed
+
+    # ===== set 갱신 =====
+    def _update_set(self, action: str, set_name: str, element: str):
+        self._run(["nft", action, "element", NFT_FAMILY, NFT_TABLE, set_name, f"{{ {element} }}"])
+
+    def allow_network(self, cidr: str):
+        """허용 대역 추가"""
+        if cidr in self.allowed_ips:
+            return
+        self.allowed_ips.append(cidr)
+        if self.backend == "nft":
+            self._update_set("add", "allowed_nets", cidr)
+        else:
+            self.apply()
+
+    def remove_network(self, cidr: str):
+        """허용 대역 제거"""
+        if cidr not in self.allowed_ips:
+            return
+        self.allowed_ips.remove(cidr)
+        if self.backend == "nft":
+            self._update_set("delete", "allowed_nets", cidr)
+        else:
+            self.apply()
+
+    def add_interface(self, interface: str):
+        """동글 인터페이스 허용 (동글 활성화/복구 시)"""
+        if interface in self.dongle_interfaces:
+            return
+        self.dongle_interfaces.append(interface)
+        if self.backend == "nft":
+            self._update_set("add", "dongle_ifaces", f'"{interface}"')
+        else:
+            self.apply()
+
+    def remove_interface(self, interface: str):
+        """동글 인터페이스 차단 (동글 실패 시)"""
+        if interface not in self.dongle_interfaces:
+            return
+        self.dongle_interfaces.remove(interface)
+        if self.backend == "nft":
+            self._update_set("delete", "dongle_ifaces", f'"{interface}"')
+        else:
+            self.apply()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+다중 동글 egress 로드밸런싱
+- 정상 동글 전체에 가중치 multipath default 라우트 (L4 플로우 해시)
+- 가중치는 측정 처리량(인터페이스 카운터)과 지연(헬스체크 RTT)으로 재계산
+- 동글 실패/복구 시 라우트를 한 번의 배치로 원자적으로 교체
+"""
+
+import time
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+HASH_POLICY_PATH = "/proc/sys/net/ipv4/fib_multipath_hash_policy"
+STATISTICS_PATH = "/sys/class/net/{interface}/statistics/{counter}"
+
+
+def read_interface_bytes(interface: str) -> Optional[int]:
+    """인터페이스 송수신 누적 바이트"""
+    try:
+        total = 0
+        for counter in ('rx_bytes', 'tx_bytes'):
+            with open(STATISTICS_PATH.format(interface=interface, counter=counter)) as f:
+                total += int(f.read())
+        return total
+    except (OSError, ValueError):
+        return None
+
+
+class EgressBalancer:
+    """동글 가중치 multipath 라우트 관리"""
+
+    def __init__(self, server, table: int = 250, interval: float = 30, hash_policy: int = 1,
+                 max_weight: int = 16, decay: float = 0.9, log: Callable = None):
+        self.server = server
+        self.table = table
+        self.interval = interval
+        self.hash_policy = hash_policy
+        self.max_weight = max_weight
+        self.decay = decay
+        self.log = log or server.log
+
+        self.peak_mbps: Dict[str, float] = {}
+        self.weights: Dict[str, int] = {}
+        self._counters: Dict[str, tuple] = {}
+        self._applied = None
+
+    @classmethod
+    def from_config(cls, server, balancing: dict) -> 'EgressBalancer':
+        return cls(
+            server,
+            table=balancing.get('routing_table', 250),
+            interval=balancing.get('interval', 30),
+            hash_policy=balancing.get('hash_policy', 1),
+            max_weight=balancing.get('max_weight', 16)
+        )
+
+    def enable_flow_hashing(self):
+        """multipath 해시에 L4 포트 포함 (같은 플로우는 같은 동글 유지)"""
+        try:
+            with open(HASH_POLICY_PATH, 'w') as f:
+                f.write(str(self.hash_policy))
+        except OSError as e:
+            self.log(f"fib_multipath_hash_policy 설정 실패: {e}", "WARNING")
+
+    # ===== 측정 =====
+    def candidates(self, rejoining: str = None) -> List[str]:
+        """가중치 대상 동글 (실패/로테이션 중/스탠바이 제외, rejoining은 로테이션 완료 직전 동글)"""
+        names = []
+        for name, dongle in self.server.config['dongles'].items():
+            if dongle['status'] != 'active' or dongle.get('role') == 'standby':
+                continue
+            if name in self.server.rotating and name != rejoining:
+                continue
+            if not self.server.health.get(name, {}).get('healthy', True):
+                continue
+            names.append(name)
+        return names
+
+    def measure(self):
+        """인터페이스 카운터로 동글별 처리량 갱신 (감쇠 최대값 유지)"""
+        now = time.monotonic()
+        for name, dongle in self.server.config['dongles'].items():
+            total = read_interface_bytes(dongle['interface'])
+            if total is None:
+                continue
+            previous = self._counters.get(name)
+            self._counters[name] = (now, total)
+            if not previous or now <= previous[0] or total < previous[1]:
+                continue
+            mbps = (total - previous[1]) * 8 / (now - previous[0]) / 1e6
+            self.peak_mbps[name] = max(mbps, self.peak_mbps.get(name, 0) * self.decay)
+
+    def compute_weights(self, names: List[str]) -> Dict[str, int]:
+        """처리량 / 지연 기반 가중치 (1..max_weight)"""
+        scores = {}
+        rtts = [
+            self.server.health[name]['rtt_ms'] for name in names
+            if self.server.health.get(name, {}).get('rtt_ms')
+        ]
+        best_rtt = min(rtts) if rtts else None
+        for name in names:
+            dongle = self.server.config['dongles'][name]
+            capacity = max(self.peak_mbps.get(name, 0), dongle.get('bandwidth_mbps', 0)) or 1.0
+            rtt = self.server.health.get(name, {}).get('rtt_ms')
+            latency_factor = best_rtt / rtt if best_rtt and rtt else 1.0
+            scores[name] = capacity * latency_factor
+
+        top = max(scores.values(), default=0)
+        return {
+            name: max(1, round(score / top * self.max_weight)) if top else 1
+            for name, score in scores.items()
+        }
+
+    # ===== 적용 =====
+    def routes(self, weights: Dict[str, int]) -> List[Dict]:
+        dongles = self.server.config['dongles']
+        nexthops = [
+            {'gateway': dongles[name]['gateway'], 'interface': dongles[name]['interface'], 'weight': weight}
+            for name, weight in sorted(weights.items())
+        ]
+        if len(nexthops) == 1:
+            return [{'dst': 'default', 'gateway': nexthops[0]['gateway'], 'interface': nexthops[0]['interface']}]
+        return [{'dst': 'default', 'nexthops': nexthops}]
+
+    def rebalance(self, force: bool = False, rejoining: str = None) -> bool:
+        """정상 동글 기준으로 multipath 라우트 재적용 (변경이 있을 때만)"""
+        names = self.candidates(rejoining)
+        if not names:
+            self.log("로드밸런싱 대상 동글 없음, 기존 라우트 유지", "WARNING")
+            return False
+        weights = self.compute_weights(names)
+        routes = self.routes(weights)
+        if routes == self._applied and not force:
+            return False
+        try:
+            self.server.net.apply_table(self.table, routes)
+        except OSError as e:
+            self.log(f"로드밸런싱 라우트 적용 실패: {e}", "ERROR")
+            return False
+        self._applied = routes
+        self.weights = weights
+        self.log(f"로드밸런싱 가중치 (table {self.table}): {weights}")
+        return True
+
+    async def run_forever(self):
+        """interval마다 처리량 측정 후 가중치 갱신"""
+        self.enable_flow_hashing()
+        self.measure()
+        # 웜 리스타트로 기존 라우트를 인수했으면 달라졌을 때만 적용
+        self.rebalance(force=self._applied is None)
+        while True:
+            await asyncio.sleep(self.interval)
+            self.measure()
+            self.rebalance()
+
+    def status(self) -> Dict:
+        return {
+            'routing_table': self.table,
+            'weights': dict(self.weights),
+            'peak_mbps': {name: round(mbps, 2) for name, mbps in self.peak_mbps.items()},
+        }
@@ -9,10 +9,16 @@ import json
 import subprocess
 from datetime import datetime
 
+from command_batch import CommandBatch, RECORD
+from dongle_inventory import discover_usb_interfaces
+from health_prober import get_interface_ipv4
+from wg_keys import get_key_pool
+
 class MultiAgentVPNProxy:
     def __init__(self):
         self.config_file = "/home/proxy/agent_vpn_config.json"
         self.agents = []
+        self.keys = get_key_pool()
         self.load_config()
     
     def load_config(self):
@@ -21,41 +27,25 @@ class MultiAgentVPNProxy:
             with open(self.config_file, 'r') as f:
                 self.agents = json.load(f)
         else:
-            # 기본 설정
+            # 기본 설정: 감지된 USB 동글마다 에이전트 하나, 마지막은 메인라인
+            # (주소가 아직 없는 동글은 None - 설정 생성 시 resolve_interface_ip로 다시 조회)
+            interfaces = [
+                (interface, get_interface_ipv4(interface)) for interface in discover_usb_interfaces()
+            ]
+            interfaces.append(("eno1", "222.101.90.78"))
             self.agents = [
                 {
-                    "id": "agent1",
-                    "vpn_port": 51820,
-                    "vpn_subnet": "10.0.0.0/24",
-                    "vpn_ip": "10.0.0.1",
-                    "interface": "enp0s21f0u4",
-                    "interface_ip": "192.168.16.100",
-                    "socks_port": 1080,
-                    "routing_table": 200,
-                    "status": "active"
-                },
-                {
-                    "id": "agent2", 
-                    "vpn_port": 51821,
-                    "vpn_subnet": "10.1.0.0/24",
-                    "vpn_ip": "10.1.0.1",
-                    "interface": "enp0s21f0u3",
-                    "interface_ip": "192.168.14.100",
-                    "socks_port": 1081,
-                    "routing_table": 201,
-                    "status": "ready"
-                },
-                {
-                    "id": "agent3",
-                    "vpn_port": 51822,
-                    "vpn_subnet": "10.2.0.0/24", 
-                    "vpn_ip": "10.2.0.1",
-                    "interface": "eno1",
-                    "interface_ip": "222.101.90.78",
-                    "socks_port": 1082,
-                    "routing_table": 202,
-                    "status": "ready"
+                    "id": f"agent{i + 1}",
+                    "vpn_port": 51820 + i,
+                    "vpn_subnet": f"10.{i}.0.0/24",
+                    "vpn_ip": f"10.{i}.0.1",
+                    "interface": interface,
+                    "interface_ip": interface_ip,
+                    "socks_port": 1080 + i,
+                    "routing_table": 200 + i,
+                    "status": "active" if i == 0 else "ready"
                 }
+                for i, (interface, interface_ip) in enumerate(interfaces)
             ]
             self.save_config()
     
@@ -64,29 +54,54 @@ class MultiAgentVPNProxy:
         with open(self.config_file, 'w') as f:
             json.dump(self.agents, f, indent=2)
     
+    def resolve_interface_ip(self, agent):
+        """출구 인터페이스의 현재 IPv4 (동글 IP는 DHCP/토글로 바뀌므로 사용 시점에 조회, 없으면 저장된 값)"""
+        ip = get_interface_ipv4(agent['interface']) or agent.get('interface_ip')
+        if ip:
+            agent['interface_ip'] = ip
+        return ip
+    
+    def agent_hooks(self, agent):
+        """wg-quick PostUp/PreDown 명령 - ip는 ip -batch, iptables는 iptables-restore 한 번씩"""
+        interface = f"wg-{agent['id']}"
+        table = agent['routing_table']
+        priority = 100 + table
+        gateway = f"{agent['interface_ip'].rsplit('.', 1)[0]}.1"
+        
+        up = CommandBatch(mode=RECORD)
+        up.ip(f"rule add from {agent['vpn_subnet']} lookup {table} priority {priority}")
+        up.ip(f"route add default via {gateway} dev {agent['interface']} table {table}")
+        up.iptables(f"-A FORWARD -i {interface} -j ACCEPT")
+        up.iptables(f"-A FORWARD -o {interface} -j ACCEPT")
+        up.iptables(f"-A INPUT -i {interface} -j ACCEPT")
+        up.iptables(f"-A POSTROUTING -s {agent['vpn_subnet']} -o {agent['interface']} -j MASQUERADE", table='nat')
+        
+        down = CommandBatch(mode=RECORD)
+        down.ip(f"rule del from {agent['vpn_subnet']} lookup {table} priority {priority}")
+        down.iptables(f"-D FORWARD -i {interface} -j ACCEPT")
+        down.iptables(f"-D FORWARD -o {interface} -j ACCEPT")
+        down.iptables(f"-D INPUT -i {interface} -j ACCEPT")
+        down.iptables(f"-D POSTROUTING -s {agent['vpn_subnet']} -o {agent['interface']} -j MASQUERADE", table='nat')
+        
+        return up.shell(), down.shell()
+    
     def generate_vpn_config(self, agent):
         """에이전트별 VPN 설정 생성"""
+        post_up, pre_down = self.agent_hooks(agent)
+        hooks = "\n".join(
+            [f"PostUp = {command}" for command in post_up]
+            + ["PostUp = echo 1 > /proc/sys/net/ipv4/ip_forward", ""]
+            + [f"PreDown = {command}" for command in pre_down]
+        )
         config = f"""[Interface]
 # {agent['id']} VPN 서버
 Address = {agent['vpn_ip']}/24
 ListenPort = {agent['vpn_port']}
 PrivateKey = PRIVATE_KEY_{agent['id'].upper()}
 
-# 라우팅 설정
+# 라우팅 설정 (명령을 도구별 한 번의 실행으로 묶음)
 Table = {agent['routing_table']}
-PostUp = ip rule add from {agent['vpn_subnet']} lookup {agent['routing_table']} priority {100 + agent['routing_table']}
-PostUp = ip route add default via {agent['interface_ip'].rsplit('.', 1)[0]}.1 dev {agent['interface']} table {agent['routing_table']}
-PostUp = echo 1 > /proc/sys/net/ipv4/ip_forward
-PostUp = iptables -A FORWARD -i %i -j ACCEPT
-PostUp = iptables -A FORWARD -o %i -j ACCEPT
-PostUp = iptables -t nat -A POSTROUTING -s {agent['vpn_subnet']} -o {agent['interface']} -j MASQUERADE
-PostUp = iptables -A INPUT -i %i -j ACCEPT
-
-PreDown = ip rule del from {agent['vpn_subnet']} lookup {agent['routing_table']} priority {100 + agent['routing_table']}
-PreDown = iptables -D FORWARD -i %i -j ACCEPT
-PreDown = iptables -D FORWARD -o %i -j ACCEPT
-PreDown = iptables -t nat -D POSTROUTING -s {agent['vpn_subnet']} -o {agent['interface']} -j MASQUERADE
-PreDown = iptables -D INPUT -i %i -j ACCEPT
+{hooks}
 
 # 클라이언트는 추후 추가
 """
@@ -98,6 +113,9 @@ PreDown = iptables -D INPUT -i %i -j ACCEPT
         if not agent:
             print(f"❌ 에이전트 {agent_id}를 찾을 수 없습니다")
             return False
+        if not self.resolve_interface_ip(agent):
+            print(f"❌ {agent['interface']}에 IPv4 주소가 없습니다 - 주소 할당 후 다시 시도하세요")
+            return False
         
         print(f"설정 중: {agent['id']}")
         print(f"  - VPN 포트: {agent['vpn_port']}")
@@ -109,8 +127,7 @@ PreDown = iptables -D INPUT -i %i -j ACCEPT
         config = self.generate_vpn_config(agent)
         
         # 개인키 생성
-        private_key = subprocess.run(['wg', 'genkey'], capture_output=True, text=True).stdout.strip()
-        public_key = subprocess.run(['wg', 'pubkey'], input=private_key, capture_output=True, text=True).stdout.strip()
+        private_key, public_key = self.keys.take()
         
         config = config.replace(f"PRIVATE_KEY_{agent['id'].upper()}", private_key)
         
@@ -139,7 +156,7 @@ PreDown = iptables -D INPUT -i %i -j ACCEPT
     def start_socks_proxy(self, agent_id):
         """SOCKS5 프록시 시작"""
         agent = next((a for a in self.agents if a['id'] == agent_id), None)
-        if not agent:
+        if not agent or not self.resolve_interface_ip(agent):
             return False
         
         # SSH 동적 포트 포워딩을 사용한 SOCKS5 프록시
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+rtnetlink 네트워크 백엔드
+- 주소/라우트/규칙 조회 및 변경을 ip 프로세스 생성 없이 처리
+- 라우팅 테이블 변경(삭제 + default + 서브넷)을 한 번의 배치로 전송
+- netlink를 쓸 수 없는 환경에서는 ip 명령 기반 백엔드로 대체
+"""
+
+import os
+import json
+import errno
+import socket
+import struct
+import ipaddress
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+from command_batch import CommandBatch, CommandError
+
+# ===== netlink 상수 =====
+NETLINK_ROUTE = 0
+
+NLM_F_REQUEST = 0x01
+NLM_F_MULTI = 0x02
+NLM_F_ACK = 0x04
+NLM_F_DUMP = 0x300
+NLM_F_REPLACE = 0x100
+NLM_F_EXCL = 0x200
+NLM_F_CREATE = 0x400
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_GETROUTE = 26
+RTM_NEWRULE = 32
+RTM_DELRULE = 33
+RTM_GETRULE = 34
+
+# 멀티캐스트 그룹 (비트마스크)
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+RTA_PRIORITY = 6
+RTA_PREFSRC = 7
+RTA_MULTIPATH = 9
+RTA_TABLE = 15
+
+FRA_DST = 1
+FRA_SRC = 2
+FRA_PRIORITY = 6
+FRA_FWMARK = 10
+FRA_TABLE = 15
+
+RTN_UNICAST = 1
+RTPROT_STATIC = 4
+RT_SCOPE_UNIVERSE = 0
+RT_SCOPE_LINK = 253
+RT_SCOPE_HOST = 254
+FR_ACT_TO_TBL = 1
+RT_TABLE_UNSPEC = 0
+
+IFF_UP = 0x1
+IFF_RUNNING = 0x40
+IFF_LOWER_UP = 0x10000
+
+NLMSG_HDR = struct.Struct('=IHHII')
+RTATTR_HDR = struct.Struct('=HH')
+IFINFOMSG = struct.Struct('=BxHiII')
+IFADDRMSG = struct.Struct('=BBBBI')
+RTMSG = struct.Struct('=BBBBBBBBI')  # fib_rule_hdr도 같은 레이아웃
+
+
+class NetlinkError(OSError):
+    """netlink 요청 실패"""
+
+
+def align4(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def pack_attr(attr_type: int, payload: bytes) -> bytes:
+    length = RTATTR_HDR.size + len(payload)
+    return RTATTR_HDR.pack(length, attr_type) + payload + b'\x00' * (align4(length) - length)
+
+
+def parse_attrs(data: bytes, offset: int = 0) -> Dict[int, bytes]:
+    """rtattr 목록 파싱 -> {타입: 페이로드}"""
+    attrs = {}
+    while offset + RTATTR_HDR.size <= len(data):
+        length, attr_type = RTATTR_HDR.unpack_from(data, offset)
+        if length < RTATTR_HDR.size:
+            break
+        attrs[attr_type & 0x7FFF] = data[offset + RTATTR_HDR.size:offset + length]
+        offset += align4(length)
+    return attrs
+
+
+def iter_messages(data: bytes):
+    """수신 버퍼의 netlink 메시지 순회 -> (타입, 플래그, 시퀀스, 본문)"""
+    offset = 0
+    while offset + NLMSG_HDR.size <= len(data):
+        length, msg_type, flags, seq, _ = NLMSG_HDR.unpack_from(data, offset)
+        if length < NLMSG_HDR.size:
+            break
+        yield msg_type, flags, seq, data[offset + NLMSG_HDR.size:offset + length]
+        offset += align4(length)
+
+
+def interface_name(index: int) -> Optional[str]:
+    try:
+        return socket.if_indextoname(index)
+    except OSError:
+        return None
+
+
+def parse_link(body: bytes) -> Dict:
+    """RTM_NEWLINK/DELLINK 본문 파싱"""
+    family, if_type, index, flags, _ = IFINFOMSG.unpack_from(body)
+    attrs = parse_attrs(body, IFINFOMSG.size)
+    name = attrs.get(IFLA_IFNAME, b'').rstrip(b'\x00').decode() or interface_name(index)
+    return {
+        'index': index,
+        'interface': name,
+        'flags': flags,
+        'up': bool(flags & IFF_UP),
+        'running': bool(flags & IFF_RUNNING),
+        'lower_up': bool(flags & IFF_LOWER_UP),
+    }
+
+
+def parse_address(body: bytes) -> Dict:
+    """RTM_NEWADDR/DELADDR 본문 파싱"""
+    family, prefixlen, flags, scope, index = IFADDRMSG.unpack_from(body)
+    attrs = parse_attrs(body, IFADDRMSG.size)
+    raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+    label = attrs.get(IFA_LABEL, b'').rstrip(b'\x00').decode()
+    return {
+        'index': index,
+        'interface': label or interface_name(index),
+        'family': family,
+        'address': socket.inet_ntop(family, raw) if raw else None,
+        'prefixlen': prefixlen,
+        'scope': scope,
+    }
+
+
+def parse_route(body: bytes) -> Dict:
+    """RTM_NEWROUTE 본문 파싱"""
+    family, dst_len, _, tos, table, protocol, scope, rtype, _ = RTMSG.unpack_from(body)
+    attrs = parse_attrs(body, RTMSG.size)
+    if RTA_TABLE in attrs:
+        table = struct.unpack('=I', attrs[RTA_TABLE][:4])[0]
+    dst = socket.inet_ntop(family, attrs[RTA_DST]) if RTA_DST in attrs else None
+    oif = struct.unpack('=i', attrs[RTA_OIF][:4])[0] if RTA_OIF in attrs else None
+    route = {
+        'dst': f"{dst}/{dst_len}" if dst else 'default',
+        'gateway': socket.inet_ntop(family, attrs[RTA_GATEWAY]) if RTA_GATEWAY in attrs else None,
+        'interface': interface_name(oif) if oif else None,
+        'table': table,
+        'protocol': protocol,
+        'scope': scope,
+        'type': rtype,
+        'tos': tos,
+    }
+    if RTA_MULTIPATH in attrs:
+        route['nexthops'] = parse_multipath(attrs[RTA_MULTIPATH], family)
+    return route
+
+
+def parse_multipath(data: bytes, family: int) -> List[Dict]:
+    """RTA_MULTIPATH (rtnexthop 목록) 파싱"""
+    nexthops = []
+    offset = 0
+    while offset + 8 <= len(data):
+        length, _, hops, index = struct.unpack_from('=HBBi', data, offset)
+        if length < 8:
+            break
+        attrs = parse_attrs(data[offset + 8:offset + length])
+        nexthops.append({
+            'gateway': socket.inet_ntop(family, attrs[RTA_GATEWAY]) if RTA_GATEWAY in attrs else None,
+            'interface': interface_name(index),
+            'weight': hops + 1,
+        })
+        offset += align4(length)
+    return nexthops
+
+
+def parse_rule(body: bytes) -> Dict:
+    """RTM_NEWRULE 본문 파싱"""
+    family, dst_len, src_len, _, table, _, _, action, _ = RTMSG.unpack_from(body)
+    attrs = parse_attrs(body, RTMSG.size)
+    if FRA_TABLE in attrs:
+        table = struct.unpack('=I', attrs[FRA_TABLE][:4])[0]
+    src = socket.inet_ntop(family, attrs[FRA_SRC]) if FRA_SRC in attrs else None
+    return {
+        'src': f"{src}/{src_len}" if src else 'all',
+        'table': table,
+        'priority': struct.unpack('=I', attrs[FRA_PRIORITY][:4])[0] if FRA_PRIORITY in attrs else None,
+        'action': action,
+    }
+
+
+def split_prefix(cidr: str):
+    """'default' 또는 CIDR -> (주소 패밀리, 주소 바이트, 프리픽스 길이)"""
+    if cidr == 'default':
+        return socket.AF_INET, None, 0
+    network = ipaddress.ip_network(cidr, strict=False)
+    family = socket.AF_INET if network.version == 4 else socket.AF_INET6
+    return family, network.network_address.packed, network.prefixlen
+
+
+class NetlinkBackend:
+    """rtnetlink 소켓 기반 백엔드"""
+
+    name = 'netlink'
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.bind((0, 0))
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.sock.close()
+
+    # ===== 송수신 =====
+    def _message(self, msg_type: int, flags: int, body: bytes) -> tuple:
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        header = NLMSG_HDR.pack(NLMSG_HDR.size + len(body), msg_type, flags | NLM_F_REQUEST, self._seq, 0)
+        return self._seq, header + body
+
+    def _dump(self, msg_type: int, body: bytes) -> List[tuple]:
+        """덤프 요청 -> [(타입, 본문), ...]"""
+        with self._lock:
+            seq, message = self._message(msg_type, NLM_F_DUMP, body)
+            self.sock.send(message)
+            results = []
+            while True:
+                data = self.sock.recv(1 << 16)
+                for reply_type, _, reply_seq, reply in iter_messages(data):
+                    if reply_seq != seq:
+                        continue
+                    if reply_type == NLMSG_DONE:
+                        return results
+                    if reply_type == NLMSG_ERROR:
+                        code = -struct.unpack_from('=i', reply)[0]
+                        if code:
+                            raise NetlinkError(code, os.strerror(code))
+                        continue
+                    results.append((reply_type, reply))
+
+    def _transact(self, requests: List[tuple], ignore=()) -> List[int]:
+        """변경 요청 배치를 한 번에 전송하고 모든 ACK 수신
+
+        requests: [(타입, 플래그, 본문), ...]
+        반환값: 요청별 errno (0 = 성공). ignore에 없는 오류는 예외로 전달
+        """
+        if not requests:
+            return []
+        with self._lock:
+            sequences = []
+            payload = b''
+            for msg_type, flags, body in requests:
+                seq, message = self._message(msg_type, flags | NLM_F_ACK, body)
+                sequences.append(seq)
+                payload += message
+            self.sock.send(payload)
+
+            pending = {seq: index for index, seq in enumerate(sequences)}
+            codes = [0] * len(requests)
+            while pending:
+                data = self.sock.recv(1 << 16)
+                for reply_type, _, reply_seq, reply in iter_messages(data):
+                    if reply_type == NLMSG_ERROR and reply_seq in pending:
+                        codes[pending.pop(reply_seq)] = -struct.unpack_from('=i', reply)[0]
+
+        for code in codes:
+            if code and code not in ignore:
+                raise NetlinkError(code, os.strerror(code))
+        return codes
+
+    # ===== 주소 =====
+    def get_addresses(self, interface: str = None, family: int = socket.AF_INET) -> List[Dict]:
+        """인터페이스 주소 목록"""
+        index = socket.if_nametoindex(interface) if interface else 0
+        addresses = []
+        for _, body in self._dump(RTM_GETADDR, IFADDRMSG.pack(family, 0, 0, 0, 0)):
+            address = parse_address(body)
+            if index and address['index'] != index:
+                continue
+            addresses.append(address)
+        return addresses
+
+    def get_interface_ip(self, interface: str) -> Optional[str]:
+        """인터페이스의 전역(universe) IPv4 주소"""
+        try:
+            for address in self.get_addresses(interface):
+                if address['scope'] == RT_SCOPE_UNIVERSE:
+                    return address['address']
+        except OSError:
+            pass
+        return None
+
+    def get_links(self) -> List[Dict]:
+        """네트워크 인터페이스 목록"""
+        return [parse_link(body) for _, body in self._dump(RTM_GETLINK, IFINFOMSG.pack(0, 0, 0, 0, 0))]
+
+    # ===== 라우트 =====
+    def get_routes(self, table: int, family: int = socket.AF_INET) -> List[Dict]:
+        """라우팅 테이블 조회"""
+        body = RTMSG.pack(family, 0, 0, 0, table & 0xFF if table < 256 else 0, 0, 0, 0, 0)
+        routes = [parse_route(body) for _, body in self._dump(RTM_GETROUTE, body)]
+        return [route for route in routes if route['table'] == table]
+
+    def _route_body(self, route: Dict, table: int) -> bytes:
+        family, dst, dst_len = split_prefix(route['dst'])
+        scope = route.get('scope')
+        if scope is None:
+            scope = RT_SCOPE_UNIVERSE if route.get('gateway') or route.get('nexthops') else RT_SCOPE_LINK
+        body = RTMSG.pack(family, dst_len, 0, route.get('tos', 0),
+                          table if table < 256 else RT_TABLE_UNSPEC,
+                          route.get('protocol', RTPROT_STATIC), scope, route.get('type', RTN_UNICAST), 0)
+        body += pack_attr(RTA_TABLE, struct.pack('=I', table))
+        if dst:
+            body += pack_attr(RTA_DST, dst)
+        if route.get('nexthops'):
+            body += pack_attr(RTA_MULTIPATH, self._multipath(route['nexthops'], family))
+        else:
+            if route.get('gateway'):
+                body += pack_attr(RTA_GATEWAY, socket.inet_pton(family, route['gateway']))
+            if route.get('interface'):
+                body += pack_attr(RTA_OIF, struct.pack('=i', socket.if_nametoindex(route['interface'])))
+        return body
+
+    @staticmethod
+    def _multipath(nexthops: List[Dict], family: int) -> bytes:
+        data = b''
+        for hop in nexthops:
+            attrs = b''
+            if hop.get('gateway'):
+                attrs = pack_attr(RTA_GATEWAY, socket.inet_pton(family, hop['gateway']))
+            weight = max(1, min(256, int(hop.get('weight', 1))))
+            data += struct.pack('=HBBi', 8 + len(attrs), 0, weight - 1,
+                                socket.if_nametoindex(hop['interface'])) + attrs
+        return data
+
+    def replace_route(self, table: int, dst: str = 'default', gateway: str = None,
+                      interface: str = None):
+        """라우트 교체 (ip route replace)"""
+        route = {'dst': dst, 'gateway': gateway, 'interface': interface}
+        self._transact([(RTM_NEWROUTE, NLM_F_CREATE | NLM_F_REPLACE, self._route_body(route, table))])
+
+    def apply_tables(self, tables: Dict[int, List[Dict]]):
+        """여러 테이블을 원하는 상태로 일괄 변경 (불필요한 라우트 삭제 + 교체)
+
+        tables: {테이블 ID: [{'dst', 'gateway', 'interface'}, ...]}
+        """
+        requests = []
+        for table, routes in tables.items():
+            wanted = {route['dst'] for route in routes}
+            for current in self.get_routes(table):
+                if current['dst'] not in wanted:
+                    # 커널은 삭제 시 protocol/type/tos까지 비교하므로 덤프된 값 그대로 사용
+                    # (proto boot/kernel 라우트도 ip route del처럼 지워짐)
+                    requests.append((RTM_DELROUTE, 0, self._route_body({
+                        key: current[key] for key in ('dst', 'scope', 'protocol', 'type', 'tos')
+                    }, table)))
+            for route in routes:
+                requests.append((RTM_NEWROUTE, NLM_F_CREATE | NLM_F_REPLACE, self._route_body(route, table)))
+        self._transact(requests)
+
+    def apply_table(self, table: int, routes: List[Dict]):
+        """테이블 하나를 원하는 상태로 변경 (flush + default + 서브넷을 한 배치로)"""
+        self.apply_tables({table: routes})
+
+    def flush_table(self, table: int):
+        """테이블 비우기"""
+        self.apply_tables({table: []})
+
+    # ===== 정책 라우팅 규칙 =====
+    def get_rules(self, family: int = socket.AF_INET) -> List[Dict]:
+        body = RTMSG.pack(family, 0, 0, 0, 0, 0, 0, 0, 0)
+        return [parse_rule(body) for _, body in self._dump(RTM_GETRULE, body)]
+
+    def _rule_body(self, src: str, table: int, priority: int = None) -> bytes:
+        family, addr, src_len = split_prefix(src) if src != 'all' else (socket.AF_INET, None, 0)
+        body = RTMSG.pack(family, 0, src_len, 0, table if table < 256 else RT_TABLE_UNSPEC,
+                          0, 0, FR_ACT_TO_TBL, 0)
+        body += pack_attr(FRA_TABLE, struct.pack('=I', table))
+        if addr:
+            body += pack_attr(FRA_SRC, addr)
+        if priority is not None:
+            body += pack_attr(FRA_PRIORITY, struct.pack('=I', priority))
+        return body
+
+    def add_rule(self, src: str, table: int, priority: int = None):
+        """규칙 추가 (ip rule add from <src> lookup <table>), 이미 있으면 무시"""
+        self._transact([(RTM_NEWRULE, NLM_F_CREATE | NLM_F_EXCL, self._rule_body(src, table, priority))],
+                       ignore=(errno.EEXIST,))
+
+    def delete_rule(self, src: str, table: int, priority: int = None):
+        """규칙 삭제, 없으면 무시"""
+        self._transact([(RTM_DELRULE, 0, self._rule_body(src, table, priority))],
+                       ignore=(errno.ENOENT,))
+
+
+RESERVED_TABLES = {'default': 253, 'main': 254, 'local': 255}
+
+
+class IpCommandBackend:
+    """ip 명령 기반 백엔드 (netlink 사용 불가 시)
+
+    조회는 ip -j JSON 출력을, 변경은 ip -batch 한 번으로 처리한다.
+    """
+
+    name = 'ip'
+
+    def _run(self, args: List[str], input_text: str = None) -> str:
+        result = subprocess.run(['ip'] + args, input=input_text, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise NetlinkError(errno.EIO, result.stderr.strip() or f"ip {' '.join(args)} 실패")
+        return result.stdout
+
+    def _batch(self, commands: List[str]):
+        # -force: 중간 실패가 있어도 나머지 명령 계속 실행
+        batch = CommandBatch(ip_force=True)
+        for command in commands:
+            batch.ip(command)
+        try:
+            batch.flush()
+        except CommandError as e:
+            raise NetlinkError(errno.EIO, e.stderr or str(e))
+
+    def close(self):
+        pass
+
+    def get_addresses(self, interface: str = None, family: int = socket.AF_INET) -> List[Dict]:
+        args = ['-j', '-4' if family == socket.AF_INET else '-6', 'addr', 'show']
+        if interface:
+            args += ['dev', interface]
+        addresses = []
+        for link in json.loads(self._run(args) or '[]'):
+            for info in link.get('addr_info', []):
+                addresses.append({
+                    'index': link.get('ifindex'),
+                    'interface': link.get('ifname'),
+                    'family': family,
+                    'address': info.get('local'),
+                    'prefixlen': info.get('prefixlen'),
+                    'scope': RT_SCOPE_UNIVERSE if info.get('scope') == 'global' else RT_SCOPE_LINK,
+                })
+        return addresses
+
+    def get_interface_ip(self, interface: str) -> Optional[str]:
+        try:
+            for address in self.get_addresses(interface):
+                if address['scope'] == RT_SCOPE_UNIVERSE:
+                    return address['address']
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def get_links(self) -> List[Dict]:
+        links = []
+        for link in json.loads(self._run(['-j', 'link', 'show']) or '[]'):
+            flags = link.get('flags', [])
+            links.append({
+                'index': link.get('ifindex'),
+                'interface': link.get('ifname'),
+                'flags': 0,
+                'up': 'UP' in flags,
+                'running': 'LOWER_UP' in flags,
+                'lower_up': 'LOWER_UP' in flags,
+            })
+        return links
+
+    def get_routes(self, table: int, family: int = socket.AF_INET) -> List[Dict]:
+        entries = json.loads(self._run(['-j', 'route', 'show', 'table', str(table)]) or '[]')
+        return [self._parse_route(entry, table) for entry in entries]
+
+    def _routes_by_table(self, tables) -> Dict[int, List[Dict]]:
+        """여러 테이블 조회 - ip 프로세스 한 번 (table all)"""
+        wanted = {int(table) for table in tables}
+        if len(wanted) <= 1:
+            return {table: self.get_routes(table) for table in wanted}
+        grouped = {table: [] for table in wanted}
+        for entry in json.loads(self._run(['-j', 'route', 'show', 'table', 'all']) or '[]'):
+            table = entry.get('table', 'main')
+            table = int(table) if str(table).isdigit() else RESERVED_TABLES.get(table)
+            if table in grouped:
+                grouped[table].append(self._parse_route(entry, table))
+        return grouped
+
+    @staticmethod
+    def _parse_route(entry: Dict, table: int) -> Dict:
+        route = {
+            'dst': entry.get('dst', 'default'),
+            'gateway': entry.get('gateway'),
+            'interface': entry.get('dev'),
+            'table': table,
+            'scope': RT_SCOPE_LINK if entry.get('scope') == 'link' else RT_SCOPE_UNIVERSE,
+        }
+        if 'nexthops' in entry:
+            route['nexthops'] = [
+                {'gateway': hop.get('gateway'), 'interface': hop.get('dev'), 'weight': hop.get('weight', 1)}
+                for hop in entry['nexthops']
+            ]
+        return route
+
+    @staticmethod
+    def route_command(action: str, route: Dict, table: int) -> str:
+        cmd = f"route {action} {route['dst']}"
+        if route.get('nexthops'):
+            for hop in route['nexthops']:
+                cmd += f" nexthop via {hop['gateway']} dev {hop['interface']} weight {int(hop.get('weight', 1))}"
+        else:
+            if route.get('gateway'):
+                cmd += f" via {route['gateway']}"
+            if route.get('interface'):
+                cmd += f" dev {route['interface']}"
+        return f"{cmd} table {table}"
+
+    def replace_route(self, table: int, dst: str = 'default', gateway: str = None,
+                      interface: str = None):
+        route = {'dst': dst, 'gateway': gateway, 'interface': interface}
+        self._batch([self.route_command('replace', route, table)])
+
+    def apply_tables(self, tables: Dict[int, List[Dict]]):
+        commands = []
+        current_routes = self._routes_by_table(tables)
+        for table, routes in tables.items():
+            wanted = {route['dst'] for route in routes}
+            for current in current_routes[int(table)]:
+                if current['dst'] not in wanted:
+                    commands.append(f"route del {current['dst']} table {table}")
+            commands.extend(self.route_command('replace', route, table) for route in routes)
+        self._batch(commands)
+
+    def apply_table(self, table: int, routes: List[Dict]):
+        self.apply_tables({table: routes})
+
+    def flush_table(self, table: int):
+        self._batch([f"route flush table {table}"])
+
+    def get_rules(self, family: int = socket.AF_INET) -> List[Dict]:
+        rules = []
+        for entry in json.loads(self._run(['-j', 'rule', 'show']) or '[]'):
+            src = entry.get('src', 'all')
+            if src != 'all' and 'srclen' in entry:
+                src = f"{src}/{entry['srclen']}"
+            table = entry.get('table')
+            rules.append({
+                'src': src,
+                'table': int(table) if str(table).isdigit() else table,
+                'priority': entry.get('priority'),
+                'action': FR_ACT_TO_TBL,
+            })
+        return rules
+
+    def add_rule(self, src: str, table: int, priority: int = None):
+        if any(rule['src'] == src and rule['table'] == table for rule in self.get_rules()):
+            return
+        cmd = f"rule add from {src} lookup {table}"
+        if priority is not None:
+            cmd += f" priority {priority}"
+        self._batch([cmd])
+
+    def delete_rule(self, src: str, table: int, priority: int = None):
+        cmd = f"rule del from {src} lookup {table}"
+        if priority is not None:
+            cmd += f" priority {priority}"
+        self._batch([cmd])
+
+
+def get_backend(preferred: str = 'auto'):
+    """네트워크 백엔드 선택 (auto: netlink 우선, 실패 시 ip 명령)"""
+    if preferred in ('auto', 'netlink'):
+        try:
+            return NetlinkBackend()
+        except OSError:
+            if preferred == 'netlink':
+                raise
+    return IpCommandBackend()
@@ -13,55 +13,70 @@ import asyncio
 import subprocess
 import threading
 import time
-from datetime import datetime
 from typing import Dict, List, Optional
 import socket
+import signal
 import struct
 
+from dongle_inventory import DongleInventory, guess_gateway
+from event_log import get_event_log
+from state_store import StateCollection, get_state_store
+from dongle_monitor import DongleLinkMonitor, LINK_DOWN, LINK_UP, ADDRESS_ADDED, ADDRESS_REMOVED
+from failover_manager import FailoverManager
+from health_prober import DongleHealthProber
+from load_balancer import EgressBalancer
+from kill_switch import KillSwitch, KillSwitchError
+from rotation_engine import RotationEngine, RotationJob
+from rotation_scheduler import RollingRotationScheduler
+from netlink_backend import get_backend
+from standby_pool import StandbyPool
+from startup_orchestrator import StartupOrchestrator, wait_port, wait_route
+from warm_restart import WarmRestart
+from socks5_server import Socks5Server, DEFAULT_BUFFER_SIZE, DEFAULT_UDP_BATCH
+
 class NetworkGatewayServer:
-    def __init__(self):
-        self.config_file = "/home/proxy/gateway_config.json"
-        self.log_file = "/home/proxy/gateway.log"
+    def __init__(self, config_file: str = "/home/proxy/gateway_config.json",
+                 log_file: str = "/home/proxy/gateway.log", state_file: str = None):
+        self.config_file = config_file
+        self.log_file = log_file
+        # 설정은 config_file 옆의 state.db에 섹션/동글 단위로 저장 (config_file은 최초 이전용)
+        self.state = get_state_store(state_file or os.path.join(os.path.dirname(config_file), "state.db"))
+        self.state_sections = StateCollection(self.state, 'gateway')
+        self.state_dongles = StateCollection(self.state, 'dongles')
         self.dongles = {}
         self.vpn_clients = {}
         self.proxies = {}
+        self.health = {}
+        self.rotating = set()
+        self.monitor = None
+        self.kill_switch = None
+        self.startup = []
+        self.warm_restart = None
         self.load_config()
+        self.events = get_event_log(self.log_file, self.config.get('logging', {}))
+        self.net = get_backend(self.config.get('network', {}).get('backend', 'auto'))
+        self.prober = DongleHealthProber.from_config(self.config['monitoring'])
+        self.rotation = RotationEngine.from_config(self, self.config.get('rotation', {}))
+        self.scheduler = RollingRotationScheduler.from_config(
+            self, self.rotation, self.config.get('rotation', {}).get('schedule', {}))
+        self.standby = StandbyPool.from_config(self, self.rotation, self.config.get('standby', {}))
+        self.balancer = EgressBalancer.from_config(self, self.config.get('load_balancing', {}))
+        self.failover = FailoverManager.from_config(self, self.config.get('failover', {}))
+        self.inventory = DongleInventory.from_config(self, self.config.get('inventory', {}))
+        self.loop = None
         
-    def log(self, message: str, level: str = "INFO"):
-        """로깅"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{level}] {message}"
-        print(log_entry)
-        with open(self.log_file, 'a') as f:
-            f.write(log_entry + "\n")
+    def log(self, message: str, level: str = "INFO", **fields):
+        """로깅 - 큐에 넣기만 하고 파일 기록은 백그라운드 스레드에서 (event, dongle, duration_ms 등)"""
+        self.events.emit(message, level, 'gateway', **fields)
+    
+    def recent_events(self, **filters) -> List[Dict]:
+        """최근 이벤트 조회 (since, level, event, dongle, limit)"""
+        return self.events.query(**filters)
     
     def load_config(self):
         """설정 로드"""
         default_config = {
-            "dongles": {
-                "dongle1": {
-                    "interface": "enp0s21f0u4",
-                    "ip": "192.168.16.100",
-                    "gateway": "192.168.16.1",
-                    "socks_port": 1080,
-                    "vpn_port": 51820,
-                    "routing_table": 200,
-                    "status": "active",
-                    "ip_toggle_enabled": True,
-                    "failover_dongle": "dongle2"
-                },
-                "dongle2": {
-                    "interface": "enp0s21f0u3", 
-                    "ip": "192.168.14.100",
-                    "gateway": "192.168.14.1",
-                    "socks_port": 1081,
-                    "vpn_port": 51821,
-                    "routing_table": 201,
-                    "status": "active",
-                    "ip_toggle_enabled": True,
-                    "failover_dongle": "dongle1"
-                }
-            },
+            "dongles": {},
             "main_line": {
                 "interface": "eno1",
                 "ip": "222.101.90.78",
@@ -70,65 +85,232 @@ class NetworkGatewayServer:
                 "routing_table": 202,
                 "status": "active"
             },
+            "inventory": {
+                "enabled": True,
+                "routing_tables": [200, 299],
+                "socks_ports": [1080, 1179],
+                "vpn_ports": [51820, 51919],
+                "retire_after": 3600,
+                "rescan_interval": 60
+            },
+            "network": {
+                "backend": "auto"
+            },
+            "socks5": {
+                "engine": "builtin",
+                "buffer_size": 262144,
+                "splice": True,
+                "udp_batch": 64
+            },
+            "rotation": {
+                "max_concurrent": 4,
+                "reconnect_delay": 2,
+                "ip_timeout": 15,
+                "schedule": {
+                    "enabled": False,
+                    "interval": 1800,
+                    "min_active": 1,
+                    "min_capacity_ratio": 0.5
+                }
+            },
+            "standby": {
+                "enabled": False,
+                "dongles": [],
+                "refill_interval": 10
+            },
+            "load_balancing": {
+                "enabled": False,
+                "routing_table": 250,
+                "interval": 30,
+                "hash_policy": 1,
+                "max_weight": 16
+            },
+            "failover": {
+                "failback_after": 60,
+                "load_penalty_ms": 50
+            },
             "kill_switch": {
                 "enabled": True,
+                "backend": "auto",
                 "block_on_vpn_failure": True,
                 "allowed_ips": ["10.0.0.0/8", "192.168.0.0/16"]
             },
+            "startup": {
+                "parallel": True,
+                "timeout": 10,
+                "warm_restart": True
+            },
+            "logging": {
+                "max_bytes": 10485760,
+                "backups": 5,
+                "ring_size": 2000,
+                "batch_size": 256,
+                "flush_interval": 0.5,
+                "echo": True
+            },
             "monitoring": {
                 "health_check_interval": 30,
+                "probe": {
+                    "method": "icmp",
+                    "target": "8.8.8.8",
+                    "tcp_port": 53,
+                    "timeout": 2,
+                    "concurrency": 32
+                },
                 "traffic_logging": True,
                 "alert_on_failure": True
             }
         }
         
-        if os.path.exists(self.config_file):
+        sections = self.state_sections.load()
+        if sections:
+            self.config = {'dongles': self.state_dongles.load(), **sections}
+        elif os.path.exists(self.config_file):
+            # 기존 JSON 설정 이전 (원본은 .migrated로 보관)
             with open(self.config_file, 'r') as f:
                 self.config = json.load(f)
+            self.save_config()
+            os.replace(self.config_file, self.config_file + ".migrated")
         else:
             self.config = default_config
             self.save_config()
     
     def save_config(self):
-        """설정 저장"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        """설정 저장 - 바뀐 섹션/동글 레코드만 한 트랜잭션으로 기록"""
+        sections = {key: value for key, value in self.config.items() if key != 'dongles'}
+        with self.state.transaction():
+            self.state_sections.save(sections)
+            self.state_dongles.save(self.config.get('dongles', {}))
     
     def setup_kill_switch(self):
         """Kill Switch 설정 - VPN 실패 시 트래픽 차단"""
         self.log("Kill Switch 설정 중...")
         
-        # 기본 DROP 정책
-        rules = [
-            # 로컬 트래픽 허용
-            "iptables -A FORWARD -s 10.0.0.0/8 -d 10.0.0.0/8 -j ACCEPT",
-            "iptables -A FORWARD -s 192.168.0.0/16 -d 192.168.0.0/16 -j ACCEPT",
-            
-            # VPN 인터페이스 트래픽 허용
-            "iptables -A FORWARD -i wg+ -j ACCEPT",
-            "iptables -A FORWARD -o wg+ -j ACCEPT",
-            
-            # 동글 인터페이스가 활성화된 경우만 허용
-            "iptables -A FORWARD -m mark --mark 0x100 -j ACCEPT",
-            
-            # 나머지는 DROP (Kill Switch)
-            "iptables -A FORWARD -j DROP"
+        settings = self.config['kill_switch']
+        active_interfaces = [
+            dongle['interface'] for dongle in self.config['dongles'].values()
+            if dongle['status'] == 'active'
         ]
+        self.kill_switch = KillSwitch(
+            settings.get('allowed_ips', ["10.0.0.0/8", "192.168.0.0/16"]),
+            active_interfaces,
+            backend=settings.get('backend', 'auto'),
+            log=self.log
+        )
         
-        for rule in rules:
-            subprocess.run(rule.split(), check=False)
+        try:
+            if self.warm_restart:
+                # 설치된 규칙과 비교해 달라진 set 원소만 갱신 (구조가 다르면 전체 재적용)
+                result = self.kill_switch.sync()
+                self.log(f"Kill Switch 웜 리스타트: {result}")
+            else:
+                # 이전 버전이 재시작마다 중복 추가한 FORWARD 규칙 정리 후 전체 규칙을 원자적으로 적용
+                self.kill_switch.remove_legacy_rules()
+                self.kill_switch.apply()
+        except KillSwitchError as e:
+            self.log(f"Kill Switch 설정 실패: {e}", "ERROR")
+            return False
         
         self.log("Kill Switch 활성화됨")
+        return True
+    
+    def set_dongle_egress(self, dongle_name: str, allowed: bool):
+        """Kill Switch에서 동글 인터페이스 허용/차단 (set 원소 하나만 갱신)"""
+        self.rebalance()
+        if not self.kill_switch:
+            return
+        interface = self.config['dongles'][dongle_name]['interface']
+        try:
+            if allowed:
+                self.kill_switch.add_interface(interface)
+            else:
+                self.kill_switch.remove_interface(interface)
+        except KillSwitchError as e:
+            self.log(f"Kill Switch 갱신 실패: {dongle_name} ({e})", "ERROR")
+    
+    def get_egress_ip(self, name: str) -> Optional[str]:
+        """프록시 출구 IP 조회 (연결 시점마다 호출되어 IP 토글이 즉시 반영됨)"""
+        if name == 'mainline':
+            return self.config['main_line'].get('ip')
+        dongle = self.config['dongles'].get(name)
+        return dongle.get('ip') if dongle else None
     
-    def start_socks5_proxy(self, name: str, config: dict):
+    async def start_socks5_proxy(self, name: str, config: dict):
         """SOCKS5 프록시 시작"""
-        port = config['socks_port']
-        interface_ip = config['ip']
+        socks_config = self.config.get('socks5', {})
+        if self.proxies.get(name, {}).get('adopted'):
+            # 웜 리스타트로 인수한 프록시 (dante 포함)
+            return True
         
+        if socks_config.get('engine', 'builtin') == 'dante':
+            return self.start_dante_proxy(name, config)
+        
+        port = config['socks_port']
         self.log(f"SOCKS5 프록시 시작: {name} (포트 {port})")
         
-        # dante-server 설정 생성
-        dante_config = f"""
+        server = Socks5Server(
+            name, port,
+            resolve_bind_ip=lambda: self.get_egress_ip(name),
+            buffer_size=socks_config.get('buffer_size', DEFAULT_BUFFER_SIZE),
+            use_splice=socks_config.get('splice', True),
+            udp_batch=socks_config.get('udp_batch', DEFAULT_UDP_BATCH),
+            log=self.log
+        )
+        try:
+            await server.start()
+        except OSError as e:
+            self.log(f"SOCKS5 프록시 시작 실패: {name} ({e})", "ERROR")
+            self.proxies[name] = {'port': port, 'pid': None, 'status': 'failed'}
+            return False
+        
+        self.proxies[name] = {
+            'port': port,
+            'pid': os.getpid(),
+            'status': 'running',
+            'engine': 'builtin',
+            'server': server
+        }
+        
+        return True
+    
+    async def stop_socks5_proxy(self, name: str):
+        """SOCKS5 프록시 중지"""
+        proxy = self.proxies.pop(name, None)
+        if not proxy:
+            return
+        if proxy.get('server'):
+            await proxy['server'].stop()
+        elif proxy.get('process'):
+            proxy['process'].terminate()
+        elif proxy.get('adopted') and proxy.get('pid'):
+            try:
+                os.kill(proxy['pid'], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self.log(f"SOCKS5 프록시 중지: {name}")
+    
+    def proxy_alive(self, proxy: dict) -> bool:
+        """프록시 프로세스가 살아 있는지 (직접 띄운 것은 poll, 인수한 것은 PID 확인)"""
+        if proxy.get('process'):
+            return proxy['process'].poll() is None
+        if proxy.get('server'):
+            return proxy.get('status') == 'running'
+        if not proxy.get('pid'):
+            return False
+        try:
+            os.kill(proxy['pid'], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+    
+    def dante_config(self, name: str, config: dict) -> str:
+        """dante-server 설정 생성"""
+        port = config['socks_port']
+        interface_ip = config['ip']
+        
+        return f"""
 logoutput: /var/log/dante_{name}.log
 internal: 0.0.0.0 port = {port}
 external: {interface_ip}
@@ -147,205 +329,362 @@ socks pass {{
     log: error connect disconnect
 }}
 """
+    
+    def start_dante_proxy(self, name: str, config: dict):
+        """외부 dante-server 프록시 시작 (socks5.engine = dante)"""
+        port = config['socks_port']
+        for other, proxy in self.proxies.items():
+            if proxy.get('port') == port and self.proxy_alive(proxy):
+                # 같은 포트에 살아 있는 프로세스가 있으면 두 번째 danted는 바인드에 실패하고 PID만 덮어씀
+                self.log(f"SOCKS5 프록시 시작 안 함 (dante): {name} - 포트 {port}를 "
+                         f"{other} (PID {proxy['pid']})가 사용 중", "WARNING")
+                return other == name
+        self.log(f"SOCKS5 프록시 시작 (dante): {name} (포트 {port})")
         
         config_file = f"/tmp/dante_{name}.conf"
         with open(config_file, 'w') as f:
-            f.write(dante_config)
+            f.write(self.dante_config(name, config))
         
-        # dante 서버 시작
-        cmd = f"danted -f {config_file} -D"
-        subprocess.Popen(cmd.split())
+        # dante 서버 시작 (-D 없이 포그라운드로 실행해야 PID 추적 가능)
+        process = subprocess.Popen(['danted', '-f', config_file])
         
         self.proxies[name] = {
             'port': port,
-            'pid': None,
-            'status': 'running'
+            'pid': process.pid,
+            'status': 'running',
+            'engine': 'dante',
+            'process': process
         }
         
         return True
     
-    def toggle_dongle_ip(self, dongle_name: str):
-        """동글 IP 토글"""
+    def toggle_dongle_ip(self, dongle_name: str) -> Optional[RotationJob]:
+        """동글 IP 토글 - 로테이션 엔진에 등록하고 작업 핸들을 즉시 반환"""
         if dongle_name not in self.config['dongles']:
             self.log(f"동글 {dongle_name}을 찾을 수 없음", "ERROR")
-            return False
-        
-        dongle = self.config['dongles'][dongle_name]
-        interface = dongle['interface']
-        
-        self.log(f"동글 {dongle_name} IP 토글 시작...")
-        
-        # 1. 현재 연결된 VPN 클라이언트 보호
-        self.protect_vpn_clients(dongle_name)
+            return None
         
-        # 2. 동글 재연결 (IP 변경)
-        self.reconnect_dongle(interface)
+        return self.rotation.submit(dongle_name)
+    
+    def toggle_all_dongles(self, dongle_names: List[str] = None) -> List[RotationJob]:
+        """여러 동글 IP 동시 토글 (rotation.max_concurrent까지 병렬 실행)"""
+        names = dongle_names or [
+            name for name, dongle in self.config['dongles'].items()
+            if dongle.get('ip_toggle_enabled', True)
+        ]
+        return [job for job in (self.toggle_dongle_ip(name) for name in names) if job]
+    
+    def rolling_rotate(self, dongle_names: List[str] = None):
+        """롤링 로테이션 한 라운드 시작 (최소 용량 유지하며 순차 토글, 다른 스레드에서 호출 가능)"""
+        return asyncio.run_coroutine_threadsafe(self.scheduler.run_round(dongle_names), self.loop)
+    
+    async def request_new_ip(self, dongle_name: str) -> Optional[Dict]:
+        """새 IP 요청 - 준비된 스탠바이 동글로 즉시 교체, 없으면 로테이션"""
+        if dongle_name not in self.config['dongles']:
+            self.log(f"동글 {dongle_name}을 찾을 수 없음", "ERROR")
+            return None
         
-        # 3. 새 IP 확인 및 라우팅 업데이트
-        time.sleep(5)  # IP 할당 대기
-        new_ip = self.get_interface_ip(interface)
+        if self.config.get('standby', {}).get('enabled'):
+            result = self.standby.handoff(dongle_name)
+            if result:
+                return result
         
-        if new_ip:
-            dongle['ip'] = new_ip
-            self.update_routing(dongle_name)
-            self.log(f"동글 {dongle_name} 새 IP: {new_ip}")
-            
-            # 4. VPN 클라이언트 복구
-            self.restore_vpn_clients(dongle_name)
-            return True
-        else:
-            self.log(f"동글 {dongle_name} IP 할당 실패", "ERROR")
-            # 페일오버 실행
-            self.failover_dongle(dongle_name)
-            return False
+        job = self.toggle_dongle_ip(dongle_name)
+        return {'mode': 'rotation', 'job': job.to_dict()}
     
     def protect_vpn_clients(self, dongle_name: str):
         """VPN 클라이언트 보호 (IP 토글 중)"""
-        # 임시로 페일오버 동글로 라우팅
-        dongle = self.config['dongles'][dongle_name]
-        failover = dongle.get('failover_dongle')
+        # 동글이 처리 중인 테이블을 그룹 내 다른 동글로 임시 이동
+        moves = self.failover.evacuate(dongle_name)
+        if any(moves.values()):
+            self.log(f"VPN 클라이언트 임시 보호: {dongle_name} → {moves}")
         
-        if failover and failover in self.config['dongles']:
-            failover_dongle = self.config['dongles'][failover]
-            table_id = dongle['routing_table']
-            
-            # 라우팅 테이블 임시 변경
-            cmd = f"ip route replace default via {failover_dongle['gateway']} dev {failover_dongle['interface']} table {table_id}"
-            subprocess.run(cmd.split())
-            
-            self.log(f"VPN 클라이언트 임시 보호: {dongle_name} → {failover}")
+        self.rebalance()
     
     def restore_vpn_clients(self, dongle_name: str):
         """VPN 클라이언트 복구"""
-        dongle = self.config['dongles'][dongle_name]
-        table_id = dongle['routing_table']
-        
         # 원래 라우팅으로 복구
-        cmd = f"ip route replace default via {dongle['gateway']} dev {dongle['interface']} table {table_id}"
-        subprocess.run(cmd.split())
+        self.failover.reclaim(dongle_name)
         
         self.log(f"VPN 클라이언트 복구: {dongle_name}")
+        self.rebalance(rejoining=dongle_name)
+    
+    def rebalance(self, rejoining: str = None):
+        """로드밸런싱 사용 시 multipath 라우트 갱신 (동글 실패/복구/로테이션 시)"""
+        if self.config.get('load_balancing', {}).get('enabled'):
+            self.balancer.rebalance(rejoining=rejoining)
+    
+    async def wait_for_new_ip(self, interface: str, generation: int, timeout: float = 15) -> Optional[str]:
+        """재연결 후 새 IP 할당 대기"""
+        if self.monitor and self.monitor.running:
+            return await self.monitor.wait_for_address_async(interface, generation, timeout)
+        
+        # 모니터를 쓸 수 없으면 짧은 간격으로 조회
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            ip = self.get_interface_ip(interface)
+            if ip:
+                return ip
+            await asyncio.sleep(0.2)
+        return None
     
-    def reconnect_dongle(self, interface: str):
+    async def reconnect_dongle(self, interface: str, delay: float = 2.0):
         """동글 재연결 (IP 변경)"""
         # NetworkManager를 통한 재연결
-        subprocess.run(['nmcli', 'device', 'disconnect', interface], check=False)
-        time.sleep(2)
-        subprocess.run(['nmcli', 'device', 'connect', interface], check=False)
+        for action in ('disconnect', 'connect'):
+            process = await asyncio.create_subprocess_exec(
+                'nmcli', 'device', action, interface,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            await process.wait()
+            if action == 'disconnect':
+                await asyncio.sleep(delay)
     
     def get_interface_ip(self, interface: str) -> Optional[str]:
         """인터페이스 IP 조회"""
-        try:
-            result = subprocess.run(
-                ['ip', 'addr', 'show', interface],
-                capture_output=True, text=True
-            )
-            for line in result.stdout.split('\n'):
-                if 'inet ' in line and '192.168' in line:
-                    return line.split()[1].split('/')[0]
-        except:
-            pass
-        return None
+        return self.net.get_interface_ip(interface)
     
-    def update_routing(self, dongle_name: str):
-        """라우팅 업데이트"""
-        dongle = self.config['dongles'][dongle_name]
-        table_id = dongle['routing_table']
-        
-        # 라우팅 테이블 업데이트
-        cmds = [
-            f"ip route flush table {table_id}",
-            f"ip route add default via {dongle['gateway']} dev {dongle['interface']} table {table_id}",
-            f"ip route add 192.168.0.0/16 dev {dongle['interface']} table {table_id}"
+    def dongle_routes(self, dongle: dict) -> List[dict]:
+        """동글 라우팅 테이블의 목표 상태"""
+        return [
+            {'dst': 'default', 'gateway': dongle['gateway'], 'interface': dongle['interface']},
+            {'dst': '192.168.0.0/16', 'interface': dongle['interface']}
         ]
-        
-        for cmd in cmds:
-            subprocess.run(cmd.split(), check=False)
+    
+    def update_routing(self, dongle_name: str):
+        """라우팅 업데이트 - 동글이 처리 중인 모든 테이블 (자기 테이블 + 페일오버로 맡은 테이블)"""
+        # flush + default + 192.168/16을 한 배치로 적용
+        self.failover.repoint(self.failover.tables_served_by(dongle_name))
     
     def failover_dongle(self, failed_dongle: str):
-        """동글 페일오버"""
-        dongle = self.config['dongles'][failed_dongle]
-        failover = dongle.get('failover_dongle')
+        """동글 페일오버 - 그룹 내 가장 건강하고 부하가 적은 동글로 테이블 이동"""
+        self.log(f"페일오버 실행: {failed_dongle}", "WARNING", event='failover', dongle=failed_dongle)
+        self.failover.fail(failed_dongle)
+    
+    def dongle_by_interface(self, interface: str) -> Optional[str]:
+        """인터페이스 이름으로 동글 이름 조회"""
+        for name, dongle in self.config['dongles'].items():
+            if dongle['interface'] == interface:
+                return name
+        return None
+    
+    @property
+    def inventory_enabled(self) -> bool:
+        return self.config.get('inventory', {}).get('enabled', False)
+    
+    def start_link_monitor(self):
+        """링크/주소 이벤트 모니터 시작 (netlink 사용 불가 시 헬스체크 루프만 사용)"""
+        self.monitor = DongleLinkMonitor(
+            lambda: {dongle['interface'] for dongle in self.config['dongles'].values()},
+            self.handle_link_event,
+            log=self.log,
+            on_link_change=self.inventory.on_link_change if self.inventory_enabled else None
+        )
+        try:
+            self.monitor.start()
+        except OSError as e:
+            self.log(f"링크 모니터 시작 실패, 폴링만 사용: {e}", "WARNING")
+            self.monitor = None
+    
+    def handle_link_event(self, event: dict):
+        """링크/주소 이벤트 처리 - 즉시 페일오버 또는 라우팅 갱신"""
+        name = self.dongle_by_interface(event['interface'])
+        if not name:
+            return
+        dongle = self.config['dongles'][name]
         
-        if failover and failover in self.config['dongles']:
-            self.log(f"페일오버 실행: {failed_dongle} → {failover}")
-            
-            # VPN 트래픽을 백업 동글로 라우팅
-            failover_dongle = self.config['dongles'][failover]
-            table_id = dongle['routing_table']
-            
-            cmd = f"ip route replace default via {failover_dongle['gateway']} dev {failover_dongle['interface']} table {table_id}"
-            subprocess.run(cmd.split())
-            
-            dongle['status'] = 'failed'
-            failover_dongle['status'] = 'primary'
-            self.save_config()
+        # IP 토글 중인 동글은 toggle_dongle_ip가 직접 처리
+        if name in self.rotating:
+            return
+        
+        if event['type'] in (LINK_DOWN, ADDRESS_REMOVED):
+            if dongle['status'] == 'active':
+                self.log(f"동글 {name} 실패 감지 ({event['type']})", "WARNING",
+                         event='link_failure', dongle=name)
+                self.failover_dongle(name)
+        
+        elif event['type'] == ADDRESS_ADDED:
+            if event['address'] != dongle.get('ip'):
+                self.log(f"동글 {name} 새 IP: {event['address']}", event='address', dongle=name)
+                dongle['ip'] = event['address']
+            if dongle['status'] == 'pending':
+                # 새로 꽂힌 동글의 첫 주소 - 바로 서비스 시작
+                self.inventory.activate(name)
+                return
+            if not dongle.get('gateway'):
+                dongle['gateway'] = guess_gateway(event['address'])
+            self.update_routing(name)
+            if dongle['status'] == 'failed':
+                self.log(f"동글 {name} 주소 복구, 페일백 대기")
+                self.failover.mark_healthy(name)
+                self.failover.failback_due()
+        
+        elif event['type'] == LINK_UP:
+            self.log(f"동글 {name} 링크 연결됨, 주소 할당 대기")
     
     async def health_check_loop(self):
-        """헬스체크 루프"""
+        """헬스체크 루프 - 모든 동글을 동시에 프로브"""
         while True:
             await asyncio.sleep(self.config['monitoring']['health_check_interval'])
             
+            interfaces = {
+                name: dongle['interface'] for name, dongle in self.config['dongles'].items()
+                if not dongle.get('unplugged')
+            }
+            started = time.perf_counter()
+            results = await self.prober.probe_all(interfaces)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
             # 동글 상태 확인
-            for name, dongle in self.config['dongles'].items():
-                if self.check_dongle_health(dongle['interface']):
-                    if dongle['status'] == 'failed':
-                        self.log(f"동글 {name} 복구됨")
-                        dongle['status'] = 'active'
+            for name, result in results.items():
+                dongle = self.config['dongles'].get(name)
+                if not dongle or name in self.rotating:
+                    continue
+                self.health[name] = result
+                if result['healthy']:
+                    self.failover.mark_healthy(name)
                 else:
+                    self.failover.mark_unhealthy(name)
                     if dongle['status'] == 'active':
-                        self.log(f"동글 {name} 실패 감지", "WARNING")
+                        self.log(f"동글 {name} 실패 감지 ({result['error']})", "WARNING",
+                                 event='health_failure', dongle=name)
                         self.failover_dongle(name)
+            
+            # 히스테리시스 기간 동안 정상이었던 동글 페일백
+            self.failover.failback_due()
+            
+            if elapsed_ms > self.prober.timeout * 1000 * 2:
+                self.log(f"헬스체크 라운드 지연: {elapsed_ms:.0f}ms ({len(results)}개 동글)", "WARNING",
+                         event='health_round', duration_ms=round(elapsed_ms, 1))
     
-    def check_dongle_health(self, interface: str) -> bool:
+    async def check_dongle_health(self, interface: str) -> bool:
         """동글 헬스체크"""
-        ip = self.get_interface_ip(interface)
-        if not ip:
+        result = await self.prober.probe(interface)
+        return result['healthy']
+    
+    async def start_dongle(self, name: str) -> bool:
+        """동글 하나 시작 - 라우팅 적용 후 SOCKS5 프록시 (웜 리스타트면 라우팅은 이미 동기화됨)"""
+        dongle = self.config['dongles'][name]
+        if not self.warm_restart and dongle.get('ip') and dongle.get('gateway'):
+            self.update_routing(name)
+        return await self.start_socks5_proxy(name, dongle)
+    
+    async def dongle_ready(self, name: str) -> bool:
+        """동글 준비 확인 - 프록시 포트 수신 + 라우팅 테이블에 default 라우트"""
+        dongle = self.config['dongles'][name]
+        timeout = self.config.get('startup', {}).get('timeout', 10)
+        if not await wait_port(dongle['socks_port'], timeout=timeout):
             return False
-        
-        # ping 테스트
-        result = subprocess.run(
-            ['ping', '-I', ip, '-c', '1', '-W', '2', '8.8.8.8'],
-            capture_output=True
-        )
-        return result.returncode == 0
+        if dongle.get('ip') and dongle.get('gateway'):
+            return await wait_route(self.net, dongle['routing_table'], dongle['interface'], timeout=timeout)
+        return True
     
-    def start(self):
-        """서버 시작"""
+    async def start(self):
+        """서버 시작 - 독립 구성요소를 병렬로 올리고 준비 상태 확인"""
         self.log("네트워크 게이트웨이 서버 시작...")
+        self.loop = asyncio.get_running_loop()
+        self.rotation.bind(self.loop)
+        
+        settings = self.config.get('startup', {})
+        timeout = settings.get('timeout', 10)
+        orchestrator = StartupOrchestrator(parallel=settings.get('parallel', True), log=self.log)
         
-        # 1. Kill Switch 설정
+        # 0. 웜 리스타트 - 현재 라우팅/프록시와 설정의 차이만 적용
+        if settings.get('warm_restart', True):
+            self.warm_restart = WarmRestart(self)
+            self.warm_restart.run()
+        
+        # 1. Kill Switch 설정 (nft/iptables 실행은 스레드에서)
         if self.config['kill_switch']['enabled']:
-            self.setup_kill_switch()
+            orchestrator.add(
+                'kill_switch',
+                lambda: self.loop.run_in_executor(None, self.setup_kill_switch),
+                timeout=timeout
+            )
         
-        # 2. SOCKS5 프록시 시작
+        # 2. 동글별 라우팅 + SOCKS5 프록시 (서로 독립)
+        dongle_components = []
         for name, dongle in self.config['dongles'].items():
-            if dongle['status'] == 'active':
-                self.start_socks5_proxy(name, dongle)
+            if dongle['status'] == 'active' and not dongle.get('unplugged'):
+                component = f"dongle:{name}"
+                orchestrator.add(
+                    component,
+                    lambda name=name: self.start_dongle(name),
+                    ready=lambda name=name: self.dongle_ready(name),
+                    timeout=timeout
+                )
+                dongle_components.append(component)
         
         # 메인라인 프록시
-        self.start_socks5_proxy('mainline', self.config['main_line'])
+        main_port = self.config['main_line']['socks_port']
+        orchestrator.add(
+            'mainline',
+            lambda: self.start_socks5_proxy('mainline', self.config['main_line']),
+            ready=lambda: wait_port(main_port, timeout=timeout),
+            timeout=timeout
+        )
         
-        # 3. 헬스체크 시작
+        # 3. 링크 이벤트 모니터
+        async def start_monitor():
+            self.start_link_monitor()
+        orchestrator.add('link_monitor', start_monitor, timeout=timeout)
+        
+        # 4. USB 동글 자동 감지 - 설정된 동글이 올라온 뒤 새 동글만 프로비저닝
+        if self.inventory_enabled:
+            orchestrator.add(
+                'inventory',
+                self.inventory.scan,
+                depends=['link_monitor'] + dongle_components,
+                timeout=timeout * 3
+            )
+        
+        self.startup = await orchestrator.run()
+        orchestrator.report()
+        
+        # 5. 주기 작업
         asyncio.create_task(self.health_check_loop())
+        if self.inventory_enabled:
+            asyncio.create_task(self.inventory.run_forever())
+        
+        # 스탠바이 풀 사전 로테이션
+        if self.config.get('standby', {}).get('enabled'):
+            self.standby.start()
+            asyncio.create_task(self.standby.run_forever())
+        
+        # 로드밸런싱 (multipath egress)
+        if self.config.get('load_balancing', {}).get('enabled'):
+            asyncio.create_task(self.balancer.run_forever())
+        
+        # 롤링 로테이션 스케줄
+        if self.config.get('rotation', {}).get('schedule', {}).get('enabled'):
+            asyncio.create_task(self.scheduler.run_forever())
         
         self.log("서버 준비 완료")
-        self.log(f"SOCKS5 프록시 포트:")
-        self.log(f"  - 동글1: 1080")
-        self.log(f"  - 동글2: 1081")
-        self.log(f"  - 메인라인: 1082")
-        self.log(f"VPN 포트:")
-        self.log(f"  - 동글1: 51820")
-        self.log(f"  - 동글2: 51821")
-        self.log(f"  - 메인라인: 51822")
+        self.log_endpoints()
+    
+    def log_endpoints(self):
+        """실제로 올라온 SOCKS5/VPN 포트 출력"""
+        endpoints = dict(self.config['dongles'])
+        endpoints['mainline'] = self.config['main_line']
+        
+        self.log("SOCKS5 프록시 포트:")
+        for name, proxy in self.proxies.items():
+            if proxy['status'] == 'running':
+                self.log(f"  - {name}: {proxy['port']}")
+        self.log("VPN 포트:")
+        for name, endpoint in endpoints.items():
+            if 'vpn_port' in endpoint and endpoint.get('status', 'active') == 'active':
+                self.log(f"  - {name}: {endpoint['vpn_port']}")
 
 def main():
     server = NetworkGatewayServer()
-    server.start()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     
     # 이벤트 루프 실행
     try:
-        asyncio.get_event_loop().run_forever()
+        loop.run_until_complete(server.start())
+        loop.run_forever()
     except KeyboardInterrupt:
         server.log("서버 종료")
 
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+동글 IP 로테이션 엔진
+- 동글별 상태 머신: protecting → reconnecting → awaiting_ip → routing → restored
+- 설정된 동시 실행 수까지 여러 동글을 병렬로 로테이션
+- 호출자는 즉시 작업 핸들(RotationJob)을 받고, 단계별 소요 시간을 조회
+"""
+
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+PENDING = 'pending'
+PROTECTING = 'protecting'
+RECONNECTING = 'reconnecting'
+AWAITING_IP = 'awaiting_ip'
+ROUTING = 'routing'
+RESTORED = 'restored'
+FAILED = 'failed'
+
+FINAL_STATES = (RESTORED, FAILED)
+MAX_FINISHED_JOBS = 200
+
+
+class RotationJob:
+    """동글 하나의 로테이션 작업 핸들"""
+
+    def __init__(self, dongle: str):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.dongle = dongle
+        self.state = PENDING
+        self.old_ip = None
+        self.new_ip = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.timings: Dict[str, float] = {}
+        self.future: Optional[asyncio.Future] = None
+        self._state_started = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def transition(self, state: str):
+        now = time.perf_counter()
+        if self._state_started is not None and self.state != PENDING:
+            self.timings[self.state] = round((now - self._state_started) * 1000, 1)
+        if self.started is None:
+            self.started = time.time()
+        self.state = state
+        self._state_started = now
+        if state in FINAL_STATES:
+            self.finished = time.time()
+            self._done.set()
+            if self.future and not self.future.done():
+                self.future.set_result(self.to_dict())
+
+    def wait(self, timeout: float = None) -> Optional[Dict]:
+        """완료까지 대기 (이벤트 루프 밖의 스레드에서 호출)"""
+        return self.to_dict() if self._done.wait(timeout) else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'dongle': self.dongle,
+            'state': self.state,
+            'old_ip': self.old_ip,
+            'new_ip': self.new_ip,
+            'error': self.error,
+            'created': self.created,
+            'queued_ms': round((self.started - self.created) * 1000, 1) if self.started else None,
+            'total_ms': round((self.finished - self.started) * 1000, 1) if self.finished and self.started else None,
+            'timings_ms': dict(self.timings),
+        }
+
+
+class RotationEngine:
+    """여러 동글의 IP 로테이션을 병렬로 실행"""
+
+    def __init__(self, server, max_concurrent: int = 4, reconnect_delay: float = 2.0,
+                 ip_timeout: float = 15.0):
+        self.server = server
+        self.max_concurrent = max_concurrent
+        self.reconnect_delay = reconnect_delay
+        self.ip_timeout = ip_timeout
+
+        self.jobs: 'OrderedDict[str, RotationJob]' = OrderedDict()
+        self.active: Dict[str, RotationJob] = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphore = None
+
+    @classmethod
+    def from_config(cls, server, rotation: dict) -> 'RotationEngine':
+        return cls(
+            server,
+            max_concurrent=rotation.get('max_concurrent', 4),
+            reconnect_delay=rotation.get('reconnect_delay', 2.0),
+            ip_timeout=rotation.get('ip_timeout', 15.0)
+        )
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """엔진이 작업을 실행할 이벤트 루프 지정"""
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    def submit(self, dongle_name: str) -> RotationJob:
+        """로테이션 작업 등록 (어느 스레드에서든 호출 가능, 즉시 반환)"""
+        with self._lock:
+            existing = self.active.get(dongle_name)
+            if existing:
+                return existing
+            job = RotationJob(dongle_name)
+            self.active[dongle_name] = job
+            self.jobs[job.job_id] = job
+            self._trim_jobs()
+
+        if self._in_loop():
+            self._schedule(job)
+        else:
+            self._loop.call_soon_threadsafe(self._schedule, job)
+        return job
+
+    def submit_many(self, dongle_names: List[str]) -> List[RotationJob]:
+        return [self.submit(name) for name in dongle_names]
+
+    def get_job(self, job_id: str) -> Optional[RotationJob]:
+        return self.jobs.get(job_id)
+
+    def status(self) -> Dict:
+        """진행 중인 로테이션과 최근 작업 요약"""
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'active': {name: job.to_dict() for name, job in self.active.items()},
+                'recent': [job.to_dict() for job in list(self.jobs.values())[-20:]],
+            }
+
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _trim_jobs(self):
+        while len(self.jobs) > MAX_FINISHED_JOBS:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if not oldest.done:
+                break
+            del self.jobs[oldest_id]
+
+    def _schedule(self, job: RotationJob):
+        job.future = self._loop.create_future()
+        self._loop.create_task(self._run(job))
+
+    async def _run(self, job: RotationJob):
+        server = self.server
+        name = job.dongle
+        try:
+            async with self._semaphore:
+                dongle = server.config['dongles'][name]
+                interface = dongle['interface']
+                job.old_ip = dongle.get('ip')
+                server.rotating.add(name)
+                server.log(f"동글 {name} IP 토글 시작...")
+
+                # 1. 현재 연결된 VPN 클라이언트 보호
+                job.transition(PROTECTING)
+                server.protect_vpn_clients(name)
+
+                # 2. 동글 재연결 (IP 변경)
+                job.transition(RECONNECTING)
+                generation = server.monitor.address_generation(interface) if server.monitor else 0
+                await server.reconnect_dongle(interface, self.reconnect_delay)
+
+                # 3. 새 IP 할당 대기
+                job.transition(AWAITING_IP)
+                new_ip = await server.wait_for_new_ip(interface, generation, self.ip_timeout)
+                if not new_ip:
+                    raise TimeoutError("IP 할당 시간 초과")
+                job.new_ip = new_ip
+
+                # 4. 라우팅 업데이트
+                job.transition(ROUTING)
+                dongle['ip'] = new_ip
+                server.update_routing(name)
+                server.log(f"동글 {name} 새 IP: {new_ip}")
+
+                # 5. VPN 클라이언트 복구
+                server.restore_vpn_clients(name)
+                job.transition(RESTORED)
+        except Exception as e:
+            job.error = str(e)
+            server.log(f"동글 {name} IP 토글 실패: {e}", "ERROR")
+            job.transition(FAILED)
+            # 페일오버 실행
+            if name in server.config['dongles']:
+                server.failover_dongle(name)
+        finally:
+            server.rotating.discard(name)
+            with self._lock:
+                if self.active.get(name) is job:
+                    del self.active[name]
+            result = job.to_dict()
+            server.log(f"동글 {name} 로테이션 {job.state}: {result['timings_ms']}",
+                       "INFO" if job.state == RESTORED else "ERROR",
+                       event='rotation', dongle=name, duration_ms=result['total_ms'],
+                       job_id=job.job_id, timings_ms=result['timings_ms'])
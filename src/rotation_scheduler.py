@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+롤링 IP 로테이션 스케줄러
+- 전체 동글을 순차적으로 나눠 로테이션 (최소 활성 동글 수/대역폭 비율 보장)
+- 같은 페일오버 그룹에 살아 있는 동글이 없으면 해당 동글은 대기
+- 계획(웨이브)과 실시간 진행 상황 조회
+"""
+
+import time
+import asyncio
+from typing import Callable, Dict, List, Optional, Set
+
+
+class RollingRotationScheduler:
+    """동글 IP 로테이션을 용량 제약 안에서 엇갈려 실행"""
+
+    def __init__(self, server, engine, min_active: int = 1, min_capacity_ratio: float = 0.0,
+                 interval: float = 1800, tick: float = 1.0, log: Callable = None):
+        self.server = server
+        self.engine = engine
+        self.min_active = min_active
+        self.min_capacity_ratio = min_capacity_ratio
+        self.interval = interval
+        self.tick = tick
+        self.log = log or server.log
+
+        self.last_rotated: Dict[str, float] = {}
+        self.round = 0
+        self._progress = None
+
+    @classmethod
+    def from_config(cls, server, engine, schedule: dict) -> 'RollingRotationScheduler':
+        return cls(
+            server, engine,
+            min_active=schedule.get('min_active', 1),
+            min_capacity_ratio=schedule.get('min_capacity_ratio', 0.0),
+            interval=schedule.get('interval', 1800),
+            tick=schedule.get('tick', 1.0)
+        )
+
+    # ===== 제약 조건 =====
+    @property
+    def dongles(self) -> Dict[str, dict]:
+        return self.server.config['dongles']
+
+    def partners(self, name: str) -> Set[str]:
+        """같은 페일오버 그룹의 동글"""
+        return set(self.server.failover.group_of(name))
+
+    def capacity(self, name: str) -> float:
+        """동글 대역폭 가중치 (bandwidth_mbps 미설정 시 1)"""
+        return float(self.dongles[name].get('bandwidth_mbps', 1))
+
+    def serving(self) -> List[str]:
+        """클라이언트 트래픽을 맡는 동글 (스탠바이 풀 제외)"""
+        return [name for name, dongle in self.dongles.items() if dongle.get('role') != 'standby']
+
+    def eligible(self) -> List[str]:
+        return [
+            name for name in self.serving()
+            if self.dongles[name].get('ip_toggle_enabled', True)
+        ]
+
+    def online(self, rotating: Set[str]) -> Set[str]:
+        """현재 트래픽을 처리할 수 있는 동글"""
+        return {
+            name for name in self.serving()
+            if self.dongles[name]['status'] == 'active' and name not in rotating
+        }
+
+    def blocked_reason(self, name: str, online: Set[str], rotating: Set[str]) -> Optional[str]:
+        """name을 지금 로테이션하면 안 되는 이유 (없으면 None)"""
+        if name in rotating:
+            return 'rotating'
+        if name not in online:
+            return 'offline'
+        # 그룹 내에 테이블을 넘겨받을 동글이 하나는 남아 있어야 함
+        partners = self.partners(name)
+        if partners and not partners & (online - {name}):
+            if partners & rotating:
+                return f'partner_rotating:{",".join(sorted(partners & rotating))}'
+            return f'partner_down:{",".join(sorted(partners))}'
+
+        remaining = online - {name}
+        if len(remaining) < self.min_active:
+            return 'min_active'
+        total = sum(self.capacity(n) for n in self.serving())
+        if total and sum(self.capacity(n) for n in remaining) < total * self.min_capacity_ratio:
+            return 'min_capacity'
+        return None
+
+    # ===== 계획 =====
+    def plan(self, names: List[str] = None) -> Dict:
+        """현재 상태 기준 로테이션 웨이브 계획 (동시에 실행 가능한 묶음 목록)"""
+        pending = self._order(names or self.eligible())
+        waves = []
+        while pending:
+            rotating: Set[str] = set()
+            wave = []
+            for name in pending:
+                if len(wave) >= self.engine.max_concurrent:
+                    break
+                online = self.online(rotating)
+                if self.blocked_reason(name, online, rotating) is None:
+                    wave.append(name)
+                    rotating.add(name)
+            if not wave:
+                break
+            waves.append(wave)
+            pending = [name for name in pending if name not in wave]
+
+        return {
+            'waves': waves,
+            'blocked': {
+                name: self.blocked_reason(name, self.online(set()), set()) for name in pending
+            },
+            'min_active': self.min_active,
+            'min_capacity_ratio': self.min_capacity_ratio,
+        }
+
+    def _order(self, names: List[str]) -> List[str]:
+        """가장 오래전에 로테이션한 동글부터"""
+        return sorted(names, key=lambda name: self.last_rotated.get(name, 0))
+
+    # ===== 실행 =====
+    def progress(self) -> Optional[Dict]:
+        """현재(또는 마지막) 라운드 진행 상황"""
+        if not self._progress:
+            return None
+        progress = dict(self._progress)
+        progress['rotating'] = {
+            name: job.state for name, job in self._progress['jobs'].items() if not job.done
+        }
+        progress['jobs'] = {name: job.to_dict() for name, job in self._progress['jobs'].items()}
+        progress['online'] = sorted(self.online(set(self.server.rotating)))
+        return progress
+
+    async def run_round(self, names: List[str] = None) -> Dict:
+        """한 라운드 실행 - 모든 대상 동글을 제약 안에서 엇갈려 로테이션"""
+        self.round += 1
+        pending = self._order(names or self.eligible())
+        jobs = {}
+        self._progress = {
+            'round': self.round,
+            'started': time.time(),
+            'finished': None,
+            'total': len(pending),
+            'pending': list(pending),
+            'blocked': {},
+            'completed': [],
+            'failed': [],
+            'jobs': jobs,
+        }
+        self.log(f"롤링 로테이션 라운드 {self.round} 시작: {len(pending)}개 동글")
+
+        in_flight = {}
+        while pending or in_flight:
+            rotating = set(self.server.rotating)
+            blocked = {}
+            for name in list(pending):
+                if len(rotating) >= self.engine.max_concurrent:
+                    break
+                reason = self.blocked_reason(name, self.online(rotating), rotating)
+                if reason:
+                    blocked[name] = reason
+                    continue
+                job = self.engine.submit(name)
+                jobs[name] = in_flight[name] = job
+                pending.remove(name)
+                rotating.add(name)
+            self._progress['pending'] = list(pending)
+            self._progress['blocked'] = blocked
+
+            if not in_flight:
+                if pending and not self.server.rotating:
+                    # 진행 중인 작업 없이 전부 막힘 → 이번 라운드에서는 건너뜀
+                    self.log(f"로테이션 보류: {blocked}", "WARNING")
+                    break
+                await asyncio.sleep(self.tick)
+                continue
+
+            await asyncio.wait([job.future for job in in_flight.values()],
+                               timeout=self.tick, return_when=asyncio.FIRST_COMPLETED)
+            for name, job in list(in_flight.items()):
+                if job.done:
+                    del in_flight[name]
+                    self.last_rotated[name] = time.time()
+                    key = 'completed' if job.state == 'restored' else 'failed'
+                    self._progress[key].append(name)
+
+        self._progress['finished'] = time.time()
+        self.log(f"롤링 로테이션 라운드 {self.round} 완료: 성공 {len(self._progress['completed'])}, "
+                 f"실패 {len(self._progress['failed'])}, 보류 {len(pending)}")
+        return self.progress()
+
+    async def run_forever(self):
+        """interval마다 라운드 실행"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_round()
+            except Exception as e:
+                self.log(f"롤링 로테이션 오류: {e}", "ERROR")
@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+"""
+내장 asyncio SOCKS5 프록시
+- 동글당 danted 프로세스 대신 게이트웨이 프로세스 안에서 동작
+- 연결마다 동글의 현재 IP에 바인딩 (IP 토글 즉시 반영)
+- 재사용 버퍼 또는 os.splice 기반 릴레이
+- UDP ASSOCIATE 지원 (QUIC/HTTP3 트래픽)
+"""
+
+import os
+import socket
+import struct
+import asyncio
+import ipaddress
+from typing import Callable, Dict, List, Optional
+
+SOCKS_VERSION = 5
+
+# 인증 방식
+METHOD_NO_AUTH = 0x00
+METHOD_NOT_ACCEPTABLE = 0xFF
+
+# 명령
+CMD_CONNECT = 0x01
+CMD_BIND = 0x02
+CMD_UDP_ASSOCIATE = 0x03
+
+# 주소 타입
+ATYP_IPV4 = 0x01
+ATYP_DOMAIN = 0x03
+ATYP_IPV6 = 0x04
+
+# 응답 코드
+REP_SUCCEEDED = 0x00
+REP_GENERAL_FAILURE = 0x01
+REP_NETWORK_UNREACHABLE = 0x03
+REP_HOST_UNREACHABLE = 0x04
+REP_CONNECTION_REFUSED = 0x05
+REP_COMMAND_NOT_SUPPORTED = 0x07
+REP_ADDRESS_NOT_SUPPORTED = 0x08
+
+# 프록시가 실제로 지원하는 기능 (연결 전략에서 참조)
+CAPABILITIES = {
+    'connect': True,
+    'bind': False,
+    'udp_associate': True,
+}
+
+# 엔진별 기능 - dante(socks5.engine)와 microsocks(scripts/setup_socks5.sh) 구성은 UDP를 중계하지 않음
+CONNECT_ONLY = {
+    'connect': True,
+    'bind': False,
+    'udp_associate': False,
+}
+ENGINE_CAPABILITIES = {
+    'builtin': CAPABILITIES,
+    'dante': CONNECT_ONLY,
+    'microsocks': CONNECT_ONLY,
+}
+
+
+def engine_capabilities(engine: str) -> dict:
+    """SOCKS5 엔진의 기능 (알 수 없는 엔진은 CONNECT만)"""
+    return ENGINE_CAPABILITIES.get(engine, CONNECT_ONLY)
+
+DEFAULT_BUFFER_SIZE = 256 * 1024
+UDP_BUFFER_SIZE = 65535
+DEFAULT_UDP_BATCH = 64
+HANDSHAKE_TIMEOUT = 10
+CONNECT_TIMEOUT = 10
+
+F_SETPIPE_SZ = 1031  # fcntl.F_SETPIPE_SZ (Python 3.10+에만 상수 존재)
+
+
+class Socks5Error(Exception):
+    """SOCKS5 요청 처리 실패 (응답 코드 포함)"""
+
+    def __init__(self, reply: int, message: str):
+        super().__init__(message)
+        self.reply = reply
+
+
+class Socks5Server:
+    """동글 출구 IP에 바인딩되는 SOCKS5 (CONNECT / UDP ASSOCIATE) 서버"""
+
+    def __init__(self, name: str, port: int, resolve_bind_ip: Callable[[], Optional[str]],
+                 host: str = "0.0.0.0", buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 use_splice: bool = True, udp_batch: int = DEFAULT_UDP_BATCH,
+                 log: Callable = None):
+        self.name = name
+        self.port = port
+        self.host = host
+        self.resolve_bind_ip = resolve_bind_ip
+        self.buffer_size = buffer_size
+        self.use_splice = use_splice and hasattr(os, 'splice')
+        self.log = log or (lambda message, level="INFO": None)
+
+        self._listen_sock = None
+        self._accept_task = None
+        self._connections = set()
+        self._buffers: List[bytearray] = []
+        self.stats = {
+            'connections': 0,
+            'active': 0,
+            'failed': 0,
+            'bytes_up': 0,
+            'bytes_down': 0,
+            'udp_associations': 0,
+            'udp_packets_up': 0,
+            'udp_packets_down': 0,
+            'udp_dropped': 0,
+        }
+        self.udp_relay = UdpRelay(self, batch_size=udp_batch)
+
+    @property
+    def running(self) -> bool:
+        return self._accept_task is not None and not self._accept_task.done()
+
+    async def start(self):
+        """리스닝 소켓 생성 및 accept 루프 시작"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(1024)
+        sock.setblocking(False)
+        self._listen_sock = sock
+        # 포트 0으로 시작한 경우 실제 포트 반영
+        self.port = sock.getsockname()[1]
+        self._accept_task = asyncio.get_running_loop().create_task(self._accept_loop())
+
+    async def stop(self):
+        """서버 및 모든 연결 종료"""
+        if self._accept_task:
+            self._accept_task.cancel()
+            try:
+                await self._accept_task
+            except asyncio.CancelledError:
+                pass
+            self._accept_task = None
+
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+
+        if self._listen_sock:
+            self._listen_sock.close()
+            self._listen_sock = None
+
+    async def _accept_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            client, _ = await loop.sock_accept(self._listen_sock)
+            client.setblocking(False)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            task = loop.create_task(self._handle_client(client))
+            self._connections.add(task)
+            task.add_done_callback(self._connections.discard)
+
+    # ===== 핸드셰이크 =====
+    async def _recv_exact(self, sock: socket.socket, size: int) -> bytes:
+        loop = asyncio.get_running_loop()
+        data = b""
+        while len(data) < size:
+            chunk = await loop.sock_recv(sock, size - len(data))
+            if not chunk:
+                raise ConnectionError("클라이언트 연결 종료")
+            data += chunk
+        return data
+
+    async def _read_address(self, sock: socket.socket, atyp: int) -> str:
+        """요청의 DST.ADDR 읽기"""
+        if atyp == ATYP_IPV4:
+            return socket.inet_ntop(socket.AF_INET, await self._recv_exact(sock, 4))
+        if atyp == ATYP_IPV6:
+            return socket.inet_ntop(socket.AF_INET6, await self._recv_exact(sock, 16))
+        if atyp == ATYP_DOMAIN:
+            length = (await self._recv_exact(sock, 1))[0]
+            return (await self._recv_exact(sock, length)).decode('idna')
+        raise Socks5Error(REP_ADDRESS_NOT_SUPPORTED, f"지원하지 않는 주소 타입: {atyp}")
+
+    async def _negotiate(self, client: socket.socket):
+        """인증 방식 협상 후 (명령, 주소, 포트) 반환"""
+        loop = asyncio.get_running_loop()
+
+        version, nmethods = await self._recv_exact(client, 2)
+        if version != SOCKS_VERSION:
+            raise ConnectionError(f"잘못된 SOCKS 버전: {version}")
+        methods = await self._recv_exact(client, nmethods)
+        if METHOD_NO_AUTH not in methods:
+            await loop.sock_sendall(client, bytes([SOCKS_VERSION, METHOD_NOT_ACCEPTABLE]))
+            raise ConnectionError("지원 가능한 인증 방식 없음")
+        await loop.sock_sendall(client, bytes([SOCKS_VERSION, METHOD_NO_AUTH]))
+
+        version, cmd, _, atyp = await self._recv_exact(client, 4)
+        if version != SOCKS_VERSION:
+            raise ConnectionError(f"잘못된 SOCKS 버전: {version}")
+        address = await self._read_address(client, atyp)
+        port = struct.unpack('!H', await self._recv_exact(client, 2))[0]
+        return cmd, address, port
+
+    @staticmethod
+    def build_reply(reply: int, address: str = "0.0.0.0", port: int = 0) -> bytes:
+        """SOCKS5 응답 패킷 생성"""
+        ip = ipaddress.ip_address(address)
+        atyp = ATYP_IPV4 if ip.version == 4 else ATYP_IPV6
+        return bytes([SOCKS_VERSION, reply, 0x00, atyp]) + ip.packed + struct.pack('!H', port)
+
+    async def _send_reply(self, client: socket.socket, reply: int, address: str = "0.0.0.0", port: int = 0):
+        try:
+            await asyncio.get_running_loop().sock_sendall(client, self.build_reply(reply, address, port))
+        except OSError:
+            pass
+
+    async def _handle_client(self, client: socket.socket):
+        self.stats['connections'] += 1
+        self.stats['active'] += 1
+        remote = None
+        try:
+            try:
+                cmd, address, port = await asyncio.wait_for(self._negotiate(client), HANDSHAKE_TIMEOUT)
+            except (ConnectionError, OSError, asyncio.TimeoutError, UnicodeError):
+                return
+            except Socks5Error as e:
+                await self._send_reply(client, e.reply)
+                return
+
+            if cmd == CMD_UDP_ASSOCIATE:
+                await self.udp_relay.serve_association(client)
+                return
+
+            try:
+                if cmd != CMD_CONNECT:
+                    raise Socks5Error(REP_COMMAND_NOT_SUPPORTED, f"지원하지 않는 명령: {cmd}")
+                remote = await self._open_connection(address, port)
+            except Socks5Error as e:
+                self.stats['failed'] += 1
+                await self._send_reply(client, e.reply)
+                return
+
+            bound_ip, bound_port = remote.getsockname()[:2]
+            await self._send_reply(client, REP_SUCCEEDED, bound_ip, bound_port)
+            await self._relay(client, remote)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.log(f"SOCKS5 {self.name} 연결 처리 오류: {e}", "ERROR")
+        finally:
+            self.stats['active'] -= 1
+            client.close()
+            if remote:
+                remote.close()
+
+    async def _open_connection(self, address: str, port: int) -> socket.socket:
+        """동글 IP에 바인딩된 아웃바운드 연결 생성"""
+        loop = asyncio.get_running_loop()
+
+        # 연결 시점의 IP를 조회하므로 IP 토글 후 재시작이 필요 없음
+        bind_ip = self.resolve_bind_ip()
+        if not bind_ip:
+            raise Socks5Error(REP_NETWORK_UNREACHABLE, f"{self.name} 출구 IP 없음")
+        family = socket.AF_INET6 if ':' in bind_ip else socket.AF_INET
+
+        try:
+            infos = await loop.getaddrinfo(address, port, family=family, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            raise Socks5Error(REP_HOST_UNREACHABLE, f"주소 해석 실패: {address}")
+
+        last_error = REP_HOST_UNREACHABLE
+        for _, _, _, _, sockaddr in infos:
+            remote = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                remote.setblocking(False)
+                remote.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                remote.bind((bind_ip, 0))
+                await asyncio.wait_for(loop.sock_connect(remote, sockaddr), CONNECT_TIMEOUT)
+                return remote
+            except ConnectionRefusedError:
+                last_error = REP_CONNECTION_REFUSED
+            except (OSError, asyncio.TimeoutError):
+                last_error = REP_HOST_UNREACHABLE
+            remote.close()
+
+        raise Socks5Error(last_error, f"연결 실패: {address}:{port}")
+
+    # ===== 릴레이 =====
+    def _acquire_buffer(self) -> bytearray:
+        return self._buffers.pop() if self._buffers else bytearray(self.buffer_size)
+
+    def _release_buffer(self, buf: bytearray):
+        if len(self._buffers) < 64:
+            self._buffers.append(buf)
+
+    async def _relay(self, client: socket.socket, remote: socket.socket):
+        """양방향 릴레이 (한쪽이 오류로 끝나면 다른 방향도 중단)"""
+        copy = self._splice_copy if self.use_splice else self._buffered_copy
+        up = asyncio.ensure_future(copy(client, remote, 'bytes_up'))
+        down = asyncio.ensure_future(copy(remote, client, 'bytes_down'))
+        pending = {up, down}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(task.exception() for task in done):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(up, down, return_exceptions=True)
+
+    @staticmethod
+    def _shutdown_write(sock: socket.socket):
+        try:
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    async def _buffered_copy(self, src: socket.socket, dst: socket.socket, counter: str):
+        """재사용 버퍼를 이용한 단방향 복사"""
+        loop = asyncio.get_running_loop()
+        buf = self._acquire_buffer()
+        view = memoryview(buf)
+        try:
+            while True:
+                n = await loop.sock_recv_into(src, buf)
+                if not n:
+                    break
+                await loop.sock_sendall(dst, view[:n])
+                self.stats[counter] += n
+        finally:
+            view.release()
+            self._release_buffer(buf)
+        self._shutdown_write(dst)
+
+    async def _wait_fd(self, fd: int, writable: bool = False):
+        """fd가 읽기/쓰기 가능해질 때까지 대기"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def ready():
+            if not future.done():
+                future.set_result(None)
+
+        if writable:
+            loop.add_writer(fd, ready)
+        else:
+            loop.add_reader(fd, ready)
+        try:
+            await future
+        finally:
+            if writable:
+                loop.remove_writer(fd)
+            else:
+                loop.remove_reader(fd)
+
+    async def _splice_copy(self, src: socket.socket, dst: socket.socket, counter: str):
+        """파이프를 경유한 os.splice 단방향 복사 (유저 공간 복사 없음)"""
+        try:
+            pipe_r, pipe_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError:
+            return await self._buffered_copy(src, dst, counter)
+
+        flags = os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK
+        chunk = self.buffer_size
+        try:
+            try:
+                import fcntl
+                chunk = fcntl.fcntl(pipe_w, F_SETPIPE_SZ, self.buffer_size)
+            except OSError:
+                chunk = 64 * 1024
+
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            while True:
+                try:
+                    n = os.splice(src_fd, pipe_w, chunk, flags=flags)
+                except BlockingIOError:
+                    await self._wait_fd(src_fd)
+                    continue
+                except OSError as e:
+                    if e.errno in (22, 38):  # EINVAL, ENOSYS: splice 미지원 소켓
+                        self.use_splice = False
+                        os.close(pipe_r)
+                        os.close(pipe_w)
+                        pipe_r = pipe_w = None
+                        return await self._buffered_copy(src, dst, counter)
+                    raise
+                if not n:
+                    break
+
+                remaining = n
+                while remaining:
+                    try:
+                        remaining -= os.splice(pipe_r, dst_fd, remaining, flags=flags)
+                    except BlockingIOError:
+                        await self._wait_fd(dst_fd, writable=True)
+                self.stats[counter] += n
+        finally:
+            if pipe_r is not None:
+                os.close(pipe_r)
+                os.close(pipe_w)
+        self._shutdown_write(dst)
+
+
+def parse_udp_header(view: memoryview, length: int):
+    """SOCKS5 UDP 요청 헤더 파싱 -> (헤더 길이, 주소 타입, 주소, 포트)
+
+    주소는 복사 없이 해석하며, 조각난(FRAG != 0) 데이터그램은 None 반환
+    """
+    if length < 10 or view[2] != 0:
+        return None
+    atyp = view[3]
+    if atyp == ATYP_IPV4:
+        end = 8
+        address = socket.inet_ntop(socket.AF_INET, view[4:end])
+    elif atyp == ATYP_IPV6:
+        end = 20
+        if length < end + 2:
+            return None
+        address = socket.inet_ntop(socket.AF_INET6, view[4:end])
+    elif atyp == ATYP_DOMAIN:
+        end = 5 + view[4]
+        if length < end + 2:
+            return None
+        address = bytes(view[5:end]).decode('idna')
+    else:
+        return None
+    port = (view[end] << 8) | view[end + 1]
+    return end + 2, atyp, address, port
+
+
+def build_udp_header(address: str, port: int) -> bytes:
+    """클라이언트로 돌려보낼 SOCKS5 UDP 응답 헤더"""
+    ip = ipaddress.ip_address(address)
+    atyp = ATYP_IPV4 if ip.version == 4 else ATYP_IPV6
+    return bytes([0, 0, 0, atyp]) + ip.packed + struct.pack('!H', port)
+
+
+class UdpAssociation:
+    """UDP ASSOCIATE 한 건 (클라이언트 측 소켓 + 동글 측 소켓)"""
+
+    def __init__(self, relay: 'UdpRelay', client_ip: str, local_ip: str):
+        self.relay = relay
+        self.client_ip = client_ip
+        self.client_addr = None
+        self.bound_ip = None
+        self.remote_sock = None
+        self.headers: Dict[tuple, bytes] = {}
+
+        self.client_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client_sock.setblocking(False)
+        self.client_sock.bind((local_ip, 0))
+
+    def open_remote(self, bind_ip: str):
+        """동글 IP에 바인딩된 아웃바운드 UDP 소켓 생성 (IP 변경 시 재생성)"""
+        loop = asyncio.get_running_loop()
+        if self.remote_sock:
+            loop.remove_reader(self.remote_sock.fileno())
+            self.remote_sock.close()
+        self.remote_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.remote_sock.setblocking(False)
+        self.remote_sock.bind((bind_ip, 0))
+        self.bound_ip = bind_ip
+        loop.add_reader(self.remote_sock.fileno(), self.relay.on_remote_readable, self)
+
+    def close(self):
+        loop = asyncio.get_running_loop()
+        for sock in (self.client_sock, self.remote_sock):
+            if sock:
+                loop.remove_reader(sock.fileno())
+                sock.close()
+        self.remote_sock = None
+
+
+class UdpRelay:
+    """동글별 UDP 릴레이
+
+    Python에는 recvmmsg/sendmmsg가 없으므로 소켓이 읽기 가능해질 때마다
+    최대 batch_size개의 데이터그램을 한 번에 비우고, 동글 단위로 공유하는
+    수신 버퍼의 memoryview 슬라이스로 전달해 패킷당 복사/할당을 없앤다.
+    응답 방향은 sendmsg 스캐터-개더로 헤더와 페이로드를 합치지 않고 보낸다.
+    """
+
+    def __init__(self, server: Socks5Server, batch_size: int = DEFAULT_UDP_BATCH):
+        self.server = server
+        self.batch_size = batch_size
+        self.associations = set()
+        self._buffer = bytearray(UDP_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._dns_cache: Dict[str, str] = {}
+
+    async def serve_association(self, client: socket.socket):
+        """UDP ASSOCIATE 처리 - 제어용 TCP 연결이 끊길 때까지 유지"""
+        loop = asyncio.get_running_loop()
+        stats = self.server.stats
+
+        bind_ip = self.server.resolve_bind_ip()
+        if not bind_ip or ':' in bind_ip:
+            await self.server._send_reply(client, REP_NETWORK_UNREACHABLE)
+            return
+
+        client_ip = client.getpeername()[0]
+        local_ip = client.getsockname()[0]
+        association = UdpAssociation(self, client_ip, local_ip)
+        try:
+            association.open_remote(bind_ip)
+        except OSError:
+            association.close()
+            await self.server._send_reply(client, REP_GENERAL_FAILURE)
+            return
+
+        self.associations.add(association)
+        stats['udp_associations'] += 1
+        loop.add_reader(association.client_sock.fileno(), self.on_client_readable, association)
+        try:
+            relay_ip, relay_port = association.client_sock.getsockname()[:2]
+            await self.server._send_reply(client, REP_SUCCEEDED, relay_ip, relay_port)
+            # RFC 1928: 제어 연결이 닫히면 연계 종료
+            while await loop.sock_recv(client, 1024):
+                pass
+        except OSError:
+            pass
+        finally:
+            self.associations.discard(association)
+            association.close()
+
+    def on_client_readable(self, association: UdpAssociation):
+        """클라이언트 -> 목적지 (배치 처리)"""
+        stats = self.server.stats
+        view = self._view
+
+        bind_ip = self.server.resolve_bind_ip()
+        if bind_ip and bind_ip != association.bound_ip and ':' not in bind_ip:
+            try:
+                association.open_remote(bind_ip)
+            except OSError:
+                pass
+
+        for _ in range(self.batch_size):
+            try:
+                n, addr = association.client_sock.recvfrom_into(self._buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+
+            # 연계를 요청한 클라이언트 IP만 허용
+            if addr[0] != association.client_ip:
+                stats['udp_dropped'] += 1
+                continue
+            association.client_addr = addr
+
+            parsed = parse_udp_header(view, n)
+            if not parsed:
+                stats['udp_dropped'] += 1
+                continue
+            header_len, atyp, address, port = parsed
+
+            if atyp == ATYP_IPV6:
+                stats['udp_dropped'] += 1
+                continue
+            if atyp == ATYP_DOMAIN:
+                resolved = self._dns_cache.get(address)
+                if not resolved:
+                    # 이름 해석은 비동기로 처리하고 해당 데이터그램만 복사
+                    asyncio.ensure_future(
+                        self._resolve_and_send(association, address, port, bytes(view[header_len:n])))
+                    continue
+                address = resolved
+
+            try:
+                association.remote_sock.sendto(view[header_len:n], (address, port))
+            except OSError:
+                stats['udp_dropped'] += 1
+                continue
+            stats['udp_packets_up'] += 1
+            stats['bytes_up'] += n - header_len
+
+    def on_remote_readable(self, association: UdpAssociation):
+        """목적지 -> 클라이언트 (배치 처리)"""
+        stats = self.server.stats
+        view = self._view
+        headers = association.headers
+
+        for _ in range(self.batch_size):
+            try:
+                n, addr = association.remote_sock.recvfrom_into(self._buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+
+            if not association.client_addr:
+                stats['udp_dropped'] += 1
+                continue
+
+            header = headers.get(addr)
+            if header is None:
+                if len(headers) > 1024:
+                    headers.clear()
+                header = headers[addr] = build_udp_header(addr[0], addr[1])
+
+            try:
+                association.client_sock.sendmsg([header, view[:n]], [], 0, association.client_addr)
+            except OSError:
+                stats['udp_dropped'] += 1
+                continue
+            stats['udp_packets_down'] += 1
+            stats['bytes_down'] += n
+
+    async def _resolve_and_send(self, association: UdpAssociation, domain: str, port: int, payload: bytes):
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(domain, port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        except socket.gaierror:
+            self.server.stats['udp_dropped'] += 1
+            return
+        address = infos[0][4][0]
+        if len(self._dns_cache) > 4096:
+            self._dns_cache.clear()
+        self._dns_cache[domain] = address
+
+        if association.remote_sock:
+            try:
+                association.remote_sock.sendto(payload, (address, port))
+                self.server.stats['udp_packets_up'] += 1
+                self.server.stats['bytes_up'] += len(payload)
+            except OSError:
+                self.server.stats['udp_dropped'] += 1
+
+
+async def run_standalone(port: int, bind_ip: str):
+    """단독 실행 (테스트/벤치마크용)"""
+    server = Socks5Server('standalone', port, lambda: bind_ip, host="127.0.0.1")
+    await server.start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    import sys
+    listen_port = int(sys.argv[1]) if len(sys.argv) > 1 else 1080
+    egress_ip = sys.argv[2] if len(sys.argv) > 2 else "0.0.0.0"
+    asyncio.run(run_standalone(listen_port, egress_ip))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+핫 스탠바이 동글 풀
+- 미리 새 IP로 로테이션하고 헬스체크를 통과한 대기 동글 유지
+- 새 IP 요청 시 클라이언트 라우팅 테이블을 대기 동글로 한 번에 교체 (수 ms)
+- 기존 동글은 백그라운드에서 로테이션 후 풀로 복귀
+"""
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from rotation_engine import RESTORED
+
+STANDBY = 'standby'
+
+
+class StandbyPool:
+    """사전 로테이션된 대기 동글 풀"""
+
+    def __init__(self, server, engine, dongles: List[str] = None, refill_interval: float = 10.0,
+                 log: Callable = None):
+        self.server = server
+        self.engine = engine
+        self.initial = list(dongles or [])
+        self.refill_interval = refill_interval
+        self.log = log or server.log
+
+        self.ready: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.refilling: Dict[str, asyncio.Task] = {}
+        self.handoffs = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, server, engine, standby: dict) -> 'StandbyPool':
+        return cls(
+            server, engine,
+            dongles=standby.get('dongles', []),
+            refill_interval=standby.get('refill_interval', 10.0)
+        )
+
+    @property
+    def dongles(self) -> Dict[str, dict]:
+        return self.server.config['dongles']
+
+    def members(self) -> List[str]:
+        """현재 대기 역할인 동글 (클라이언트 없음)"""
+        return [name for name, dongle in self.dongles.items() if dongle.get('role') == STANDBY]
+
+    def is_standby(self, name: str) -> bool:
+        return self.dongles.get(name, {}).get('role') == STANDBY
+
+    # ===== 풀 유지 =====
+    def start(self):
+        """대기 동글 지정 후 사전 로테이션 시작 (이벤트 루프에서 호출)"""
+        if not self.members():
+            for name in self.initial:
+                if name in self.dongles:
+                    self.dongles[name]['role'] = STANDBY
+            self.server.save_config()
+        self.log(f"스탠바이 풀: {', '.join(self.members()) or '없음'}")
+        self.refill_all()
+
+    def refill_all(self):
+        for name in self.members():
+            if (name not in self.ready and name not in self.refilling
+                    and self.dongles[name]['status'] == 'active'):
+                self.refilling[name] = asyncio.get_running_loop().create_task(self._refill(name))
+
+    async def _refill(self, name: str):
+        """로테이션 → 헬스체크 → 준비 목록에 추가"""
+        try:
+            job = self.engine.submit(name)
+            await job.future
+            if job.state != RESTORED:
+                return
+            dongle = self.dongles[name]
+            result = await self.server.prober.probe(dongle['interface'])
+            if not result['healthy']:
+                self.log(f"스탠바이 {name} 헬스체크 실패: {result['error']}", "WARNING")
+                return
+            with self._lock:
+                self.ready[name] = {'ip': job.new_ip, 'since': time.time(), 'rtt_ms': result['rtt_ms']}
+            self.log(f"스탠바이 {name} 준비 완료: {job.new_ip}")
+        finally:
+            self.refilling.pop(name, None)
+
+    async def run_forever(self):
+        """실패한 사전 로테이션 재시도"""
+        while True:
+            await asyncio.sleep(self.refill_interval)
+            self.refill_all()
+
+    # ===== 교체 =====
+    def _take_ready(self) -> Optional[tuple]:
+        """가장 오래 대기한 정상 스탠바이 동글 꺼내기"""
+        with self._lock:
+            for name in list(self.ready):
+                dongle = self.dongles.get(name)
+                healthy = self.server.health.get(name, {}).get('healthy', True)
+                if (dongle and dongle.get('role') == STANDBY and dongle['status'] == 'active'
+                        and healthy and name not in self.server.rotating):
+                    return name, self.ready.pop(name)
+                # 준비 후 장애가 난 동글은 다시 채움
+                del self.ready[name]
+        return None
+
+    def handoff(self, dongle_name: str) -> Optional[Dict]:
+        """dongle_name의 클라이언트를 스탠바이 동글로 즉시 이전 (준비된 동글이 없거나 로테이션/페일오버 중이면 None)"""
+        if self.is_standby(dongle_name):
+            return None
+        # 로테이션 중이거나 페일오버 redirect에 걸린 테이블은 소유권을 바꾸면 복구 대상이 어긋남
+        redirects = self.server.failover.redirects
+        if dongle_name in self.server.rotating or dongle_name in redirects or dongle_name in redirects.values():
+            self.log(f"스탠바이 교체 건너뜀: {dongle_name} (로테이션/페일오버 중)")
+            return None
+        taken = self._take_ready()
+        if not taken:
+            return None
+        standby_name, ready_info = taken
+
+        started = time.perf_counter()
+        dongle = self.dongles[dongle_name]
+        standby = self.dongles[standby_name]
+        table_id = dongle['routing_table']
+
+        try:
+            self.server.net.apply_table(table_id, self.server.dongle_routes(standby))
+        except OSError as e:
+            self.log(f"스탠바이 교체 실패 ({dongle_name} → {standby_name}): {e}", "ERROR")
+            with self._lock:
+                self.ready[standby_name] = ready_info
+            return None
+        swap_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        # 라우팅 테이블 소유권 교환 → 이후 보호/복구/페일오버가 새 소유자 기준으로 동작
+        dongle['routing_table'], standby['routing_table'] = standby['routing_table'], table_id
+        standby.pop('role', None)
+        dongle['role'] = STANDBY
+        self.server.set_dongle_egress(standby_name, True)
+        self.server.save_config()
+        self.handoffs += 1
+
+        self.log(f"스탠바이 교체: table {table_id} {dongle_name} → {standby_name} "
+                 f"({standby.get('ip')}, {swap_ms}ms)", event='handoff', dongle=dongle_name,
+                 standby=standby_name, duration_ms=swap_ms)
+
+        # 기존 동글은 백그라운드 로테이션 후 풀로 복귀
+        self.server.loop.call_soon_threadsafe(self.refill_all)
+
+        return {
+            'mode': 'standby',
+            'from': dongle_name,
+            'to': standby_name,
+            'routing_table': table_id,
+            'ip': standby.get('ip'),
+            'swap_ms': swap_ms,
+        }
+
+    def status(self) -> Dict:
+        with self._lock:
+            ready = {name: dict(info) for name, info in self.ready.items()}
+        return {
+            'members': self.members(),
+            'ready': ready,
+            'refilling': sorted(self.refilling),
+            'handoffs': self.handoffs,
+        }
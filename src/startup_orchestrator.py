@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+게이트웨이 시작 오케스트레이터
+- 서로 독립적인 구성요소(동글별 프록시/라우팅 등)를 동시에 시작
+- 의존 관계가 있는 구성요소는 선행 구성요소가 준비된 뒤 시작
+- 시작 후 실제 준비 상태 확인 (포트 수신, 라우트 존재)
+- 구성요소별 시작 타임라인 기록
+"""
+
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+READY = 'ready'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+async def wait_port(port: int, host: str = "127.0.0.1", timeout: float = 5.0) -> bool:
+    """포트가 연결을 받을 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.close()
+            return True
+        except (OSError, asyncio.TimeoutError):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+
+
+async def wait_route(net, table: int, interface: str, timeout: float = 5.0) -> bool:
+    """테이블에 interface를 경유하는 default 라우트가 생길 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            for route in net.get_routes(table):
+                if route['dst'] != 'default':
+                    continue
+                hops = route.get('nexthops') or [route]
+                if any(hop['interface'] == interface for hop in hops):
+                    return True
+        except OSError:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.05)
+
+
+class Component:
+    """시작할 구성요소 하나"""
+
+    def __init__(self, name: str, start: Callable[[], Awaitable], ready: Callable[[], Awaitable] = None,
+                 depends: Iterable[str] = (), timeout: float = 10.0):
+        self.name = name
+        self.start = start
+        self.ready = ready
+        self.depends = list(depends)
+        self.timeout = timeout
+
+        self.status = None
+        self.error = None
+        self.started_ms = None
+        self.launched_ms = None
+        self.ready_ms = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'status': self.status,
+            'error': self.error,
+            'depends': self.depends,
+            'started_ms': self.started_ms,
+            'launched_ms': self.launched_ms,
+            'ready_ms': self.ready_ms,
+            'duration_ms': round(self.ready_ms - self.started_ms, 1)
+                if self.ready_ms is not None and self.started_ms is not None else None,
+        }
+
+
+class StartupOrchestrator:
+    """의존 관계에 따라 구성요소를 병렬로 시작하고 준비 상태를 확인"""
+
+    def __init__(self, parallel: bool = True, log: Callable = None):
+        self.parallel = parallel
+        self.log = log or (lambda message, level="INFO": None)
+        self.components: Dict[str, Component] = {}
+        self._t0 = None
+        self._serial = None
+
+    def add(self, name: str, start: Callable[[], Awaitable], ready: Callable[[], Awaitable] = None,
+            depends: Iterable[str] = (), timeout: float = 10.0) -> Component:
+        """start: 시작 코루틴 함수, ready: True를 반환할 때까지 확인하는 코루틴 함수"""
+        component = Component(name, start, ready, depends, timeout)
+        self.components[name] = component
+        return component
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 1)
+
+    async def _run_component(self, component: Component):
+        try:
+            for dependency in component.depends:
+                if dependency in self.components:
+                    await self.components[dependency].done.wait()
+            failed = [
+                dependency for dependency in component.depends
+                if self.components.get(dependency) and self.components[dependency].status != READY
+            ]
+            if failed:
+                component.status = SKIPPED
+                component.error = f"선행 구성요소 실패: {', '.join(failed)}"
+                return
+
+            async with self._serial:
+                component.started_ms = self._elapsed_ms()
+                try:
+                    result = await asyncio.wait_for(component.start(), component.timeout)
+                    component.launched_ms = self._elapsed_ms()
+                    if result is False:
+                        raise RuntimeError("시작 실패")
+                    if component.ready and not await asyncio.wait_for(component.ready(), component.timeout):
+                        raise RuntimeError("준비 확인 실패")
+                    component.status = READY
+                except asyncio.TimeoutError:
+                    component.status = FAILED
+                    component.error = f"{component.timeout}s 시간 초과"
+                except Exception as e:
+                    component.status = FAILED
+                    component.error = str(e) or type(e).__name__
+                component.ready_ms = self._elapsed_ms()
+        finally:
+            component.done.set()
+
+    async def run(self) -> List[Dict]:
+        """모든 구성요소 시작 (실패한 구성요소가 있어도 나머지는 계속)"""
+        self._t0 = time.perf_counter()
+        # 순차 모드는 비교/디버깅용 (한 번에 하나씩)
+        self._serial = asyncio.Semaphore(max(len(self.components), 1) if self.parallel else 1)
+        await asyncio.gather(*(self._run_component(c) for c in self.components.values()))
+        return self.timeline()
+
+    def timeline(self) -> List[Dict]:
+        """시작 시각 순 타임라인"""
+        return sorted(
+            (component.to_dict() for component in self.components.values()),
+            key=lambda entry: (entry['started_ms'] is None, entry['started_ms'] or 0)
+        )
+
+    @property
+    def total_ms(self) -> Optional[float]:
+        finished = [c.ready_ms for c in self.components.values() if c.ready_ms is not None]
+        return max(finished) if finished else None
+
+    def report(self):
+        """타임라인 로그 출력"""
+        for entry in self.timeline():
+            if entry['status'] == SKIPPED:
+                self.log(f"  - {entry['name']}: 건너뜀 ({entry['error']})", "WARNING")
+            elif entry['status'] == FAILED:
+                self.log(f"  - {entry['name']}: 실패 {entry['started_ms']}ms → {entry['ready_ms']}ms "
+                         f"({entry['error']})", "ERROR")
+            else:
+                self.log(f"  - {entry['name']}: {entry['started_ms']}ms → {entry['ready_ms']}ms "
+                         f"({entry['duration_ms']}ms)")
+        ready = sum(1 for c in self.components.values() if c.status == READY)
+        self.log(f"시작 완료: {ready}/{len(self.components)}개 준비, 총 {self.total_ms}ms")
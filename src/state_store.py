@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+공유 상태 저장소 (SQLite WAL)
+- 게이트웨이 설정, WireGuard/VPN 클라이언트, 에이전트 정보를 레코드 단위로 저장
+- 변경된 레코드만 트랜잭션으로 기록 (쓰기 중 크래시에도 파일이 깨지지 않음)
+- 클라이언트 ID(기본 키), 공개키, IP 인덱스
+- 기존 JSON 파일은 처음 로드할 때 자동 이전 (원본은 .migrated로 보관)
+
+사용법: python3 src/state_store.py [--db /home/proxy/state.db] [export <collection>]
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable
+
+DEFAULT_STATE_DB = os.environ.get('DONGLE_STATE_DB', "/home/proxy/state.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    public_key TEXT,
+    ip TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (collection, key)
+);
+CREATE INDEX IF NOT EXISTS records_public_key ON records (collection, public_key);
+CREATE INDEX IF NOT EXISTS records_ip ON records (collection, ip);
+"""
+
+# 레코드에서 IP 인덱스로 쓰는 필드 (모듈마다 이름이 다름)
+IP_FIELDS = ('ip', 'allowed_ips', 'ip_address')
+
+
+def index_fields(record) -> tuple:
+    """레코드의 (public_key, ip) - IP는 프리픽스 길이 제외"""
+    if not isinstance(record, dict):
+        return None, None
+    ip = next((record[field] for field in IP_FIELDS if isinstance(record.get(field), str)), None)
+    public_key = record.get('public_key')
+    return (public_key if isinstance(public_key, str) else None), (ip.split('/')[0] if ip else None)
+
+
+class StateStore:
+    """레코드 단위 트랜잭션 저장소 (프로세스 간 공유 가능)"""
+
+    def __init__(self, path: str = DEFAULT_STATE_DB):
+        self.path = path
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def version(self) -> int:
+        """다른 연결(프로세스)이 커밋할 때마다 바뀌는 값 - 메모리 캐시 무효화용"""
+        with self._lock:
+            return self.db.execute("PRAGMA data_version").fetchone()[0]
+
+    @contextmanager
+    def transaction(self):
+        """여러 변경을 하나의 트랜잭션으로 (중첩 호출은 바깥 트랜잭션에 합류)"""
+        with self._lock:
+            if self.db.in_transaction:
+                yield self.db
+                return
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    # ===== 레코드 =====
+    def put(self, collection: str, key: str, record):
+        self.put_many(collection, {key: record})
+
+    def put_many(self, collection: str, records: Dict[str, object]):
+        now = time.time()
+        rows = [
+            (collection, str(key), json.dumps(record, ensure_ascii=False), *index_fields(record), now)
+            for key, record in records.items()
+        ]
+        with self.transaction() as db:
+            db.executemany(
+                "INSERT INTO records (collection, key, data, public_key, ip, updated) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (collection, key) DO UPDATE SET "
+                "data = excluded.data, public_key = excluded.public_key, ip = excluded.ip, updated = excluded.updated",
+                rows
+            )
+
+    def delete(self, collection: str, *keys: str):
+        with self.transaction() as db:
+            db.executemany("DELETE FROM records WHERE collection = ? AND key = ?",
+                           [(collection, str(key)) for key in keys])
+
+    def get(self, collection: str, key: str):
+        with self._lock:
+            row = self.db.execute("SELECT data FROM records WHERE collection = ? AND key = ?",
+                                  (collection, str(key))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load(self, collection: str) -> Dict[str, object]:
+        with self._lock:
+            rows = self.db.execute("SELECT key, data FROM records WHERE collection = ? ORDER BY rowid",
+                                   (collection,)).fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM records WHERE collection = ?",
+                                   (collection,)).fetchone()[0]
+
+    def find(self, collection: str, public_key: str = None, ip: str = None) -> Dict[str, object]:
+        """공개키 또는 IP로 레코드 조회 (인덱스 사용)"""
+        if public_key is not None:
+            column, value = 'public_key', public_key
+        elif ip is not None:
+            column, value = 'ip', ip.split('/')[0]
+        else:
+            return {}
+        with self._lock:
+            rows = self.db.execute(f"SELECT key, data FROM records WHERE collection = ? AND {column} = ?",
+                                   (collection, value)).fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def collections(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.db.execute("SELECT collection, COUNT(*) FROM records GROUP BY collection").fetchall()
+        return dict(rows)
+
+    # ===== 이전 =====
+    def migrate_json(self, collection: str, json_path: str, split=None) -> int:
+        """collection이 비어 있으면 JSON 파일을 가져오고 원본은 .migrated로 이름 변경
+
+        split: JSON 내용을 {key: record}로 바꾸는 함수 (기본: 최상위 dict 그대로)
+        """
+        if not json_path or not os.path.exists(json_path) or self.count(collection):
+            return 0
+        with open(json_path) as f:
+            data = json.load(f)
+        records = split(data) if split else data
+        self.put_many(collection, records)
+        os.replace(json_path, json_path + ".migrated")
+        return len(records)
+
+
+class StateCollection:
+    """관리자 클래스용 컬렉션 - dict를 그대로 쓰고 저장 시 바뀐 레코드만 기록"""
+
+    def __init__(self, store: StateStore, name: str, legacy_json: str = None, log: Callable = None):
+        self.store = store
+        self.name = name
+        self.legacy_json = legacy_json
+        self.log = log or (lambda message, level="INFO", **fields: None)
+        self._persisted: Dict[str, str] = {}
+
+    def load(self) -> Dict[str, object]:
+        migrated = self.store.migrate_json(self.name, self.legacy_json)
+        if migrated:
+            self.log(f"{self.legacy_json} → {self.store.path} ({self.name}: {migrated}개 레코드 이전)",
+                     event='state_migrate', collection=self.name, source=self.legacy_json, records=migrated)
+        records = self.store.load(self.name)
+        self._persisted = {key: json.dumps(record, ensure_ascii=False) for key, record in records.items()}
+        return records
+
+    def save(self, records: Dict[str, object], keys: Iterable[str] = None):
+        """keys가 있으면 해당 레코드만, 없으면 전체를 비교해 바뀐 레코드만 기록 (없는 키는 삭제)"""
+        if keys is None:
+            keys = list(records) + [key for key in self._persisted if key not in records]
+        changed, removed = {}, []
+        for key in keys:
+            if key not in records:
+                if key in self._persisted:
+                    removed.append(key)
+                continue
+            serialized = json.dumps(records[key], ensure_ascii=False)
+            if self._persisted.get(key) != serialized:
+                changed[key] = records[key]
+        if not changed and not removed:
+            return
+        with self.store.transaction():
+            if changed:
+                self.store.put_many(self.name, changed)
+            if removed:
+                self.store.delete(self.name, *removed)
+        for key in changed:
+            self._persisted[key] = json.dumps(changed[key], ensure_ascii=False)
+        for key in removed:
+            del self._persisted[key]
+
+    def find(self, public_key: str = None, ip: str = None) -> Dict[str, object]:
+        return self.store.find(self.name, public_key=public_key, ip=ip)
+
+
+_stores: Dict[str, StateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_state_store(path: str = None) -> StateStore:
+    """경로별 공유 저장소 (프로세스 내 관리자들이 같은 연결 사용)"""
+    path = path or DEFAULT_STATE_DB
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = StateStore(path)
+        return _stores[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상태 저장소 조회")
+    parser.add_argument('--db', default=DEFAULT_STATE_DB)
+    parser.add_argument('command', nargs='?', choices=['list', 'export'], default='list')
+    parser.add_argument('collection', nargs='?')
+    args = parser.parse_args()
+
+    store = StateStore(args.db)
+    if args.command == 'export':
+        if not args.collection:
+            parser.error("export에는 collection이 필요합니다")
+        json.dump(store.load(args.collection), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    for collection, count in sorted(store.collections().items()):
+        print(f"{collection}: {count}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,154 +8,167 @@ VPN 인증 관리 시스템
 """
 
 import os
-import json
 import secrets
-import subprocess
 import qrcode
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 import hashlib
 import base64
+import argparse
+import threading
+
+from address_pool import get_address_pool
+from api_server import serve
+from command_batch import CommandBatch
+from event_log import LOG_DIR, get_event_log
+from job_queue import FAILED, JobQueue, JobQueueFull
+from state_store import StateCollection, get_state_store
+from wg_keys import get_key_pool
+from wg_telemetry import get_telemetry
+
+events = get_event_log(os.path.join(LOG_DIR, "vpn_auth.log"))
+log = events.logger('vpn_auth')
+
+TUNNEL_NETWORK = "10.0.0.0/24"
+JOB_WORKERS = 4
+SYNC_TIMEOUT = 30  # 동기 요청이 작업 완료를 기다리는 최대 시간 (넘으면 202 + 작업 ID)
+MAX_JOB_WAIT = 60
 
 class VPNAuthManager:
     def __init__(self):
         self.config_file = "/home/proxy/vpn_clients.json"
+        self.state = StateCollection(get_state_store(), 'vpn_clients', self.config_file, log=log)
         self.clients = self.load_clients()
+        # dongle_api/에이전트 관리자와 같은 임대 저장소를 쓰므로 주소가 겹치지 않음
+        self.pool = get_address_pool(TUNNEL_NETWORK)
+        # 임시/동적 클라이언트 키는 미리 만든 풀에서 꺼냄 (wg genkey/pubkey 프로세스 없음)
+        self.keys = get_key_pool()
+        self.telemetry = get_telemetry()
+        conflicts = self.pool.adopt({
+            client['allowed_ips']: self.lease_owner(client_id)
+            for client_id, client in self.clients.items()
+            if client.get('allowed_ips') and self.pool.contains(client['allowed_ips'])
+        })
+        if conflicts:
+            log(f"다른 모듈과 겹치는 클라이언트 IP: {', '.join(conflicts)}", "WARNING", event='address_conflict')
+        # API 요청 스레드, 작업 워커, 만료 정리 스레드가 clients를 함께 바꾸므로 변경은 이 잠금 안에서
+        self.lock = threading.RLock()
         
     def load_clients(self):
-        """클라이언트 정보 로드"""
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        return {}
+        """클라이언트 정보 로드 (기존 JSON 파일은 상태 저장소로 이전)"""
+        return self.state.load()
     
-    def save_clients(self):
-        """클라이언트 정보 저장"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.clients, f, indent=2)
+    def save_clients(self, *client_ids):
+        """클라이언트 정보 저장 - client_ids가 있으면 해당 레코드만"""
+        self.state.save(self.clients, client_ids or None)
     
     # ===== 방법 1: 사전 등록 키 (영구) =====
     def register_permanent_client(self, client_name: str, public_key: str, 
                                  allowed_ips: str = None, vpn_port: int = 51820):
         """영구 클라이언트 등록"""
-        client_id = hashlib.sha256(public_key.encode()).hexdigest()[:8]
-        
-        # 자동 IP 할당
-        if not allowed_ips:
-            used_ips = [c['allowed_ips'] for c in self.clients.values()]
-            for i in range(2, 255):
-                test_ip = f"10.0.0.{i}/32"
-                if test_ip not in used_ips:
-                    allowed_ips = test_ip
-                    break
-        
-        self.clients[client_id] = {
-            'name': client_name,
-            'public_key': public_key,
-            'allowed_ips': allowed_ips,
-            'vpn_port': vpn_port,
-            'type': 'permanent',
-            'created': datetime.now().isoformat(),
-            'last_seen': None,
-            'status': 'active'
-        }
-        
-        # WireGuard에 추가
-        self.add_to_wireguard(client_id)
-        self.save_clients()
-        
-        print(f"✅ 영구 클라이언트 등록: {client_name} ({allowed_ips})")
-        return client_id
+        with self.lock:
+            client_id = hashlib.sha256(public_key.encode()).hexdigest()[:8]
+            
+            # 자동 IP 할당 (지정한 IP가 풀 안이면 예약, 같은 공개키 재등록이면 기존 임대 재사용)
+            allowed_ips, leased = self.lease_ip(client_id, allowed_ips)
+            
+            # WireGuard에 추가
+            self.store_client(client_id, {
+                'name': client_name,
+                'public_key': public_key,
+                'allowed_ips': allowed_ips,
+                'vpn_port': vpn_port,
+                'type': 'permanent',
+                'created': datetime.now().isoformat(),
+                'last_seen': None,
+                'status': 'active'
+            }, leased)
+            
+            log(f"✅ 영구 클라이언트 등록: {client_name} ({allowed_ips})", event='client_register',
+                client_id=client_id, type='permanent', ip=allowed_ips)
+            return client_id
     
     # ===== 방법 2: 임시 액세스 토큰 =====
     def create_temp_access(self, duration_hours: int = 24, vpn_port: int = 51820):
         """임시 액세스 생성"""
-        # 임시 키 생성
-        private_key = subprocess.run(['wg', 'genkey'], 
-                                    capture_output=True, text=True).stdout.strip()
-        public_key = subprocess.run(['wg', 'pubkey'], input=private_key,
-                                   capture_output=True, text=True).stdout.strip()
-        
-        # 액세스 토큰 생성
-        token = secrets.token_urlsafe(32)
-        client_id = hashlib.sha256(token.encode()).hexdigest()[:8]
-        
-        # IP 자동 할당
-        allowed_ips = self.get_next_available_ip()
-        
-        expires = datetime.now() + timedelta(hours=duration_hours)
-        
-        self.clients[client_id] = {
-            'name': f'temp_{client_id}',
-            'public_key': public_key,
-            'private_key': private_key,  # 임시 클라이언트는 서버가 키 관리
-            'allowed_ips': allowed_ips,
-            'vpn_port': vpn_port,
-            'type': 'temporary',
-            'token': token,
-            'created': datetime.now().isoformat(),
-            'expires': expires.isoformat(),
-            'status': 'active'
-        }
-        
-        # WireGuard에 추가
-        self.add_to_wireguard(client_id)
-        self.save_clients()
-        
-        # 클라이언트 설정 생성
-        config = self.generate_client_config(client_id)
-        
-        print(f"✅ 임시 액세스 생성 ({duration_hours}시간)")
-        print(f"   토큰: {token}")
-        print(f"   만료: {expires}")
-        
-        return token, config
+        with self.lock:
+            # 임시 키 생성
+            private_key, public_key = self.keys.take()
+            
+            # 액세스 토큰 생성
+            token = secrets.token_urlsafe(32)
+            client_id = hashlib.sha256(token.encode()).hexdigest()[:8]
+            
+            # IP 자동 할당
+            allowed_ips, leased = self.lease_ip(client_id)
+            
+            expires = datetime.now() + timedelta(hours=duration_hours)
+            
+            # WireGuard에 추가
+            self.store_client(client_id, {
+                'name': f'temp_{client_id}',
+                'public_key': public_key,
+                'private_key': private_key,  # 임시 클라이언트는 서버가 키 관리
+                'allowed_ips': allowed_ips,
+                'vpn_port': vpn_port,
+                'type': 'temporary',
+                'token': token,
+                'created': datetime.now().isoformat(),
+                'expires': expires.isoformat(),
+                'status': 'active'
+            }, leased)
+            
+            # 클라이언트 설정 생성
+            config = self.generate_client_config(client_id)
+            
+            # 토큰은 로그 파일에 남기지 않음 (반환값으로만 전달)
+            log(f"✅ 임시 액세스 생성 ({duration_hours}시간, 만료 {expires})", event='client_register',
+                client_id=client_id, type='temporary', ip=allowed_ips)
+            
+            return token, config
     
     # ===== 방법 3: 동적 등록 (REST API) =====
     def dynamic_register(self, auth_token: str, device_id: str):
         """동적 클라이언트 등록 (API 인증)"""
-        # 토큰 검증 (실제로는 DB나 OAuth 연동)
-        if not self.verify_auth_token(auth_token):
-            return None, "Invalid auth token"
-        
-        # 디바이스별 고유 키 생성
-        client_id = hashlib.sha256(f"{device_id}{auth_token}".encode()).hexdigest()[:8]
-        
-        # 이미 등록된 경우 정보 반환
-        if client_id in self.clients:
-            return client_id, self.clients[client_id]
-        
-        # 새 키 생성
-        private_key = subprocess.run(['wg', 'genkey'], 
-                                    capture_output=True, text=True).stdout.strip()
-        public_key = subprocess.run(['wg', 'pubkey'], input=private_key,
-                                   capture_output=True, text=True).stdout.strip()
-        
-        allowed_ips = self.get_next_available_ip()
-        
-        self.clients[client_id] = {
-            'name': f'device_{device_id}',
-            'public_key': public_key,
-            'allowed_ips': allowed_ips,
-            'vpn_port': 51820,
-            'type': 'dynamic',
-            'device_id': device_id,
-            'created': datetime.now().isoformat(),
-            'status': 'active'
-        }
-        
-        self.add_to_wireguard(client_id)
-        self.save_clients()
-        
-        # 클라이언트 설정 반환
-        config = {
-            'private_key': private_key,
-            'address': allowed_ips,
-            'server_public_key': self.get_server_public_key(),
-            'endpoint': '222.101.90.78:51820'
-        }
-        
-        return client_id, config
+        with self.lock:
+            # 토큰 검증 (실제로는 DB나 OAuth 연동)
+            if not self.verify_auth_token(auth_token):
+                return None, "Invalid auth token"
+            
+            # 디바이스별 고유 키 생성
+            client_id = hashlib.sha256(f"{device_id}{auth_token}".encode()).hexdigest()[:8]
+            
+            # 이미 등록된 경우 정보 반환
+            if client_id in self.clients:
+                return client_id, self.clients[client_id]
+            
+            # 새 키 생성
+            private_key, public_key = self.keys.take()
+            
+            allowed_ips, leased = self.lease_ip(client_id)
+            
+            self.store_client(client_id, {
+                'name': f'device_{device_id}',
+                'public_key': public_key,
+                'allowed_ips': allowed_ips,
+                'vpn_port': 51820,
+                'type': 'dynamic',
+                'device_id': device_id,
+                'created': datetime.now().isoformat(),
+                'status': 'active'
+            }, leased)
+            log(f"✅ 동적 클라이언트 등록: {device_id} ({allowed_ips})", event='client_register',
+                client_id=client_id, type='dynamic', ip=allowed_ips)
+            
+            # 클라이언트 설정 반환
+            config = {
+                'private_key': private_key,
+                'address': allowed_ips,
+                'server_public_key': self.get_server_public_key(),
+                'endpoint': '222.101.90.78:51820'
+            }
+            
+            return client_id, config
     
     # ===== 방법 4: QR 코드 원타임 등록 =====
     def generate_qr_access(self, name: str = "QR Client"):
@@ -171,86 +184,144 @@ class VPNAuthManager:
         qr_path = f"/home/proxy/qr_{token[:8]}.png"
         img.save(qr_path)
         
-        print(f"✅ QR 코드 생성: {qr_path}")
+        log(f"✅ QR 코드 생성: {qr_path}", event='qr_access')
         return qr_path, config
     
     # ===== 방법 5: 시간 기반 액세스 =====
     def create_scheduled_access(self, start_time: datetime, end_time: datetime):
         """특정 시간대만 사용 가능한 액세스"""
-        client_id = secrets.token_hex(4)
-        
-        private_key = subprocess.run(['wg', 'genkey'], 
-                                    capture_output=True, text=True).stdout.strip()
-        public_key = subprocess.run(['wg', 'pubkey'], input=private_key,
-                                   capture_output=True, text=True).stdout.strip()
-        
-        self.clients[client_id] = {
-            'name': f'scheduled_{client_id}',
-            'public_key': public_key,
-            'private_key': private_key,
-            'allowed_ips': self.get_next_available_ip(),
-            'vpn_port': 51820,
-            'type': 'scheduled',
-            'start_time': start_time.isoformat(),
-            'end_time': end_time.isoformat(),
-            'status': 'pending'
-        }
-        
-        self.save_clients()
-        print(f"✅ 예약 액세스 생성: {start_time} ~ {end_time}")
-        return client_id
+        with self.lock:
+            client_id = secrets.token_hex(4)
+            
+            private_key, public_key = self.keys.take()
+            allowed_ips, leased = self.lease_ip(client_id)
+            
+            # 시작 시간 전에는 WireGuard에 추가하지 않음
+            self.store_client(client_id, {
+                'name': f'scheduled_{client_id}',
+                'public_key': public_key,
+                'private_key': private_key,
+                'allowed_ips': allowed_ips,
+                'vpn_port': 51820,
+                'type': 'scheduled',
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat(),
+                'status': 'pending'
+            }, leased, apply=False)
+            log(f"✅ 예약 액세스 생성: {start_time} ~ {end_time}", event='client_register',
+                client_id=client_id, type='scheduled')
+            return client_id
     
     # ===== 유틸리티 함수 =====
-    def get_next_available_ip(self):
-        """사용 가능한 다음 IP 반환"""
-        used_ips = [c['allowed_ips'].split('/')[0] for c in self.clients.values()]
-        for i in range(2, 255):
-            test_ip = f"10.0.0.{i}"
-            if test_ip not in used_ips:
-                return f"{test_ip}/32"
-        raise Exception("No available IPs")
+    @staticmethod
+    def lease_owner(client_id: str) -> str:
+        return f"vpn:{client_id}"
+    
+    def get_next_available_ip(self, client_id: str):
+        """주소 풀에서 client_id에게 다음 IP 임대 (AllowedIPs 형식)"""
+        return f"{self.pool.allocate(self.lease_owner(client_id))}/{self.pool.prefix_length}"
     
-    def add_to_wireguard(self, client_id: str):
-        """WireGuard에 클라이언트 추가"""
+    def lease_ip(self, client_id: str, allowed_ips: str = None):
+        """client_id의 AllowedIPs 확보 → (AllowedIPs, 이번에 새로 임대한 주소 또는 None)
+        
+        재등록이면 이 클라이언트가 이미 임대한 주소를 그대로 사용
+        """
+        owner = self.lease_owner(client_id)
+        if not allowed_ips:
+            current = self.clients.get(client_id, {}).get('allowed_ips')
+            if current and self.pool.contains(current) and self.pool.owner_of(current) == owner:
+                return current, None
+            allowed_ips = self.get_next_available_ip(client_id)
+            return allowed_ips, allowed_ips
+        if not self.pool.contains(allowed_ips) or self.pool.owner_of(allowed_ips) == owner:
+            return allowed_ips, None
+        if not self.pool.reserve(allowed_ips, owner):
+            raise ValueError(f"{allowed_ips}는 이미 사용 중입니다")
+        return allowed_ips, allowed_ips
+    
+    def store_client(self, client_id: str, client: Dict, leased: str = None, apply: bool = True):
+        """클라이언트 등록 → WireGuard 적용 → 저장
+        
+        실패하면 레코드와 새 임대(leased)를 되돌리고, 성공하면 재등록으로 바뀐 이전 임대를 반납
+        """
+        owner = self.lease_owner(client_id)
+        previous = self.clients.get(client_id)
+        self.clients[client_id] = client
+        applied = False
+        try:
+            if apply:
+                self.add_to_wireguard(client_id)
+                applied = True
+            self.save_clients(client_id)
+        except Exception:
+            if applied and previous is None:
+                try:
+                    self.remove_from_wireguard(client_id)
+                except Exception as e:
+                    log(f"등록 취소 중 피어 제거 실패: {client_id} ({e})", "WARNING", client_id=client_id)
+            if previous is None:
+                del self.clients[client_id]
+            else:
+                self.clients[client_id] = previous
+            if leased:
+                self.pool.release(leased, owner)
+            raise
+        
+        old_ips = previous.get('allowed_ips') if previous else None
+        if old_ips and old_ips != client['allowed_ips'] and self.pool.contains(old_ips):
+            self.pool.release(old_ips, owner)
+    
+    def add_to_wireguard(self, client_id: str, batch: CommandBatch = None):
+        """WireGuard에 클라이언트 추가 (batch가 있으면 등록만, 없으면 즉시 실행)"""
         client = self.clients[client_id]
         vpn_interface = f"wg{client['vpn_port'] - 51820}"  # wg0, wg1, wg2...
         
-        cmd = f"wg set {vpn_interface} peer {client['public_key']} allowed-ips {client['allowed_ips']}"
-        subprocess.run(cmd.split(), check=True)
-        
-        # 설정 저장
-        subprocess.run(['wg-quick', 'save', vpn_interface])
+        commands = batch or CommandBatch()
+        commands.wg_peer(vpn_interface, client['public_key'], allowed_ips=client['allowed_ips'])
+        # 설정 저장 (배치당 인터페이스별 한 번)
+        commands.wg_save(vpn_interface)
+        if batch is None:
+            commands.flush()
     
-    def remove_from_wireguard(self, client_id: str):
-        """WireGuard에서 클라이언트 제거"""
+    def remove_from_wireguard(self, client_id: str, batch: CommandBatch = None):
+        """WireGuard에서 클라이언트 제거 (batch가 있으면 등록만, 없으면 즉시 실행)"""
         client = self.clients[client_id]
         vpn_interface = f"wg{client['vpn_port'] - 51820}"
         
-        cmd = f"wg set {vpn_interface} peer {client['public_key']} remove"
-        subprocess.run(cmd.split(), check=True)
+        commands = batch or CommandBatch()
+        commands.wg_peer(vpn_interface, client['public_key'], remove=True)
+        if batch is None:
+            commands.flush()
     
     def cleanup_expired(self):
         """만료된 클라이언트 정리"""
-        now = datetime.now()
-        expired = []
-        
-        for client_id, client in self.clients.items():
-            if client['type'] == 'temporary':
-                expires = datetime.fromisoformat(client['expires'])
-                if now > expires:
-                    expired.append(client_id)
-            elif client['type'] == 'scheduled':
-                end_time = datetime.fromisoformat(client['end_time'])
-                if now > end_time:
-                    expired.append(client_id)
-        
-        for client_id in expired:
-            self.remove_from_wireguard(client_id)
-            del self.clients[client_id]
-            print(f"🗑️ 만료된 클라이언트 제거: {client_id}")
-        
-        if expired:
-            self.save_clients()
+        with self.lock:
+            now = datetime.now()
+            expired = []
+            
+            for client_id, client in self.clients.items():
+                if client['type'] == 'temporary':
+                    expires = datetime.fromisoformat(client['expires'])
+                    if now > expires:
+                        expired.append(client_id)
+                elif client['type'] == 'scheduled':
+                    end_time = datetime.fromisoformat(client['end_time'])
+                    if now > end_time:
+                        expired.append(client_id)
+            
+            # 인터페이스별 wg set 한 번으로 제거
+            batch = CommandBatch()
+            for client_id in expired:
+                self.remove_from_wireguard(client_id, batch)
+            batch.flush()
+            for client_id in expired:
+                if self.pool.contains(self.clients[client_id]['allowed_ips']):
+                    self.pool.release(self.clients[client_id]['allowed_ips'], self.lease_owner(client_id))
+                del self.clients[client_id]
+                log(f"🗑️ 만료된 클라이언트 제거: {client_id}", event='client_expire', client_id=client_id)
+            
+            if expired:
+                self.save_clients(*expired)
     
     def generate_client_config(self, client_id: str):
         """클라이언트 설정 생성"""
@@ -270,10 +341,9 @@ PersistentKeepalive = 25"""
         return config
     
     def get_server_public_key(self):
-        """서버 공개키 조회"""
-        result = subprocess.run(['wg', 'show', 'wg0', 'public-key'],
-                              capture_output=True, text=True)
-        return result.stdout.strip()
+        """서버 공개키 조회 (공유 상태 스냅샷에서, 설정 생성마다 wg를 실행하지 않음)"""
+        interface = self.telemetry.snapshot()['interfaces'].get('wg0')
+        return interface['public_key'] if interface else ''
     
     def verify_auth_token(self, token: str) -> bool:
         """인증 토큰 검증 (실제로는 DB나 OAuth 연동)"""
@@ -283,69 +353,129 @@ PersistentKeepalive = 25"""
 
 # ===== REST API 서버 =====
 from flask import Flask, request, jsonify
-import threading
 
 app = Flask(__name__)
 auth_manager = VPNAuthManager()
+# 키 생성/피어 추가는 인터페이스 단위로 직렬화 (HTTP 스레드는 작업 완료를 기다리지 않아도 됨)
+jobs = JobQueue(workers=JOB_WORKERS, log=log)
+
+def submit_job(kind, func, *args, resource='wg0'):
+    """작업 등록 - ?async=1 또는 "async": true가 아니면 SYNC_TIMEOUT까지 완료를 기다림"""
+    job = jobs.submit(kind, func, *args, resource=resource)
+    data = request.get_json(silent=True)
+    if not (request.args.get('async', type=int) or (isinstance(data, dict) and data.get('async'))):
+        job.wait(SYNC_TIMEOUT)
+    return job
+
+def job_response(job, render):
+    """작업 결과 응답 - 아직 끝나지 않았으면 202와 작업 ID"""
+    if not job.done:
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'state': job.state,
+            'status_url': f"/api/vpn/jobs/{job.job_id}"
+        }), 202
+    if job.state == FAILED:
+        return jsonify({'success': False, 'job_id': job.job_id, 'error': job.error}), 500
+    return jsonify({**render(job.result), 'success': True, 'job_id': job.job_id})
+
+@app.errorhandler(JobQueueFull)
+def job_queue_full(e):
+    return jsonify({'success': False, 'error': str(e)}), 503
 
 @app.route('/api/vpn/register', methods=['POST'])
 def api_register():
-    """동적 VPN 등록 API"""
+    """동적 VPN 등록 API (?async=1이면 작업 ID를 바로 반환)"""
     data = request.json
     auth_token = data.get('auth_token')
     device_id = data.get('device_id')
     
-    client_id, config = auth_manager.dynamic_register(auth_token, device_id)
-    
-    if client_id:
-        return jsonify({
-            'success': True,
-            'client_id': client_id,
-            'config': config
-        })
-    else:
+    # 토큰 검증은 큐에 넣기 전에 (잘못된 요청이 워커를 차지하지 않도록)
+    if not auth_manager.verify_auth_token(auth_token):
         return jsonify({
             'success': False,
-            'error': config
+            'error': "Invalid auth token"
         }), 401
+    
+    job = submit_job('client_register', auth_manager.dynamic_register, auth_token, device_id)
+    return job_response(job, lambda result: {
+        'client_id': result[0],
+        'config': result[1]
+    })
 
 @app.route('/api/vpn/temp', methods=['POST'])
 def api_temp_access():
-    """임시 액세스 생성 API"""
+    """임시 액세스 생성 API (?async=1이면 작업 ID를 바로 반환)"""
     data = request.json
     hours = data.get('hours', 24)
     
-    token, config = auth_manager.create_temp_access(hours)
-    
+    job = submit_job('temp_access', auth_manager.create_temp_access, hours)
+    return job_response(job, lambda result: {
+        'token': result[0],
+        'config': result[1]
+    })
+
+@app.route('/api/vpn/jobs/<job_id>', methods=['GET'])
+def api_job(job_id):
+    """작업 상태 조회 (?wait=<초>면 완료될 때까지 최대 그 시간만큼 대기)"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '작업을 찾을 수 없습니다'}), 404
+    wait = min(request.args.get('wait', 0, type=float), MAX_JOB_WAIT)
+    if wait > 0:
+        job.wait(wait)
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@app.route('/api/vpn/events', methods=['GET'])
+def api_events():
+    """최근 이벤트 조회 (?since=<seq>&level=WARNING&event=client_register&limit=100)"""
+    events_list = events.query(
+        since=request.args.get('since', type=int),
+        level=request.args.get('level'),
+        event=request.args.get('event'),
+        limit=request.args.get('limit', 100, type=int)
+    )
     return jsonify({
         'success': True,
-        'token': token,
-        'config': config
+        'events': events_list,
+        'last_seq': events_list[-1]['seq'] if events_list else request.args.get('since', type=int),
+        'dropped': events.dropped
     })
 
 def cleanup_loop():
-    """백그라운드 정리 작업"""
+    """백그라운드 정리 작업 - API 작업과 같은 wg0 순서로 실행"""
     import time
     while True:
         time.sleep(300)  # 5분마다
-        auth_manager.cleanup_expired()
+        try:
+            jobs.submit('cleanup_expired', auth_manager.cleanup_expired, resource='wg0')
+        except JobQueueFull as e:
+            log(f"만료 정리 건너뜀: {e}", "WARNING", event='client_expire')
 
 def main():
+    parser = argparse.ArgumentParser(description="VPN 인증 관리 시스템")
+    parser.add_argument('command', nargs='?', choices=['example', 'serve'], default='example')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+    
     print("=== VPN 인증 관리 시스템 ===")
     print("1. 영구 클라이언트 등록")
     print("2. 임시 액세스 생성 (24시간)")
     print("3. QR 코드 액세스 생성")
-    print("4. API 서버 시작")
+    print("4. API 서버 시작 (serve)")
     
     # 백그라운드 정리 작업 시작
     cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
     cleanup_thread.start()
     
-    # 예시 실행
-    manager = VPNAuthManager()
+    if args.command == 'serve':
+        serve(app, port=args.port, threads=args.threads, log=log)
+        return
     
-    # 임시 액세스 생성 예시
-    token, config = manager.create_temp_access(24)
+    # 예시 실행 (API와 같은 관리자 인스턴스 - 별도 인스턴스는 저장소 내용을 덮어쓸 수 있음)
+    token, config = auth_manager.create_temp_access(24)
     print(f"\n임시 설정:\n{config}")
 
 if __name__ == "__main__":
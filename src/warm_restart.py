@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+웜 리스타트 - 커널/데몬에 남아 있는 상태를 그대로 인수
+- 동글 라우팅 테이블을 읽어 설정과 다른 테이블만 한 배치로 갱신
+- 이전 프로세스가 남긴 페일오버 재지정(실패 동글 테이블 → 그룹 동글)을 복원
+- 로드밸런싱 multipath 라우트가 같으면 재적용하지 않음
+- 실행 중인 dante 프록시 프로세스는 설정이 같으면 재시작하지 않음
+"""
+
+import os
+import time
+from typing import Callable, Dict, FrozenSet, List
+
+
+def route_key(routes: List[Dict]) -> FrozenSet:
+    """비교용 라우트 집합 (순서/부가 속성 무시)"""
+    keys = set()
+    for route in routes:
+        if route.get('nexthops'):
+            hops = tuple(sorted(
+                (hop.get('gateway'), hop.get('interface'), int(hop.get('weight', 1)))
+                for hop in route['nexthops']
+            ))
+            keys.add((route['dst'], None, None, hops))
+        else:
+            keys.add((route['dst'], route.get('gateway'), route.get('interface'), None))
+    return frozenset(keys)
+
+
+def find_processes(executable: str) -> Dict[int, List[str]]:
+    """실행 중인 프로세스 중 executable로 시작된 것 {pid: argv}"""
+    processes = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                argv = [arg.decode(errors='replace') for arg in f.read().split(b'\0') if arg]
+        except OSError:
+            continue
+        if argv and os.path.basename(argv[0]) == executable:
+            processes[int(entry)] = argv
+    return processes
+
+
+class WarmRestart:
+    """시작 시 현재 상태를 읽어 설정과의 차이만 적용"""
+
+    def __init__(self, server, log: Callable = None):
+        self.server = server
+        self.log = log or server.log
+
+        self.unchanged: List[int] = []
+        self.changed: List[int] = []
+        self.adopted_redirects: Dict[str, str] = {}
+        self.adopted_proxies: List[str] = []
+        self._current: Dict[int, List[Dict]] = {}
+
+    @property
+    def dongles(self) -> Dict[str, dict]:
+        return self.server.config['dongles']
+
+    def _routes(self, table: int) -> List[Dict]:
+        if table not in self._current:
+            try:
+                self._current[table] = self.server.net.get_routes(table)
+            except OSError:
+                self._current[table] = []
+        return self._current[table]
+
+    # ===== 라우팅 =====
+    def adopt_redirects(self) -> Dict[str, str]:
+        """실패 동글 테이블이 그룹 내 다른 동글을 가리키고 있으면 그 재지정을 그대로 인수"""
+        failover = self.server.failover
+        for owner, dongle in self.dongles.items():
+            if dongle['status'] != 'failed' or 'routing_table' not in dongle:
+                continue
+            for route in self._routes(dongle['routing_table']):
+                if route['dst'] != 'default':
+                    continue
+                serving = self.server.dongle_by_interface(route.get('interface'))
+                if serving and serving in failover.group_of(owner) and failover.is_live(serving):
+                    failover.redirects[owner] = serving
+                    self.adopted_redirects[owner] = serving
+        return self.adopted_redirects
+
+    def desired_tables(self) -> Dict[int, List[Dict]]:
+        """활성 동글이 처리해야 하는 테이블의 목표 상태 (start_dongle의 update_routing과 동일)"""
+        failover = self.server.failover
+        tables = {}
+        for name, dongle in self.dongles.items():
+            if dongle['status'] != 'active' or dongle.get('unplugged'):
+                continue
+            if not (dongle.get('ip') and dongle.get('gateway')):
+                continue
+            for owner in failover.tables_served_by(name):
+                tables[self.dongles[owner]['routing_table']] = self.server.dongle_routes(dongle)
+        return tables
+
+    def sync_routes(self) -> List[int]:
+        """설정과 다른 테이블만 한 배치로 적용, 변경된 테이블 목록 반환"""
+        pending = {}
+        for table, routes in self.desired_tables().items():
+            if route_key(self._routes(table)) == route_key(routes):
+                self.unchanged.append(table)
+            else:
+                pending[table] = routes
+        if pending:
+            try:
+                self.server.net.apply_tables(pending)
+            except OSError as e:
+                self.log(f"웜 리스타트 라우팅 적용 실패: {e}", "ERROR")
+                return []
+        self.changed = sorted(pending)
+        return self.changed
+
+    def adopt_balancer(self) -> bool:
+        """multipath 라우트가 지금 계산한 가중치와 같으면 적용된 것으로 표시"""
+        balancer = self.server.balancer
+        names = balancer.candidates()
+        if not names:
+            return False
+        weights = balancer.compute_weights(names)
+        routes = balancer.routes(weights)
+        if route_key(self._routes(balancer.table)) != route_key(routes):
+            return False
+        balancer._applied = routes
+        balancer.weights = weights
+        return True
+
+    # ===== 프록시 =====
+    def adopt_proxies(self) -> List[str]:
+        """설정 파일이 같은 danted 프로세스는 그대로 사용"""
+        if self.server.config.get('socks5', {}).get('engine', 'builtin') != 'dante':
+            return []
+        running = {}
+        for pid, argv in find_processes('danted').items():
+            if '-f' in argv[:-1]:
+                running[argv[argv.index('-f') + 1]] = pid
+
+        endpoints = {
+            name: dongle for name, dongle in self.dongles.items()
+            if dongle['status'] == 'active' and not dongle.get('unplugged')
+        }
+        endpoints['mainline'] = self.server.config['main_line']
+        for name, config in endpoints.items():
+            config_file = f"/tmp/dante_{name}.conf"
+            pid = running.get(config_file)
+            if not pid:
+                continue
+            try:
+                with open(config_file) as f:
+                    current = f.read()
+            except OSError:
+                continue
+            if current != self.server.dante_config(name, config):
+                continue
+            self.server.proxies[name] = {
+                'port': config['socks_port'],
+                'pid': pid,
+                'status': 'running',
+                'engine': 'dante',
+                'adopted': True
+            }
+            self.adopted_proxies.append(name)
+        return self.adopted_proxies
+
+    def run(self) -> Dict:
+        """라우팅/프록시 인수 (Kill Switch는 setup_kill_switch에서 sync)"""
+        started = time.perf_counter()
+        self.adopt_redirects()
+        self.sync_routes()
+        balancer = self.server.config.get('load_balancing', {}).get('enabled') and self.adopt_balancer()
+        self.adopt_proxies()
+        summary = self.status()
+        summary['balancer_adopted'] = bool(balancer)
+        summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.log(
+            f"웜 리스타트: 테이블 {len(self.unchanged)}개 유지, {len(self.changed)}개 갱신, "
+            f"재지정 {len(self.adopted_redirects)}개 복원, 프록시 {len(self.adopted_proxies)}개 인수 "
+            f"({summary['elapsed_ms']}ms)"
+        )
+        return summary
+
+    def status(self) -> Dict:
+        return {
+            'unchanged_tables': list(self.unchanged),
+            'changed_tables': list(self.changed),
+            'adopted_redirects': dict(self.adopted_redirects),
+            'adopted_proxies': list(self.adopted_proxies),
+        }
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+WireGuard 키 생성 (프로세스 내부)
+- `wg genkey` / `wg pubkey`와 같은 형식의 Curve25519(X25519) 키 (base64 32바이트)
+- cryptography가 설치되어 있으면 사용, 없으면 RFC 7748 순수 파이썬 구현
+- 미리 만들어 둔 키 쌍 풀 (백그라운드 스레드가 채움) → 발급은 메모리 작업
+
+사용법: python3 src/wg_keys.py genkey | python3 src/wg_keys.py pubkey
+"""
+
+import os
+import sys
+import base64
+import argparse
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+try:
+    from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+except ImportError:
+    X25519PrivateKey = None
+
+BACKEND = 'cryptography' if X25519PrivateKey else 'python'
+
+DEFAULT_POOL_SIZE = 32
+
+# ===== X25519 (RFC 7748) =====
+_P = 2 ** 255 - 19
+_A24 = 121665
+
+
+def _clamp(scalar: bytearray) -> bytearray:
+    scalar[0] &= 248
+    scalar[31] &= 127
+    scalar[31] |= 64
+    return scalar
+
+
+def _x25519_base(scalar: bytes) -> bytes:
+    """scalar * 기준점(u=9) - 몽고메리 사다리"""
+    k = int.from_bytes(_clamp(bytearray(scalar)), 'little')
+    x1, x2, z2, x3, z3 = 9, 1, 0, 9, 1
+    swap = 0
+    for t in reversed(range(255)):
+        bit = (k >> t) & 1
+        swap ^= bit
+        if swap:
+            x2, x3, z2, z3 = x3, x2, z3, z2
+        swap = bit
+
+        a, b = x2 + z2, x2 - z2
+        aa, bb = a * a % _P, b * b % _P
+        e = aa - bb
+        c, d = x3 + z3, x3 - z3
+        da, cb = d * a % _P, c * b % _P
+        x3 = (da + cb) ** 2 % _P
+        z3 = x1 * (da - cb) ** 2 % _P
+        x2 = aa * bb % _P
+        z2 = e * (aa + _A24 * e) % _P
+    if swap:
+        x2, z2 = x3, z3
+    return (x2 * pow(z2, _P - 2, _P) % _P).to_bytes(32, 'little')
+
+
+# ===== 키 생성 =====
+def generate_private_key() -> str:
+    """`wg genkey`와 같은 형식의 개인키 (clamp 적용)"""
+    return base64.b64encode(bytes(_clamp(bytearray(os.urandom(32))))).decode()
+
+
+def public_key(private_key: str) -> str:
+    """`wg pubkey`와 같은 결과"""
+    raw = base64.b64decode(private_key.strip())
+    if len(raw) != 32:
+        raise ValueError("WireGuard 키는 32바이트여야 합니다")
+    if X25519PrivateKey:
+        key = X25519PrivateKey.from_private_bytes(raw).public_key()
+        raw_public = key.public_bytes(Encoding.Raw, PublicFormat.Raw)
+    else:
+        raw_public = _x25519_base(raw)
+    return base64.b64encode(raw_public).decode()
+
+
+def generate_keypair() -> Tuple[str, str]:
+    """(개인키, 공개키)"""
+    private_key = generate_private_key()
+    return private_key, public_key(private_key)
+
+
+# ===== 키 쌍 풀 =====
+class KeyPool:
+    """미리 만든 키 쌍 풀 - 절반 아래로 줄면 백그라운드 스레드가 다시 채움, 비어 있으면 바로 생성"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, log: Callable = None):
+        self.size = size
+        self.low_water = size // 2
+        self.log = log or (lambda message, level="INFO", **fields: None)
+
+        self.hits = 0
+        self.misses = 0
+        self._keys: Deque[Tuple[str, str]] = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._refill_loop, name="wg-key-pool", daemon=True)
+        self._thread.start()
+
+    def take(self) -> Tuple[str, str]:
+        """(개인키, 공개키) - 풀에서 꺼내고 한 번만 사용"""
+        with self._cond:
+            if self._keys:
+                keypair = self._keys.popleft()
+                self.hits += 1
+            else:
+                keypair = None
+                self.misses += 1
+            if len(self._keys) < self.low_water:
+                self._cond.notify()
+        return keypair or generate_keypair()
+
+    def status(self) -> Dict:
+        with self._cond:
+            return {
+                'backend': BACKEND,
+                'available': len(self._keys),
+                'size': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _refill_loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped and len(self._keys) >= self.low_water:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                missing = self.size - len(self._keys)
+            try:
+                keypairs = [generate_keypair() for _ in range(missing)]
+            except Exception as e:
+                self.log(f"키 풀 채우기 실패: {e}", "ERROR", event='key_pool')
+                return
+            with self._cond:
+                self._keys.extend(keypairs[:self.size - len(self._keys)])
+                self._cond.notify_all()
+
+    def fill(self, timeout: float = None) -> bool:
+        """풀이 가득 찰 때까지 대기 (시작 시 예열용), 가득 찼으면 True"""
+        with self._cond:
+            self._cond.notify()
+            return self._cond.wait_for(lambda: len(self._keys) >= self.size, timeout)
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._keys.clear()
+            self._cond.notify_all()
+        self._thread.join()
+
+
+_shared: Optional[KeyPool] = None
+_shared_lock = threading.Lock()
+
+
+def get_key_pool(size: int = DEFAULT_POOL_SIZE) -> KeyPool:
+    """프로세스 공유 키 풀 (처음 만들 때의 크기 사용)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = KeyPool(size)
+        return _shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WireGuard 키 생성 (wg genkey/pubkey 호환)")
+    parser.add_argument('command', choices=['genkey', 'pubkey'])
+    args = parser.parse_args()
+
+    if args.command == 'genkey':
+        print(generate_private_key())
+    else:
+        try:
+            print(public_key(sys.stdin.read()))
+        except ValueError as e:
+            parser.exit(1, f"{e}\n")
+
+
+if __name__ == "__main__":
+    main()
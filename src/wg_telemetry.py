@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+WireGuard 상태 수집기
+- 모든 인터페이스를 `wg show all dump` 한 번으로 읽어 피어별 레코드로 파싱 (개인키는 버림)
+- 짧은 TTL 동안 스냅샷 재사용, 동시에 들어온 요청은 수집 한 번을 같이 기다림 (single-flight)
+- 공개키 인덱스, 인터페이스/필드 필터
+
+사용법: python3 src/wg_telemetry.py [--interface wg0] [--fields endpoint,rx,tx]
+"""
+
+import json
+import time
+import argparse
+import subprocess
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+DEFAULT_TTL = 2.0
+
+PEER_FIELDS = ('interface', 'endpoint', 'allowed_ips', 'latest_handshake', 'rx', 'tx', 'persistent_keepalive')
+
+
+def parse_dump(text: str) -> Dict:
+    """`wg show all dump` 출력 → {'interfaces': {...}, 'peers': {public_key: {...}}}"""
+    interfaces, peers = {}, {}
+    for line in text.splitlines():
+        parts = line.split('\t')
+        if len(parts) == 5:
+            # 인터페이스: 이름, 개인키, 공개키, 포트, fwmark
+            name, _, public_key, port, fwmark = parts
+            interfaces[name] = {
+                'public_key': public_key,
+                'listen_port': int(port) if port.isdigit() else None,
+                'fwmark': None if fwmark == 'off' else fwmark,
+                'peers': 0,
+            }
+        elif len(parts) == 9:
+            # 피어: 인터페이스, 공개키, PSK, 엔드포인트, 허용 IP, 마지막 핸드셰이크, rx, tx, keepalive
+            name, public_key, _, endpoint, allowed_ips, handshake, rx, tx, keepalive = parts
+            peers[public_key] = {
+                'interface': name,
+                'endpoint': None if endpoint == '(none)' else endpoint,
+                'allowed_ips': [] if allowed_ips == '(none)' else allowed_ips.split(','),
+                'latest_handshake': int(handshake) or None,
+                'rx': int(rx),
+                'tx': int(tx),
+                'persistent_keepalive': None if keepalive == 'off' else int(keepalive),
+            }
+            if name in interfaces:
+                interfaces[name]['peers'] += 1
+    return {'interfaces': interfaces, 'peers': peers}
+
+
+def run_dump() -> str:
+    result = subprocess.run(['wg', 'show', 'all', 'dump'], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(result.stderr.strip() or f"wg show all dump 종료 코드 {result.returncode}")
+    return result.stdout
+
+
+class WireGuardTelemetry:
+    """TTL 캐시 + single-flight WireGuard 스냅샷"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, runner: Callable[[], str] = None, log: Callable = None):
+        self.ttl = ttl
+        self.runner = runner or run_dump
+        self.log = log or (lambda message, level="INFO", **fields: None)
+
+        self.collections = 0
+        self._snapshot: Optional[Dict] = None
+        self._cond = threading.Condition()
+        self._collecting = False
+
+    def snapshot(self, max_age: float = None) -> Dict:
+        """max_age(기본 TTL)보다 오래되지 않은 스냅샷 - 수집 중이면 그 결과를 기다림"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._cond:
+            while True:
+                snapshot = self._snapshot
+                if snapshot is not None and time.time() - snapshot['collected'] <= max_age:
+                    return snapshot
+                if not self._collecting:
+                    self._collecting = True
+                    break
+                self._cond.wait()
+
+        try:
+            snapshot = parse_dump(self.runner())
+            snapshot['error'] = None
+        except Exception as e:
+            # 실패도 TTL 동안 캐시 (권한 없음 등으로 매 요청마다 fork하지 않도록)
+            self.log(f"WireGuard 상태 수집 실패: {e}", "WARNING", event='wireguard_telemetry')
+            snapshot = {'interfaces': {}, 'peers': {}, 'error': str(e)}
+        snapshot['collected'] = time.time()
+
+        with self._cond:
+            self.collections += 1
+            self._snapshot = snapshot
+            self._collecting = False
+            self._cond.notify_all()
+        return snapshot
+
+    def peer(self, public_key: str) -> Optional[Dict]:
+        return self.snapshot()['peers'].get(public_key)
+
+    def peers(self, interface: str = None, public_keys: Iterable[str] = None,
+              fields: Iterable[str] = None, snapshot: Dict = None) -> Dict[str, Dict]:
+        """필터링한 피어 {public_key: {필드만}} - snapshot을 주면 그 스냅샷에서 (인터페이스 정보와 같은 덤프)"""
+        peers = (snapshot or self.snapshot())['peers']
+        if public_keys is not None:
+            peers = {key: peers[key] for key in public_keys if key in peers}
+        if interface is not None:
+            peers = {key: peer for key, peer in peers.items() if peer['interface'] == interface}
+        if fields:
+            fields = [field for field in fields if field in PEER_FIELDS]
+            peers = {key: {field: peer[field] for field in fields} for key, peer in peers.items()}
+        return peers
+
+
+_shared: Optional[WireGuardTelemetry] = None
+_shared_lock = threading.Lock()
+
+
+def get_telemetry(ttl: float = DEFAULT_TTL, log: Callable = None) -> WireGuardTelemetry:
+    """프로세스 공유 수집기 (처음 만들 때의 TTL/log 사용)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = WireGuardTelemetry(ttl, log=log)
+        return _shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WireGuard 피어 상태")
+    parser.add_argument('--interface')
+    parser.add_argument('--fields', help="쉼표로 구분 (예: endpoint,rx,tx)")
+    args = parser.parse_args()
+
+    telemetry = WireGuardTelemetry()
+    snapshot = telemetry.snapshot()
+    if snapshot['error']:
+        parser.exit(1, f"{snapshot['error']}\n")
+    fields = args.fields.split(',') if args.fields else None
+    print(json.dumps(telemetry.peers(args.interface, fields=fields), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()